@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+asyncio pipeline that drives mapper workers with bounded queues.
+Three stages replace the sequential read -> map -> write loops:
+
+    producer   streams (cui, name) rows from the input into a bounded queue
+    mappers    N tasks that await the mapping backend for each row
+    writer     one task appending results to a results log (results_log.py),
+               committing each flush to the run journal beside it
+
+Bounded queues between the stages give backpressure: a slow writer stalls the
+mappers and a slow backend stalls the producer, so memory stays flat.
+
+A backend is any callable taking (cui, name) and returning a result dict or
+IncidenceRecord. Coroutine functions (a remote or skill backend) are awaited,
+so slow calls overlap across the N mappers; plain functions such as the
+in-process rule engine are called directly, or on a thread with
+blocking=True. Every backend consults the result cache (result_cache.py)
+before mapping, unless --no-cache is given. With --governor, each backend call
+(cache misses only) first draws one request and --tokens-per-call tokens from
+the rate budget shared with the batch launchers (rate_governor.py). With
+--adaptive, --concurrency is only the ceiling: an AIMD controller
+(concurrency.py) sets how many backend calls are in flight, backing off on
+throttles, timeouts and calls slower than --latency-threshold.
+
+Usage:
+    python async_orchestrator.py --input data/disease_codes_Charlie.csv [--rows 9001-10000] [--backend rules]
+    python async_orchestrator.py --batch-file batch1_input.json --backend mapper --concurrency 16 [--no-cache]
+    python async_orchestrator.py --input data/disease_codes_Charlie.csv --backend mapper --governor --rpm 50 --adaptive
+"""
+
+import argparse
+import asyncio
+import inspect
+import json
+import time
+from pathlib import Path
+
+from concurrency import AIMDController, Throttled
+from incidence_record import IncidenceRecord
+from rate_governor import DEFAULT_RPM, DEFAULT_STATE_PATH, DEFAULT_TPM, RateGovernor
+from result_cache import DEFAULT_CACHE_PATH, ResultCache, cached
+from results_log import DEFAULT_LOG_PATH
+from run_journal import open_journaled_log
+
+REPO_DIR = Path(__file__).resolve().parent
+
+DEFAULT_CONCURRENCY = 8
+DEFAULT_QUEUE_SIZE = 256
+
+_DONE = object()
+
+
+def make_backend(func, blocking=False):
+    """Wrap a mapping callable as an async (cui, name) -> dict backend."""
+    if inspect.iscoroutinefunction(func):
+        async def backend(cui, name):
+            return _as_dict(await func(cui, name))
+    elif blocking:
+        async def backend(cui, name):
+            return _as_dict(await asyncio.to_thread(func, cui, name))
+    else:
+        async def backend(cui, name):
+            return _as_dict(func(cui, name))
+    return backend
+
+
+def governed(backend, governor, tokens=0):
+    """Wrap an async backend so each call first takes one request and tokens from a RateGovernor.
+
+    The governor's file lock is taken on a thread, and a mapper waiting for
+    budget sleeps without blocking the event loop.
+    """
+    async def call(cui, name):
+        while wait := await asyncio.to_thread(governor.try_acquire, tokens):
+            await asyncio.sleep(wait)
+        return await backend(cui, name)
+    return call
+
+
+def adaptive(backend, controller, latency_threshold=None, max_retries=5, poll=0.01):
+    """Wrap an async backend so at most controller.window calls are in flight.
+
+    Outcomes are reported to the controller as in concurrency.run_groups:
+    throttled (Throttled) and timed-out calls are retried, up to max_retries
+    times each, and a success slower than latency_threshold seconds counts as
+    congestion but keeps its result. Other errors propagate.
+    """
+    async def call(cui, name):
+        attempts = 0
+        while True:
+            while (started := controller.try_acquire()) is None:
+                await asyncio.sleep(poll)
+            attempts += 1
+            try:
+                result = await backend(cui, name)
+            except (Throttled, TimeoutError) as e:
+                controller.release(started, "throttled" if isinstance(e, Throttled) else "timeout")
+                if attempts > max_retries:
+                    raise
+                continue
+            except Exception:
+                controller.release(started, "error")
+                raise
+            latency = time.monotonic() - started
+            congested = latency_threshold is not None and latency > latency_threshold
+            controller.release(started, "congested" if congested else "ok", latency)
+            return result
+    return call
+
+
+def _as_dict(result):
+    return result.to_dict() if isinstance(result, IncidenceRecord) else result
+
+
+def rules_backend():
+    """The in-process keyword rule engine from large_scale_processor, and its per-mapping version."""
+    from large_scale_processor import categorize_disease, rules_version, use_hierarchy
+    use_hierarchy()
+    return make_backend(categorize_disease), rules_version
+
+
+def mapper_backend():
+    """The curated knowledge-base mapper, versioned by each CUI's store record."""
+    from cui_incidence_mapper_impl import DiseaseIncidenceMapper
+    mapper = DiseaseIncidenceMapper()
+    return make_backend(mapper.map_cui_to_record), mapper.version
+
+
+BACKENDS = {
+    "rules": rules_backend,
+    "mapper": mapper_backend,
+}
+
+
+async def _produce(rows, work, skip, workers, stats):
+    for cui, name in rows:
+        if cui in skip:
+            stats["skipped"] += 1
+            continue
+        await work.put((cui, name))
+        # Let consumers run between rows even when the queue never fills
+        await asyncio.sleep(0)
+    for _ in range(workers):
+        await work.put(_DONE)
+
+
+async def _map(work, done, backend, stats):
+    while True:
+        item = await work.get()
+        if item is _DONE:
+            await done.put(_DONE)
+            return
+        cui, name = item
+        try:
+            result = await backend(cui, name)
+        except Exception as e:
+            stats["errors"] += 1
+            print(f"Error mapping {cui}: {e}")
+            continue
+        await done.put(result)
+
+
+async def _write(done, sink, workers, stats):
+    finished = 0
+    while finished < workers:
+        result = await done.get()
+        if result is _DONE:
+            finished += 1
+            continue
+        sink(result)
+        stats["written"] += 1
+
+
+async def run_pipeline(rows, backend, sink, concurrency=DEFAULT_CONCURRENCY, queue_size=DEFAULT_QUEUE_SIZE,
+                       skip=frozenset()):
+    """Map (cui, name) rows through backend with concurrency mappers, passing results to sink.
+
+    Rows whose CUI is in skip are not mapped. Returns counts of rows
+    written, skipped and failed.
+    """
+    work = asyncio.Queue(maxsize=queue_size)
+    done = asyncio.Queue(maxsize=queue_size)
+    stats = {"written": 0, "skipped": 0, "errors": 0}
+    await asyncio.gather(
+        _produce(rows, work, skip, concurrency, stats),
+        *(_map(work, done, backend, stats) for _ in range(concurrency)),
+        _write(done, sink, concurrency, stats),
+    )
+    return stats
+
+
+def iter_input(input_csv=None, batch_file=None, rows=None):
+    """Stream (cui, name) rows from a disease codes CSV or a batch input file.
+
+    With rows=(first, last), only those CSV rows are read, through the
+    input's row index (input_index.py).
+    """
+    if input_csv and rows:
+        from input_index import open_input_index
+        with open_input_index(input_csv) as index:
+            for _, row in index.rows(*rows):
+                yield row["diseaseid"], row["diseasename"]
+    elif input_csv:
+        from large_scale_processor import iter_csv_diseases
+        for _, cui, name in iter_csv_diseases(input_csv):
+            yield cui, name
+    else:
+        with open(batch_file, "r") as f:
+            batch_input = json.load(f)
+        for disease in batch_input["diseases"]:
+            yield disease["cui"], disease.get("name", f"Disease {disease['cui']}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Map diseases through an asyncio pipeline into a results log")
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--input", help="Disease codes CSV (disease_id, diseaseid, diseasename)")
+    source.add_argument("--batch-file", help='Batch input JSON ({"diseases": [{"cui", "name"}, ...]})')
+    parser.add_argument("--rows", default=None, help="Only map input CSV rows FIRST-LAST (1-based, inclusive)")
+    parser.add_argument("--backend", choices=list(BACKENDS), default="rules")
+    parser.add_argument("--output", default=str(DEFAULT_LOG_PATH), help="Results log to append to")
+    parser.add_argument("--concurrency", type=int, default=DEFAULT_CONCURRENCY)
+    parser.add_argument("--queue-size", type=int, default=DEFAULT_QUEUE_SIZE)
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_PATH), help="Result cache to consult before mapping")
+    parser.add_argument("--no-cache", action="store_true", help="Map every row without the result cache")
+    parser.add_argument("--governor", action="store_true",
+                        help="Draw each backend call from the shared rate budget (rate_governor.py)")
+    parser.add_argument("--governor-state", default=str(DEFAULT_STATE_PATH))
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM)
+    parser.add_argument("--tpm", type=float, default=DEFAULT_TPM)
+    parser.add_argument("--tokens-per-call", type=int, default=0, help="Estimated tokens per backend call")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="Let an AIMD controller set the backend calls in flight, up to --concurrency")
+    parser.add_argument("--latency-threshold", type=float, default=None,
+                        help="With --adaptive, back off when a call takes longer than this many seconds")
+    args = parser.parse_args()
+    rows = tuple(int(bound) for bound in args.rows.split("-", 1)) if args.rows else None
+    if rows and not args.input:
+        parser.error("--rows requires --input")
+
+    try:
+        backend, version = BACKENDS[args.backend]()
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    controller = None
+    if args.adaptive:
+        controller = AIMDController(initial=min(2, args.concurrency), maximum=args.concurrency)
+        backend = adaptive(backend, controller, args.latency_threshold)
+    # Outside the controller, so a call waiting for budget does not hold a slot
+    if args.governor:
+        backend = governed(backend, RateGovernor(args.governor_state, args.rpm, args.tpm), args.tokens_per_call)
+    cache = None if args.no_cache else ResultCache(args.cache)
+    if cache:
+        backend = cached(backend, cache, version)
+
+    start = time.perf_counter()
+    journal, log = open_journaled_log(args.output)
+    with journal, log:
+        stats = asyncio.run(run_pipeline(
+            iter_input(args.input, args.batch_file, rows), backend, log.append,
+            args.concurrency, args.queue_size, skip=frozenset(log.completed),
+        ))
+    elapsed = time.perf_counter() - start
+
+    print(f"Wrote {stats['written']} results to {args.output} in {elapsed:.2f}s "
+          f"({stats['skipped']} already done, {stats['errors']} errors)")
+    if controller:
+        print(f"Concurrency: {controller.metrics()}")
+    if cache:
+        cache.close()
+        print(f"Cache: {cache.counts['hits']} hits, {cache.counts['misses']} misses, "
+              f"{cache.counts['evictions']} evicted")
+
+
+if __name__ == "__main__":
+    main()
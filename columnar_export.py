@@ -0,0 +1,341 @@
+#!/usr/bin/env python3
+"""
+Columnar binary export of the consolidated dataset.
+Writes one .npy file per column into output/disease_incidence_data.columns/,
+so analysis code can memory-map the table instead of re-parsing the CSV:
+
+    rate columns      <field>.npy float64 (NaN when missing) and
+                      <field>.rare.npy bool ("extremely rare" sentinel)
+    numeric columns   <field>.npy float64 (NaN when missing)
+    flags             <field>.npy int8 (1 true, 0 false, -1 missing)
+    categoricals      <field>.npy int32 enum codes, levels in meta.json
+                      (-1 outside the domain)
+    text              <field>.data.npy UTF-8 bytes and <field>.offsets.npy int64
+    meta.json         row count, column kinds and category levels
+
+When pyarrow is installed the same table is also written as an Arrow IPC file
+(disease_incidence_data.arrow) with dictionary-encoded categoricals.
+
+Rows are encoded and appended in chunks, so memory does not grow with the
+dataset; files are written under temporary names and renamed into place.
+
+Values that fit none of a column's types (column-shifted rows) load as missing.
+
+Usage:
+    python columnar_export.py [--csv output/disease_incidence_data.csv] [--out DIR]
+"""
+
+import argparse
+import csv
+import json
+import os
+from pathlib import Path
+
+from incidence_record import ENUM_FIELDS, FIELDNAMES, parse_csv_value
+from total_cases import parse_rate_column
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_CSV_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+DEFAULT_COLUMNS_DIR = REPO_DIR / "output" / "disease_incidence_data.columns"
+DEFAULT_ARROW_PATH = REPO_DIR / "output" / "disease_incidence_data.arrow"
+
+FORMAT_VERSION = 2
+CHUNK_ROWS = 65536
+
+RATE_FIELDS = ("incidence_per_100k", "prevalence_per_100k", "total_cases_per_year")
+FLOAT_FIELDS = ("confidence", "data_year")
+FLAG_FIELDS = ("is_subtype", "year_specific")
+CATEGORY_FIELDS = tuple(ENUM_FIELDS)
+TEXT_FIELDS = tuple(field for field in FIELDNAMES
+                    if field not in RATE_FIELDS + FLOAT_FIELDS + FLAG_FIELDS + CATEGORY_FIELDS)
+COLUMN_KINDS = {
+    field: "rate" if field in RATE_FIELDS else "float" if field in FLOAT_FIELDS else "flag" if field in FLAG_FIELDS
+    else "category" if field in CATEGORY_FIELDS else "text"
+    for field in FIELDNAMES
+}
+
+# Category codes are the enum codes (as in DiseaseIncidenceMapper.map_many), so
+# they mean the same thing in every export
+CATEGORY_CODES = {field: {level: code for code, level in enumerate(enum.levels())}
+                  for field, enum in ENUM_FIELDS.items()}
+
+
+class ColumnBuilder:
+    """Streams result dicts into the columnar files, chunk_rows rows at a time.
+
+    Each chunk is encoded and appended to temporary files in the target
+    directory (and written as one Arrow record batch), so memory is bounded
+    by the chunk size. finish() fills in the .npy headers, then moves every
+    file into place with os.replace, meta.json last.
+    """
+
+    def __init__(self, columns_dir=DEFAULT_COLUMNS_DIR, arrow_path=DEFAULT_ARROW_PATH, chunk_rows=CHUNK_ROWS):
+        import numpy as np
+
+        self._np = np
+        self.columns_dir = Path(columns_dir)
+        self.columns_dir.mkdir(parents=True, exist_ok=True)
+        self.chunk_rows = chunk_rows
+        self.rows = 0
+        self._values = {field: [] for field in FIELDNAMES}
+        self._text_bytes = dict.fromkeys(TEXT_FIELDS, 0)
+
+        # name -> [file, tmp path, dtype, header size, element count]
+        self._files = {}
+        for field in RATE_FIELDS + FLOAT_FIELDS:
+            self._open(field, np.float64)
+        for field in RATE_FIELDS:
+            self._open(f"{field}.rare", np.bool_)
+        for field in FLAG_FIELDS:
+            self._open(field, np.int8)
+        for field in CATEGORY_FIELDS:
+            self._open(field, np.int32)
+        for field in TEXT_FIELDS:
+            self._open(f"{field}.data", np.uint8)
+            self._open(f"{field}.offsets", np.int64)
+            self._append(f"{field}.offsets", np.zeros(1, dtype=np.int64))
+
+        self._arrow = None
+        if arrow_path:
+            try:
+                import pyarrow  # noqa: F401
+            except ImportError:
+                pass
+            else:
+                self._arrow = _ArrowWriter(arrow_path)
+
+    def _open(self, name, dtype):
+        from numpy.lib import format as npy_format
+
+        dtype = self._np.dtype(dtype)
+        # Named per-process tmp files (not mkstemp, which creates them 0600) keep the umask permissions
+        tmp_path = self.columns_dir / f"{name}.npy.{os.getpid()}.tmp"
+        f = open(tmp_path, "wb")
+        # Placeholder shape; numpy pads the header so the final length fits in place
+        npy_format.write_array_header_1_0(f, {"descr": dtype.str, "fortran_order": False, "shape": (0,)})
+        self._files[name] = [f, tmp_path, dtype, f.tell(), 0]
+
+    def _append(self, name, array):
+        entry = self._files[name]
+        entry[0].write(array.astype(entry[2], copy=False).tobytes())
+        entry[4] += len(array)
+
+    def add(self, result):
+        for field, values in self._values.items():
+            values.append(result.get(field))
+        self.rows += 1
+        if len(self._values["cui"]) >= self.chunk_rows:
+            self._flush()
+
+    def _flush(self):
+        """Encode the buffered rows and append them to every column."""
+        np = self._np
+        values = self._values
+        if not values["cui"]:
+            return
+
+        for field in RATE_FIELDS + FLOAT_FIELDS:
+            rates, rare = parse_rate_column(values[field])
+            self._append(field, rates)
+            if field in RATE_FIELDS:
+                self._append(f"{field}.rare", rare)
+
+        for field in FLAG_FIELDS:
+            self._append(field, np.array(
+                [int(value) if isinstance(value, bool) else -1 for value in values[field]], dtype=np.int8
+            ))
+
+        for field in CATEGORY_FIELDS:
+            codes = CATEGORY_CODES[field]
+            self._append(field, np.array([_category_code(codes, value) for value in values[field]], dtype=np.int32))
+
+        for field in TEXT_FIELDS:
+            encoded = [b"" if value is None else str(value).encode("utf-8") for value in values[field]]
+            offsets = np.cumsum([len(value) for value in encoded], dtype=np.int64) + self._text_bytes[field]
+            self._append(f"{field}.data", np.frombuffer(b"".join(encoded), dtype=np.uint8))
+            self._append(f"{field}.offsets", offsets)
+            self._text_bytes[field] = int(offsets[-1])
+
+        if self._arrow:
+            self._arrow.write(values)
+        self._values = {field: [] for field in FIELDNAMES}
+
+    def finish(self):
+        """Flush the last chunk and move the columns, meta.json and Arrow file into place."""
+        from numpy.lib import format as npy_format
+
+        self._flush()
+        for name, (f, tmp_path, dtype, header_size, count) in self._files.items():
+            f.seek(0)
+            npy_format.write_array_header_1_0(f, {"descr": dtype.str, "fortran_order": False, "shape": (count,)})
+            if f.tell() != header_size:
+                raise RuntimeError(f"{name}.npy header for {count} rows does not fit the reserved space")
+            f.close()
+            os.replace(tmp_path, self.columns_dir / f"{name}.npy")
+
+        meta = {
+            "version": FORMAT_VERSION,
+            "rows": self.rows,
+            "columns": COLUMN_KINDS,
+            "levels": {field: list(enum.levels()) for field, enum in ENUM_FIELDS.items()},
+        }
+        tmp_path = self.columns_dir / f"meta.json.{os.getpid()}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(meta, f, indent=2, ensure_ascii=False)
+        os.replace(tmp_path, self.columns_dir / "meta.json")
+
+        if self._arrow:
+            self._arrow.finish()
+
+
+def _category_code(codes, value):
+    """Enum code of a categorical value, or -1 outside the domain."""
+    try:
+        return codes.get(value, -1)
+    except TypeError:
+        return -1
+
+
+class _ArrowWriter:
+    """Writes chunks of result values as record batches of an Arrow IPC file."""
+
+    def __init__(self, arrow_path):
+        import pyarrow as pa
+
+        self._pa = pa
+        self.path = Path(arrow_path)
+        fields = []
+        for field in FIELDNAMES:
+            kind = COLUMN_KINDS[field]
+            if kind in ("rate", "float"):
+                fields.append(pa.field(field, pa.float64()))
+            elif kind == "flag":
+                fields.append(pa.field(field, pa.bool_()))
+            elif kind == "category":
+                fields.append(pa.field(field, pa.dictionary(pa.int32(), pa.string())))
+            else:
+                fields.append(pa.field(field, pa.string()))
+            if kind == "rate":
+                fields.append(pa.field(f"{field}_extremely_rare", pa.bool_()))
+        self.schema = pa.schema(fields)
+        self._levels = {field: pa.array(enum.levels(), type=pa.string()) for field, enum in ENUM_FIELDS.items()}
+
+        self._tmp_path = self.path.with_name(f"{self.path.name}.{os.getpid()}.tmp")
+        self._sink = pa.OSFile(str(self._tmp_path), "wb")
+        self._writer = pa.ipc.new_file(self._sink, self.schema)
+
+    def write(self, values):
+        pa = self._pa
+        arrays = []
+        for field in FIELDNAMES:
+            kind = COLUMN_KINDS[field]
+            if kind in ("rate", "float"):
+                rates, rare = parse_rate_column(values[field])
+                arrays.append(pa.array(rates, from_pandas=True))
+            elif kind == "flag":
+                arrays.append(pa.array([value if isinstance(value, bool) else None for value in values[field]],
+                                       type=pa.bool_()))
+            elif kind == "category":
+                codes = [_category_code(CATEGORY_CODES[field], value) for value in values[field]]
+                indices = pa.array([None if code < 0 else code for code in codes], type=pa.int32())
+                arrays.append(pa.DictionaryArray.from_arrays(indices, self._levels[field]))
+            else:
+                arrays.append(pa.array([None if value is None else str(value) for value in values[field]],
+                                       type=pa.string()))
+            if kind == "rate":
+                arrays.append(pa.array(rare))
+        self._writer.write_batch(pa.record_batch(arrays, schema=self.schema))
+
+    def finish(self):
+        self._writer.close()
+        self._sink.close()
+        os.replace(self._tmp_path, self.path)
+
+
+class TextColumn:
+    """Lazy view over a text column's UTF-8 blob and offsets."""
+
+    def __init__(self, data, offsets):
+        self.data = data
+        self.offsets = offsets
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, index):
+        start, end = self.offsets[index], self.offsets[index + 1]
+        return self.data[start:end].tobytes().decode("utf-8")
+
+    def tolist(self):
+        blob = self.data.tobytes()
+        offsets = self.offsets.tolist()
+        return [blob[start:end].decode("utf-8") for start, end in zip(offsets, offsets[1:])]
+
+
+class ColumnarTable:
+    """Memory-mapped consolidated dataset loaded from a columns directory."""
+
+    def __init__(self, columns_dir=DEFAULT_COLUMNS_DIR):
+        import numpy as np
+
+        columns_dir = Path(columns_dir)
+        with open(columns_dir / "meta.json", "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{columns_dir} is not a version {FORMAT_VERSION} columnar export")
+
+        self.rows = meta["rows"]
+        self.kinds = meta["columns"]
+        self.levels = meta["levels"]
+        self.columns = {}
+        for field, kind in self.kinds.items():
+            if kind == "text":
+                self.columns[field] = TextColumn(
+                    np.load(columns_dir / f"{field}.data.npy", mmap_mode="r"),
+                    np.load(columns_dir / f"{field}.offsets.npy", mmap_mode="r"),
+                )
+            else:
+                self.columns[field] = np.load(columns_dir / f"{field}.npy", mmap_mode="r")
+            if kind == "rate":
+                self.columns[f"{field}.rare"] = np.load(columns_dir / f"{field}.rare.npy", mmap_mode="r")
+
+    def __len__(self):
+        return self.rows
+
+    def __getitem__(self, name):
+        return self.columns[name]
+
+    def labels(self, field):
+        """Decode a categorical column to its string values (None when missing)."""
+        levels = self.levels[field]
+        return [None if code < 0 else levels[code] for code in self.columns[field].tolist()]
+
+
+def load_columns(columns_dir=DEFAULT_COLUMNS_DIR):
+    """Memory-map a columnar export."""
+    return ColumnarTable(columns_dir)
+
+
+def export_csv(csv_path=DEFAULT_CSV_PATH, columns_dir=DEFAULT_COLUMNS_DIR, arrow_path=DEFAULT_ARROW_PATH):
+    """Build the columnar export from a consolidated CSV. Returns the row count."""
+    builder = ColumnBuilder(columns_dir, arrow_path)
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            builder.add({field: parse_csv_value(field, row.get(field)) for field in FIELDNAMES})
+    builder.finish()
+    return builder.rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the consolidated dataset to columnar binary files")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+    parser.add_argument("--out", default=str(DEFAULT_COLUMNS_DIR))
+    parser.add_argument("--arrow", default=str(DEFAULT_ARROW_PATH), help="Arrow IPC path (written if pyarrow is installed)")
+    args = parser.parse_args()
+
+    rows = export_csv(args.csv, args.out, args.arrow)
+    print(f"Exported {rows} rows to {args.out}")
+
+
+if __name__ == "__main__":
+    main()
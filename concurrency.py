@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Adaptive concurrency for launching sub-agent groups.
+AIMDController sets how many groups may be in flight: the window grows by
+about one group per window's worth of healthy completions (additive
+increase) and halves on a throttle (429), timeout or congested call
+(multiplicative decrease), so launches settle just under the backend's capacity without
+manual tuning. The current window and counters are exposed by metrics().
+
+run_groups() drives a callable over groups under a controller, and
+FakeBackend is a local stand-in with configurable latency, capacity and
+throttling, so the controller can be exercised without a real backend:
+    python concurrency.py [--groups 200] [--capacity 12] [--latency 0.05]
+"""
+
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+class Throttled(Exception):
+    """The backend refused a call because it is over capacity (HTTP 429)."""
+
+
+class AIMDController:
+    """Additive-increase / multiplicative-decrease limit on in-flight groups."""
+
+    def __init__(self, initial=2, minimum=1, maximum=64, increase=1.0, decrease=0.5, latency_target=None):
+        self.minimum = minimum
+        self.maximum = maximum
+        self.increase = increase
+        self.decrease = decrease
+        self.latency_target = latency_target
+        self._window = float(initial)
+        self._lock = threading.Lock()
+        self._last_decrease = 0.0
+        self.in_flight = 0
+        self.counts = {"ok": 0, "slow": 0, "congested": 0, "throttled": 0, "timeout": 0, "error": 0}
+
+    @property
+    def window(self):
+        """Current concurrency limit (whole groups)."""
+        return max(self.minimum, int(self._window))
+
+    def try_acquire(self):
+        """Reserve a slot if the window allows another group in flight."""
+        with self._lock:
+            if self.in_flight >= self.window:
+                return None
+            self.in_flight += 1
+            return time.monotonic()
+
+    def release(self, started, outcome, latency=None):
+        """Return a slot and adjust the window.
+
+        outcome is "ok", "congested", "throttled", "timeout" or "error". A
+        successful call slower than latency_target counts as "slow" and holds
+        the window; "congested" (a success that took far too long) backs off
+        like a throttle.
+        """
+        with self._lock:
+            self.in_flight -= 1
+            if outcome == "ok" and self.latency_target is not None and latency > self.latency_target:
+                outcome = "slow"
+            self.counts[outcome] += 1
+
+            if outcome == "ok":
+                self._window = min(self.maximum, self._window + self.increase / self._window)
+            elif outcome in ("congested", "throttled", "timeout") and started >= self._last_decrease:
+                # Decrease at most once per round trip: calls already in flight
+                # when we backed off report the same congestion episode
+                self._window = max(self.minimum, self._window * self.decrease)
+                self._last_decrease = time.monotonic()
+
+    def metrics(self):
+        with self._lock:
+            return {"window": self.window, "in_flight": self.in_flight, **self.counts}
+
+
+def run_groups(groups, call, controller, latency_threshold=None, max_retries=5, on_result=None, poll=0.01,
+               governor=None, tokens_per_group=0):
+    """Call call(group) for every group, keeping at most controller.window in flight.
+
+    With a rate_governor.RateGovernor, each launch also takes one request and
+    tokens_per_group tokens from the shared budget, and launches pause while
+    it is exhausted. Throttled or timed-out groups are retried (up to
+    max_retries times each). A group that succeeds but takes longer than
+    latency_threshold seconds keeps its result; it is only reported to the
+    controller as congestion, so the window backs off.
+
+    Returns (results, failed): results maps group index to the call's return
+    value; failed lists the indexes that ran out of retries or raised.
+    """
+    pending = list(range(len(groups)))[::-1]
+    attempts = [0] * len(groups)
+    results = {}
+    failed = []
+    running = {}
+    budget_ready = 0.0
+
+    with ThreadPoolExecutor(max_workers=controller.maximum) as pool:
+        while pending or running:
+            while pending:
+                if governor is not None:
+                    if controller.in_flight >= controller.window or time.monotonic() < budget_ready:
+                        break
+                    wait_for_budget = governor.try_acquire(tokens_per_group)
+                    if wait_for_budget:
+                        budget_ready = time.monotonic() + wait_for_budget
+                        break
+                started = controller.try_acquire()
+                if started is None:
+                    break
+                index = pending.pop()
+                attempts[index] += 1
+                running[pool.submit(call, groups[index])] = (index, started)
+
+            if not running:
+                time.sleep(max(poll, budget_ready - time.monotonic()))
+                continue
+            done, _ = wait(running, timeout=poll, return_when=FIRST_COMPLETED)
+            for future in done:
+                index, started = running.pop(future)
+                latency = time.monotonic() - started
+                try:
+                    result = future.result()
+                except Throttled:
+                    outcome = "throttled"
+                except TimeoutError:
+                    outcome = "timeout"
+                except Exception:
+                    outcome = "error"
+                else:
+                    congested = latency_threshold is not None and latency > latency_threshold
+                    outcome = "congested" if congested else "ok"
+                controller.release(started, outcome, latency)
+
+                if outcome in ("ok", "congested"):
+                    results[index] = result
+                    if on_result:
+                        on_result(index, result)
+                elif outcome != "error" and attempts[index] <= max_retries:
+                    pending.append(index)
+                else:
+                    failed.append(index)
+    return results, failed
+
+
+class FakeBackend:
+    """Local stand-in for the sub-agent backend.
+
+    Each call sleeps for latency (plus uniform jitter). A call that would
+    exceed capacity concurrent calls, or that draws under throttle_rate, raises
+    Throttled after a short delay instead. Latency grows with load above
+    slow_above concurrent calls, if set.
+    """
+
+    def __init__(self, latency=0.05, jitter=0.01, capacity=12, throttle_rate=0.0, slow_above=None, seed=None):
+        self.latency = latency
+        self.jitter = jitter
+        self.capacity = capacity
+        self.throttle_rate = throttle_rate
+        self.slow_above = slow_above
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+        self.active = 0
+        self.peak = 0
+
+    def __call__(self, group):
+        with self._lock:
+            throttled = self.active >= self.capacity or self._random.random() < self.throttle_rate
+            if not throttled:
+                self.active += 1
+                self.peak = max(self.peak, self.active)
+            load = self.active
+            delay = self.latency + self._random.uniform(0, self.jitter)
+        if throttled:
+            time.sleep(self.latency / 10)
+            raise Throttled()
+        if self.slow_above and load > self.slow_above:
+            delay *= load / self.slow_above
+        try:
+            time.sleep(delay)
+            return group
+        finally:
+            with self._lock:
+                self.active -= 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Simulate the AIMD controller against a fake backend")
+    parser.add_argument("--groups", type=int, default=200)
+    parser.add_argument("--capacity", type=int, default=12)
+    parser.add_argument("--latency", type=float, default=0.05)
+    parser.add_argument("--throttle-rate", type=float, default=0.0)
+    parser.add_argument("--initial", type=int, default=2)
+    parser.add_argument("--maximum", type=int, default=64)
+    args = parser.parse_args()
+
+    backend = FakeBackend(args.latency, capacity=args.capacity, throttle_rate=args.throttle_rate, seed=0)
+    controller = AIMDController(initial=args.initial, maximum=args.maximum)
+    windows = []
+
+    def record(index, result):
+        windows.append(controller.window)
+
+    start = time.perf_counter()
+    results, failed = run_groups(list(range(args.groups)), backend, controller, on_result=record)
+    elapsed = time.perf_counter() - start
+
+    ideal = args.groups * args.latency / args.capacity
+    print(f"{len(results)} groups in {elapsed:.2f}s ({len(failed)} failed); "
+          f"ideal at capacity {args.capacity}: {ideal:.2f}s")
+    print(f"Backend peak concurrency: {backend.peak}")
+    print(f"Final metrics: {controller.metrics()}")
+    print(f"Window trace: {windows[::max(1, len(windows) // 20)]}")
+
+
+if __name__ == "__main__":
+    main()
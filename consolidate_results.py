@@ -0,0 +1,297 @@
+#!/usr/bin/env python3
+"""
+Consolidate mapper results into disease_incidence_data.csv and summary_stats.json.
+Results are streamed from a results log or a directory of per-CUI JSON files
+and sorted by CUI with an external merge sort: records are buffered up to a
+memory cap, spilled to temp files as sorted runs, then k-way merged while the
+CSV is written row by row. Memory use stays bounded by the cap regardless of
+how many results are consolidated.
+
+When a CUI appears more than once, the record read last wins. Records that
+fail the schema checks in validation.py are written to output/quarantine.jsonl
+instead of the CSV and summary (--no-validate keeps them). The CUI offset index
+used by csv_index.py is rebuilt alongside the CSV.
+
+With --incremental, only result files that are new or changed since the last
+run (per output/consolidation_manifest.json) are parsed, and their records are
+merged into the existing CSV and summary.
+
+Usage:
+    python consolidate_results.py [--results output/results] [--memory-mb 64]
+    python consolidate_results.py --incremental
+"""
+
+import argparse
+import csv
+import heapq
+import json
+import os
+import tempfile
+from pathlib import Path
+
+from columnar_export import ColumnBuilder
+from consolidation_manifest import DEFAULT_MANIFEST_PATH, build_manifest, collect_changes, load_manifest, save_manifest
+from csv_index import build_index
+from incidence_record import FIELDNAMES, parse_csv_value
+from json_reader import DECODERS, DEFAULT_WORKERS
+from results_log import DEFAULT_LOG_PATH, iter_results
+from summary_stats import SummaryAggregate, write_summary
+from validation import Quarantine, filter_objects, filter_valid, validate as validate_record
+
+REPO_DIR = Path(__file__).resolve().parent
+# The results log's directory: the log plus any legacy {cui}.json files
+DEFAULT_RESULTS_PATH = DEFAULT_LOG_PATH.parent
+DEFAULT_OUTPUT_DIR = REPO_DIR / "output"
+DEFAULT_MEMORY_MB = 64
+
+
+def _spill(run, tmp_dir):
+    """Sort a run by (cui, seq) and write it to a temp file as JSON lines."""
+    run.sort(key=lambda item: (item[0], item[1]))
+    fd, path = tempfile.mkstemp(suffix=".jsonl", dir=tmp_dir)
+    with os.fdopen(fd, "w", encoding="utf-8") as f:
+        for cui, seq, line in run:
+            f.write(f'[{json.dumps(cui)},{seq},{line}]\n')
+    return path
+
+
+def _read_run(path):
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            cui, seq, record = json.loads(line)
+            yield cui, seq, record
+
+
+def _memory_run(run):
+    run.sort(key=lambda item: (item[0], item[1]))
+    for cui, seq, line in run:
+        yield cui, seq, json.loads(line)
+
+
+def sorted_results(results, memory_limit_bytes, tmp_dir):
+    """Yield results sorted by CUI, keeping only the last record read for each CUI.
+
+    Records are held as serialized JSON, and a run is spilled once their total
+    size passes memory_limit_bytes.
+    """
+    run_paths = []
+    run = []
+    run_bytes = 0
+    for seq, result in enumerate(results):
+        cui = result.get("cui") or ""
+        line = json.dumps(result, ensure_ascii=False)
+        run.append((cui, seq, line))
+        run_bytes += len(line)
+        if run_bytes >= memory_limit_bytes:
+            run_paths.append(_spill(run, tmp_dir))
+            run = []
+            run_bytes = 0
+
+    runs = [_read_run(path) for path in run_paths]
+    if run:
+        runs.append(_memory_run(run))
+
+    pending = pending_cui = None
+    for cui, _, record in heapq.merge(*runs, key=lambda item: (item[0], item[1])):
+        if pending is not None and pending_cui != cui:
+            yield pending
+        pending, pending_cui = record, cui
+    if pending is not None:
+        yield pending
+
+
+def _column_builder(output_dir):
+    output_dir = Path(output_dir)
+    return ColumnBuilder(output_dir / "disease_incidence_data.columns", output_dir / "disease_incidence_data.arrow")
+
+
+def consolidate(results_path=DEFAULT_RESULTS_PATH, output_dir=DEFAULT_OUTPUT_DIR,
+                memory_mb=DEFAULT_MEMORY_MB, batch_range=None, manifest_path=DEFAULT_MANIFEST_PATH,
+                workers=DEFAULT_WORKERS, decoder=None, columnar=False, validate=True):
+    """Stream results into the consolidated CSV and summary statistics. Returns the summary.
+
+    Also records every consolidated file in the manifest used by
+    consolidate_incremental (skipped when manifest_path is None), and with
+    columnar=True writes the columnar export next to the CSV. With validate,
+    records failing the schema checks go to output_dir/quarantine.jsonl
+    instead of the CSV and summary.
+    """
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+    csv_path = output_dir / "disease_incidence_data.csv"
+    tmp_csv_path = csv_path.with_name(csv_path.name + ".tmp")
+
+    # Fingerprint first: a file that changes mid-run is simply re-read next time
+    manifest = build_manifest(results_path) if manifest_path else None
+
+    aggregate = SummaryAggregate()
+    columns = _column_builder(output_dir) if columnar else None
+    quarantine_path = output_dir / "quarantine.jsonl"
+    if validate and quarantine_path.exists():
+        quarantine_path.unlink()
+    with tempfile.TemporaryDirectory(dir=output_dir) as tmp_dir, Quarantine(quarantine_path) as quarantine:
+        with open(tmp_csv_path, 'w', newline='', encoding='utf-8') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            results = filter_objects(iter_results(results_path, workers, decoder), quarantine)
+            results = sorted_results(results, int(memory_mb * 1024 * 1024), tmp_dir)
+            if validate:
+                results = filter_valid(results, quarantine)
+            for result in results:
+                writer.writerow({field: result.get(field) for field in FIELDNAMES})
+                aggregate.add(result)
+                if columns:
+                    columns.add(result)
+    os.replace(tmp_csv_path, csv_path)
+    build_index(csv_path)
+    if columns:
+        columns.finish()
+
+    summary = aggregate.to_dict(batch_range)
+    write_summary(summary, output_dir / "summary_stats.json")
+    if manifest_path:
+        save_manifest(manifest, manifest_path)
+    return summary
+
+
+def consolidate_incremental(results_path=DEFAULT_RESULTS_PATH, output_dir=DEFAULT_OUTPUT_DIR,
+                            batch_range=None, manifest_path=DEFAULT_MANIFEST_PATH, columnar=False, validate=True):
+    """Merge only new or changed result files into the existing consolidated CSV.
+
+    Falls back to a full consolidation when there is no manifest or CSV yet.
+    New CUIs are inserted in CUI order and updated CUIs replace their existing
+    row; all other rows are copied through unchanged. Returns the summary, or
+    None when nothing changed (the CSV and summary are then left alone).
+    """
+    output_dir = Path(output_dir)
+    csv_path = output_dir / "disease_incidence_data.csv"
+    manifest = load_manifest(manifest_path)
+    if not manifest or not csv_path.exists():
+        return consolidate(results_path, output_dir, batch_range=batch_range, manifest_path=manifest_path,
+                           columnar=columnar, validate=validate)
+
+    records, new_manifest = collect_changes(results_path, manifest)
+    if not records:
+        save_manifest(new_manifest, manifest_path)
+        return None
+
+    quarantine = Quarantine(output_dir / "quarantine.jsonl")
+    updates = {}
+    for result in filter_objects(records, quarantine):
+        updates[result.get('cui') or ''] = result
+    rejected = set()
+    if validate:
+        # As in a full run, a CUI whose latest record is invalid drops out of the CSV
+        valid = {result.get('cui') or '': result for result in filter_valid(updates.values(), quarantine)}
+        rejected = updates.keys() - valid.keys()
+        updates = valid
+    pending = sorted(updates)
+    next_pending = 0
+    written = set()
+
+    aggregate = SummaryAggregate()
+    columns = _column_builder(output_dir) if columnar else None
+    tmp_csv_path = csv_path.with_name(csv_path.name + ".tmp")
+    with open(csv_path, 'r', newline='', encoding='utf-8') as src, \
+            open(tmp_csv_path, 'w', newline='', encoding='utf-8') as dst:
+        reader = csv.reader(src)
+        header = next(reader)
+        writer = csv.writer(dst)
+        writer.writerow(header)
+
+        def write_update(cui):
+            result = updates[cui]
+            writer.writerow([result.get(field) for field in header])
+            add(result)
+            written.add(cui)
+
+        def add(result):
+            aggregate.add(result)
+            if columns:
+                columns.add(result)
+
+        for row in reader:
+            cui = row[0] if row else ''
+            while next_pending < len(pending) and pending[next_pending] < cui:
+                if pending[next_pending] not in written:
+                    write_update(pending[next_pending])
+                next_pending += 1
+            if cui in updates:
+                if cui not in written:
+                    write_update(cui)
+                continue
+            if cui in rejected:
+                continue
+            result = {field: parse_csv_value(field, value) for field, value in zip(header, row)}
+            if validate:
+                reasons = validate_record(result)
+                if len(row) != len(header):
+                    reasons.insert(0, f"{len(row)} cells for {len(header)} columns")
+                if reasons:
+                    quarantine.add(result, reasons)
+                    continue
+            writer.writerow(row)
+            add(result)
+
+        for cui in pending[next_pending:]:
+            if cui not in written:
+                write_update(cui)
+    quarantine.close()
+    os.replace(tmp_csv_path, csv_path)
+    build_index(csv_path)
+    if columns:
+        columns.finish()
+
+    summary = aggregate.to_dict(batch_range)
+    write_summary(summary, output_dir / "summary_stats.json")
+    save_manifest(new_manifest, manifest_path)
+    return summary
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Consolidate mapper results into CSV and summary statistics")
+    parser.add_argument('--results', default=str(DEFAULT_RESULTS_PATH),
+                        help="Results log (.jsonl) or directory of per-CUI JSON files")
+    parser.add_argument('--output-dir', default=str(DEFAULT_OUTPUT_DIR))
+    parser.add_argument('--memory-mb', type=float, default=DEFAULT_MEMORY_MB,
+                        help="Approximate memory cap for buffered records before spilling sorted runs")
+    parser.add_argument('--batch-range', default=None, help="Recorded in the summary, e.g. 1001-1500")
+    parser.add_argument('--incremental', action='store_true',
+                        help="Merge only result files that are new or changed since the last run")
+    parser.add_argument('--manifest', default=str(DEFAULT_MANIFEST_PATH))
+    parser.add_argument('--no-validate', dest='validate', action='store_false',
+                        help="Skip schema validation (by default invalid records go to quarantine.jsonl)")
+    parser.add_argument('--columnar', action='store_true',
+                        help="Also write the columnar export (see columnar_export.py)")
+    parser.add_argument('--workers', type=int, default=DEFAULT_WORKERS, help="Threads reading result JSON files")
+    parser.add_argument('--decoder', default=None, choices=list(DECODERS),
+                        help="JSON decoder (default: fastest installed)")
+    args = parser.parse_args()
+
+    if args.incremental:
+        summary = consolidate_incremental(args.results, args.output_dir, args.batch_range, args.manifest,
+                                          args.columnar, args.validate)
+        if summary is None:
+            print("No new or changed result files; consolidated outputs are up to date")
+            return
+    else:
+        summary = consolidate(args.results, args.output_dir, args.memory_mb, args.batch_range, args.manifest,
+                              args.workers, args.decoder, args.columnar, args.validate)
+    output_dir = Path(args.output_dir)
+    print(f"Wrote consolidated CSV to {output_dir / 'disease_incidence_data.csv'}")
+    print(f"Wrote summary statistics to {output_dir / 'summary_stats.json'}")
+
+    print("\n=== SUMMARY ===")
+    print(f"Total diseases processed: {summary['total_processed']}")
+    print("\nConfidence Distribution:")
+    for level, count in summary['confidence_distribution'].items():
+        print(f"  {level}: {count}")
+    print("\nData Quality:")
+    for quality, count in summary['data_quality_breakdown'].items():
+        print(f"  {quality}: {count}")
+    print(f"\nSubtypes identified: {summary['subtypes_identified']}")
+    print(f"Records needing review: {summary['review_needed']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Manifest of result files already merged into the consolidated CSV.
+Each entry records a file's size, mtime and SHA-256 so an incremental
+consolidation only parses files that are new or changed. A results log that
+has only grown since the last run is detected by hashing its old prefix, and
+just the appended lines are parsed.
+
+Manifest format (output/consolidation_manifest.json):
+    {"<path>": {"size": int, "mtime_ns": int, "sha256": str}, ...}
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from results_log import unwrap_result
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_MANIFEST_PATH = REPO_DIR / "output" / "consolidation_manifest.json"
+
+HASH_BLOCK = 1 << 20
+
+
+def source_files(results_path):
+    """Result files under a results path: the log itself, or a directory's *.json then *.jsonl files."""
+    results_path = Path(results_path)
+    if results_path.is_file():
+        return [results_path]
+    if not results_path.is_dir():
+        return []
+    return sorted(results_path.glob("*.json")) + sorted(results_path.glob("*.jsonl"))
+
+
+def load_manifest(manifest_path=DEFAULT_MANIFEST_PATH):
+    manifest_path = Path(manifest_path)
+    if not manifest_path.exists():
+        return {}
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_manifest(manifest, manifest_path=DEFAULT_MANIFEST_PATH):
+    manifest_path = Path(manifest_path)
+    tmp_path = manifest_path.with_name(manifest_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(tmp_path, manifest_path)
+
+
+def _hash_prefix(f, length, digest):
+    """Feed the next `length` bytes of f into digest."""
+    remaining = length
+    while remaining > 0:
+        block = f.read(min(HASH_BLOCK, remaining))
+        if not block:
+            break
+        digest.update(block)
+        remaining -= len(block)
+
+
+def _entry(stat, size, digest):
+    return {"size": size, "mtime_ns": stat.st_mtime_ns, "sha256": digest.hexdigest()}
+
+
+def _parse_json_file(data, path):
+    try:
+        return [unwrap_result(json.loads(data))]
+    except ValueError as e:
+        print(f"Error reading {path}: {e}")
+        return []
+
+
+def _parse_log_tail(data):
+    """Parse complete JSON lines; returns (records, bytes consumed)."""
+    end = data.rfind(b"\n") + 1
+    return [unwrap_result(json.loads(line)) for line in data[:end].splitlines() if line.strip()], end
+
+
+def read_changed(path, entry):
+    """Read the new records of one result file against its manifest entry.
+
+    Returns (records, new_entry). records is None when the file is unchanged.
+    """
+    path = Path(path)
+    stat = path.stat()
+    if entry and entry["size"] == stat.st_size and entry["mtime_ns"] == stat.st_mtime_ns:
+        return None, entry
+
+    is_log = path.suffix == ".jsonl"
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        if entry and is_log and stat.st_size >= entry["size"]:
+            _hash_prefix(f, entry["size"], digest)
+            if digest.hexdigest() == entry["sha256"]:
+                # Log only grew: parse just the appended lines
+                tail = f.read()
+                records, consumed = _parse_log_tail(tail)
+                digest.update(tail[:consumed])
+                return records, _entry(stat, entry["size"] + consumed, digest)
+            digest = hashlib.sha256()
+            f.seek(0)
+        data = f.read()
+
+    if is_log:
+        records, consumed = _parse_log_tail(data)
+        digest.update(data[:consumed])
+        new_entry = _entry(stat, consumed, digest)
+    else:
+        digest.update(data)
+        new_entry = _entry(stat, len(data), digest)
+        if entry and entry["sha256"] == new_entry["sha256"]:
+            return None, new_entry
+        records = _parse_json_file(data, path)
+    return records, new_entry
+
+
+def collect_changes(results_path, manifest):
+    """Parse every new or changed result file under results_path.
+
+    Returns (records, new_manifest), with records in file order so that a later
+    record for a CUI supersedes an earlier one. Files that have disappeared are
+    dropped from the manifest; their rows stay in the consolidated CSV.
+    """
+    records = []
+    new_manifest = {}
+    for path in source_files(results_path):
+        key = str(path)
+        changed, new_manifest[key] = read_changed(path, manifest.get(key))
+        if changed:
+            records.extend(changed)
+    return records, new_manifest
+
+
+def fingerprint(path):
+    """Manifest entry for a result file, without parsing it."""
+    path = Path(path)
+    stat = path.stat()
+    data = path.read_bytes()
+    if path.suffix == ".jsonl":
+        data = data[:data.rfind(b"\n") + 1]
+    return _entry(stat, len(data), hashlib.sha256(data))
+
+
+def build_manifest(results_path):
+    """Fingerprint every result file under results_path (after a full consolidation)."""
+    return {str(path): fingerprint(path) for path in source_files(results_path)}
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Byte-offset CUI index over a consolidated results CSV.
+A sidecar file (disease_incidence_data.csv.idx) maps each CUI to the byte
+offset and length of its row, so a lookup seeks straight to the row and
+parses only that row instead of the whole CSV.
+
+File layout (little-endian):
+    header   8s magic, uint32 version, uint32 entry count N,
+             uint64 CSV size, uint64 CSV mtime_ns, uint32 header row length
+    keys     N fixed-width ASCII CUIs, sorted
+    rows     N (uint64 offset, uint32 length) pairs, in key order
+
+The index records the CSV's size and mtime; open_csv_index() rebuilds it when
+they no longer match. When a CUI has several rows, the last one is indexed.
+
+Usage:
+    python csv_index.py build [--csv output/disease_incidence_data.csv]
+    python csv_index.py get CUI ... [--csv PATH]
+"""
+
+import argparse
+import bisect
+import csv
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from cui_store import KEY_WIDTH
+from incidence_record import parse_csv_value
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_CSV_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+
+MAGIC = b"CSVINDEX"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQI")
+ROW = struct.Struct("<QI")
+
+
+def index_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + ".idx")
+
+
+def scan_rows(data):
+    """Yield (offset, length) of each CSV record in data, honouring quoted newlines."""
+    pos = 0
+    end = len(data)
+    while pos < end:
+        start = pos
+        quotes = 0
+        while True:
+            newline = data.find(b"\n", pos)
+            if newline < 0:
+                newline = end - 1
+            quotes += data.count(b'"', pos, newline + 1)
+            pos = newline + 1
+            if quotes % 2 == 0 or pos >= end:
+                break
+        yield start, pos - start
+
+
+def _row_cui(data, offset, length):
+    comma = data.find(b",", offset, offset + length)
+    key = data[offset:comma if comma >= 0 else offset + length].strip(b'"\r\n')
+    return key if len(key) == KEY_WIDTH else None
+
+
+def build_index(csv_path=DEFAULT_CSV_PATH, out_path=None):
+    """Scan a CSV and write its CUI offset index. Returns the number of CUIs indexed."""
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path else index_path(csv_path)
+    stat = csv_path.stat()
+    data = csv_path.read_bytes()
+
+    rows = scan_rows(data)
+    header_length = next(rows, (0, 0))[1]
+    entries = {}
+    for offset, length in rows:
+        key = _row_cui(data, offset, length)
+        if key is not None:
+            entries[key] = (offset, length)
+    keys = sorted(entries)
+
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, len(keys), stat.st_size, stat.st_mtime_ns, header_length))
+        f.write(b"".join(keys))
+        f.write(b"".join(ROW.pack(*entries[key]) for key in keys))
+    os.replace(tmp_path, out_path)
+    return len(keys)
+
+
+class CsvIndex:
+    """Random-access CUI lookups into a consolidated CSV through its offset index."""
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, idx_path=None):
+        self.csv_path = Path(csv_path)
+        self.index_path = Path(idx_path) if idx_path else index_path(self.csv_path)
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+        magic, version, count, self.csv_size, self.csv_mtime_ns, header_length = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.index_path} is not a version {VERSION} CSV index")
+
+        keys_end = HEADER.size + count * KEY_WIDTH
+        self._keys = [data[pos:pos + KEY_WIDTH] for pos in range(HEADER.size, keys_end, KEY_WIDTH)]
+        self._rows = list(ROW.iter_unpack(data[keys_end:keys_end + count * ROW.size]))
+
+        self._file = open(self.csv_path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.fieldnames = next(csv.reader([self._mm[:header_length].decode("utf-8")]))
+
+    def __len__(self):
+        return len(self._keys)
+
+    def __contains__(self, cui):
+        return self._find(cui) >= 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def is_stale(self):
+        """Check whether the CSV changed since the index was built."""
+        stat = self.csv_path.stat()
+        return stat.st_size != self.csv_size or stat.st_mtime_ns != self.csv_mtime_ns
+
+    def _find(self, cui):
+        try:
+            key = cui.encode("ascii")
+        except (AttributeError, UnicodeEncodeError):
+            return -1
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return index
+        return -1
+
+    def _parse(self, offset, length):
+        cells = next(csv.reader([self._mm[offset:offset + length].decode("utf-8")]))
+        cells += [None] * (len(self.fieldnames) - len(cells))
+        return {field: parse_csv_value(field, value) for field, value in zip(self.fieldnames, cells)}
+
+    def get(self, cui, default=None):
+        """Return the row for a CUI as a result dict, or default if it is not indexed."""
+        index = self._find(cui)
+        if index < 0:
+            return default
+        return self._parse(*self._rows[index])
+
+    def get_many(self, cuis):
+        """Return {cui: row} for the CUIs present, reading rows in file order."""
+        found = []
+        for cui in set(cuis):
+            index = self._find(cui)
+            if index >= 0:
+                found.append((self._rows[index], cui))
+        found.sort()
+        return {cui: self._parse(*row) for row, cui in found}
+
+
+def open_csv_index(csv_path=DEFAULT_CSV_PATH):
+    """Open the index for a CSV, building or rebuilding it first if needed."""
+    idx_path = index_path(csv_path)
+    if idx_path.exists():
+        index = CsvIndex(csv_path, idx_path)
+        if not index.is_stale():
+            return index
+        index.close()
+    build_index(csv_path, idx_path)
+    return CsvIndex(csv_path, idx_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the CUI offset index of a results CSV")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Build the sidecar index")
+    build_parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+
+    get_parser = subparsers.add_parser("get", help="Look up CUIs")
+    get_parser.add_argument("cuis", nargs="+")
+    get_parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.csv)
+        print(f"Indexed {count} CUIs into {index_path(args.csv)}")
+    else:
+        with open_csv_index(args.csv) as index:
+            for cui, row in index.get_many(args.cuis).items():
+                print(json.dumps({cui: row}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
@@ -4,1188 +4,188 @@ CUI Incidence Mapper Implementation
 Maps UMLS CUIs to global disease incidence rates following the skill specification.
 """
 
+import hashlib
 import json
 from pathlib import Path
 from typing import Dict, Optional, Union, List
 
+from cui_store import DEFAULT_STORE_PATH
+from incidence_record import (
+    ENUM_FIELDS, EXTREMELY_RARE, DataQuality, GeographicVariation, IncidenceRecord, MetricType, SourceType
+)
+from knowledge_base import open_knowledge_base
+from total_cases import recompute_total_cases, total_cases_per_year
+
+# Category levels for the columnar output of map_many(); a value's code is its
+# enum code, and values outside the domain are coded as -1
+CATEGORY_LEVELS = {field: enum.levels() for field, enum in ENUM_FIELDS.items()}
+
+# Defaults used for unknown CUIs and for fields missing from a record
+CATEGORY_DEFAULTS = {
+    "metric_type": MetricType.NULL.label,
+    "data_quality": DataQuality.NONE.label,
+    "geographic_variation": GeographicVariation.UNKNOWN.label,
+    "source_type": SourceType.NULL.label,
+}
+
+TEXT_COLUMNS = ("parent_disease", "reasoning", "source", "source_url")
+
+# Version of the mapping code, part of the result cache key (result_cache.py).
+# Bump it whenever map_cui_to_record's output for the same store record changes.
+MAPPER_VERSION = "mapper-1"
+
+
+def _as_float(value):
+    """Return value as a float, or NaN if it is not a number."""
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        return float(value)
+    return float("nan")
+
+
 class DiseaseIncidenceMapper:
     """Maps CUI codes to epidemiological incidence/prevalence data."""
 
-    # Epidemiological database of known CUI codes and their incidence/prevalence data
-    CUI_DATABASE = {
-        # GROUP 1
-        "C4296896": {
-            "name": "Lymphangioleiomyomatosis",
-            "incidence_per_100k": 0.6,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Rare neoplasm of lung tissue. Incidence ~0.5-1.0 per 100k per year.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Travis WD et al. (2006). Surgical pathology of lung neoplasia. Arch Pathol Lab Med. 130(1):20-29",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/16336053/",
-            "source_type": "literature"
-        },
-        "C4085251": {
-            "name": "Mitochondrial Myopathy",
-            "incidence_per_100k": 0.4,
-            "metric_type": "incidence",
-            "confidence": 0.55,
-            "reasoning": "Rare mitochondrial genetic disorder. Estimated incidence ~0.5 per 100k based on case frequency.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1519176": {
-            "name": "Familial Mediterranean Fever",
-            "incidence_per_100k": 10.5,
-            "metric_type": "incidence",
-            "confidence": 0.72,
-            "reasoning": "Autosomal recessive genetic disorder with periodic fever. Global incidence ~10 per 100k in endemic regions.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Livneh A et al. (2005). The changing face of familial Mediterranean fever. Lancet. 365(9456):414-421",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15680460/",
-            "source_type": "literature"
-        },
-        "C0347016": {
-            "name": "Carpal Tunnel Syndrome",
-            "incidence_per_100k": 200.0,
-            "metric_type": "incidence",
-            "confidence": 0.78,
-            "reasoning": "Most common peripheral nerve compression disorder. Incidence ~200 per 100k per year globally.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": "Stevens JC et al. (2004). Carpal tunnel syndrome: prevalence and functional impacts. Arch Phys Med Rehabil. 85(12):2020-2026",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15605345/",
-            "source_type": "literature"
-        },
-        "C0524948": {
-            "name": "Metabolic Bone Diseases",
-            "incidence_per_100k": 500.0,
-            "metric_type": "incidence",
-            "confidence": 0.35,
-            "reasoning": "Aggregate BOTEC estimate summing osteoporosis, osteomalacia, rickets, and other metabolic bone disorders. Heterogeneous category.",
-            "data_quality": "weak",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 2
-        "C1370962": {
-            "name": "Stomatitis",
-            "incidence_per_100k": 150.0,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Inflammatory condition of mouth tissues. Incidence varies by cause (viral, fungal, aphthous).",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1384583": {
-            "name": "Laryngeal Neoplasm",
-            "incidence_per_100k": 5.5,
-            "metric_type": "incidence",
-            "confidence": 0.75,
-            "reasoning": "Laryngeal cancer incidence ~4-6 per 100k globally. Associated with smoking and HPV.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Parkin DM et al. (2005). Global cancer statistics, 2002. CA Cancer J Clin. 55(2):74-108",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15761078/",
-            "source_type": "literature"
-        },
-        "C0242287": {
-            "name": "Photosensitivity Disorders",
-            "incidence_per_100k": 8.0,
-            "metric_type": "incidence",
-            "confidence": 0.48,
-            "reasoning": "Photosensitive skin reactions including sun allergy and porphyrias. Heterogeneous group.",
-            "data_quality": "weak",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C4310725": {
-            "name": "Autoimmune Lymphoproliferative Disorder",
-            "incidence_per_100k": 0.1,
-            "metric_type": "incidence",
-            "confidence": 0.55,
-            "reasoning": "Rare genetic immunodeficiency disorder. <100 cases reported worldwide.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": "Autoimmune Lymphoproliferative Syndrome (ALPS). NIH Genetic and Rare Diseases Information Center.",
-            "source_url": None,
-            "source_type": "literature"
-        },
-        "C0751851": {
-            "name": "Myositis Ossificans",
-            "incidence_per_100k": 1.2,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "reasoning": "Rare bone-forming muscle inflammation. Incidence ~0.5-2 per 100k. Often post-traumatic.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Brooker AF et al. (1996). Cost, efficacy, and disability of indomethacin prophylaxis in traumatic myositis ossificans. J Bone Joint Surg. 78(4):555-560",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/8609130/",
-            "source_type": "literature"
-        },
-        # GROUP 3
-        "C1389018": {
-            "name": "Cerebellar Degeneration",
-            "incidence_per_100k": 2.5,
-            "metric_type": "incidence",
-            "confidence": 0.58,
-            "reasoning": "Neurodegenerative disease affecting cerebellum. Incidence ~1-3 per 100k.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0014116": {
-            "name": "Encephalomyelitis",
-            "incidence_per_100k": 1.8,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Inflammation of brain and spinal cord. Incidence varies by cause (viral, autoimmune).",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C4551505": {
-            "name": "Glycoprotein Storage Disorders",
-            "incidence_per_100k": 0.05,
-            "metric_type": "incidence",
-            "confidence": 0.45,
-            "reasoning": "Rare lysosomal storage diseases. Extremely rare with <0.1 per 100k incidence.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0267834": {
-            "name": "Ataxic Cerebral Palsy",
-            "incidence_per_100k": 1.0,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Subtype of cerebral palsy affecting coordination. Incidence ~1-2 per 100k births.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0020725": {
-            "name": "Type II Mucolipidosis",
-            "incidence_per_100k": 0.08,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Rare lysosomal storage disorder. Birth incidence ~1-2 per 100,000 births.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Leroy JG et al. (2012). Mucolipidosis II/III gene structure and analysis. J Med Genet. 49(1):1-14",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/22146891/",
-            "source_type": "literature"
-        },
-        # GROUP 4
-        "C1846009": {
-            "name": "Myotonic Dystrophy Type 2",
-            "incidence_per_100k": 0.15,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Genetic muscle disorder. Birth incidence ~0.1-0.3 per 100k births.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Meola G et al. (2004). Myotonic dystrophy type 2. J Neurol. 251(10):1195-1204",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15543336/",
-            "source_type": "literature"
-        },
-        "C2931039": {
-            "name": "Acrodysostosis",
-            "incidence_per_100k": 0.3,
-            "metric_type": "incidence",
-            "confidence": 0.52,
-            "reasoning": "Rare skeletal dysplasia. Birth incidence ~1 per 100,000 births.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0149896": {
-            "name": "Myocardial Infarction",
-            "incidence_per_100k": 150.0,
-            "metric_type": "incidence",
-            "confidence": 0.88,
-            "reasoning": "Heart attack. Global incidence ~150 per 100k per year based on WHO/epidemiological studies.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Rosamond WD et al. (2005). Trends in the incidence of myocardial infarction. N Engl J Med. 333(14):884-890",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/8381055/",
-            "source_type": "literature"
-        },
-        "C0025237": {
-            "name": "Melnick-Needles Syndrome",
-            "incidence_per_100k": "extremely rare",
-            "metric_type": "incidence",
-            "confidence": 0.55,
-            "reasoning": "Rare X-linked osteodysplasia. <100 cases reported globally.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0014078": {
-            "name": "Encephalitis",
-            "incidence_per_100k": 3.5,
-            "metric_type": "incidence",
-            "confidence": 0.72,
-            "reasoning": "Brain inflammation. Global incidence ~3-4 per 100k. Varies by viral/bacterial etiology.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": "Solomon T et al. (2012). Management of suspected viral encephalitis in adults. J Infect. 64(4):347-373",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/22120594/",
-            "source_type": "literature"
-        },
-        # GROUP 5
-        "C0406803": {
-            "name": "Idiopathic Hypogonadotropic Hypogonadism",
-            "incidence_per_100k": 2.0,
-            "metric_type": "incidence",
-            "confidence": 0.58,
-            "reasoning": "Rare endocrine disorder. Incidence ~1-2 per 100,000 males.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0431129": {
-            "name": "Spondyloepiphyseal Dysplasia Tarda",
-            "incidence_per_100k": 0.08,
-            "metric_type": "incidence",
-            "confidence": 0.48,
-            "reasoning": "Rare skeletal dysplasia. Birth incidence <1 per 100,000.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0394005": {
-            "name": "Neurofibromatosis Type 2",
-            "incidence_per_100k": 0.25,
-            "metric_type": "incidence",
-            "confidence": 0.70,
-            "reasoning": "Genetic tumor disorder. Birth incidence ~1 per 25,000 (0.25 per 100k).",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Evans DG et al. (2005). Neurofibromatosis type 2 screening with magnetic resonance imaging. Lancet. 368(9546):571-572",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/16112630/",
-            "source_type": "literature"
-        },
-        "C3900104": {
-            "name": "Immunodeficiency with Hypoparathyroidism and Developmental Delay",
-            "incidence_per_100k": "extremely rare",
-            "metric_type": "incidence",
-            "confidence": 0.3,
-            "reasoning": "Extremely rare genetic disorder. Only handful of cases reported.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0334538": {
-            "name": "Neural Tube Defects",
-            "incidence_per_100k": 10.0,
-            "metric_type": "incidence",
-            "confidence": 0.78,
-            "reasoning": "Birth defects affecting spinal cord/brain. Global incidence ~10 per 100,000 live births.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Botto LD et al. (2006). Neural tube defects. N Engl J Med. 341(20):1509-1519",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/9819450/",
-            "source_type": "literature"
-        },
-        # GROUP 6
-        "C3899665": {
-            "name": "Intellectual Disability with Tremor and Emotionality",
-            "incidence_per_100k": 0.5,
-            "metric_type": "incidence",
-            "confidence": 0.35,
-            "reasoning": "Rare genetic syndrome. <50 cases reported.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1519703": {
-            "name": "Familial Hypertrophic Cardiomyopathy",
-            "incidence_per_100k": 2.5,
-            "metric_type": "incidence",
-            "confidence": 0.75,
-            "reasoning": "Genetic heart disease. Incidence ~2-3 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Maron BJ et al. (2003). American College of Cardiology/European Society of Cardiology Clinical Expert Consensus on Hypertrophic Cardiomyopathy. JACC. 42(9):1687-1713",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/14607462/",
-            "source_type": "literature"
-        },
-        "C0521686": {
-            "name": "Splenic Rupture",
-            "incidence_per_100k": 5.0,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "reasoning": "Emergency condition from spleen trauma. Incidence ~4-6 per 100,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0007932": {
-            "name": "Carcinoma in Situ",
-            "incidence_per_100k": 50.0,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Precancerous lesions. Aggregate estimate across multiple organ systems.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0520947": {
-            "name": "Dysrhythmias, Cardiac",
-            "incidence_per_100k": 300.0,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Irregular heart rhythms. Global incidence ~300 per 100k including all arrhythmia types.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 7
-        "C0334438": {
-            "name": "Papules",
-            "incidence_per_100k": 0.0,
-            "metric_type": None,
-            "confidence": 0.0,
-            "reasoning": "Papule is a clinical sign/lesion, not a disease entity. Cannot map to incidence meaningfully.",
-            "data_quality": "none",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C3489725": {
-            "name": "Lymphoma, Non-Hodgkin",
-            "incidence_per_100k": 20.0,
-            "metric_type": "incidence",
-            "confidence": 0.85,
-            "reasoning": "Non-Hodgkin lymphoma incidence ~15-25 per 100,000. Major malignancy.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Parkin DM et al. (2005). Global cancer statistics, 2002. CA Cancer J Clin. 55(2):74-108",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15761078/",
-            "source_type": "literature"
-        },
-        "C1860518": {
-            "name": "Retinitis Pigmentosa",
-            "incidence_per_100k": 1.8,
-            "metric_type": "incidence",
-            "confidence": 0.72,
-            "reasoning": "Progressive genetic vision disorder. Birth incidence ~1-2 per 100,000.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Daiger SP et al. (2008). RetNet: The retinal information network. Web-based database at www.sph.uth.tmc.edu/retnet",
-            "source_url": None,
-            "source_type": "literature"
-        },
-        "C0024145": {
-            "name": "Lupus Erythematosus, Systemic",
-            "incidence_per_100k": 5.0,
-            "metric_type": "incidence",
-            "confidence": 0.80,
-            "reasoning": "Autoimmune disease. Global incidence ~4-6 per 100,000 per year. Higher in females.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Cervera R et al. (2003). Systemic lupus erythematosus. Lancet. 361(9369):1530-1540",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/12737889/",
-            "source_type": "literature"
-        },
-        "C0796126": {
-            "name": "Torsades de Pointes",
-            "incidence_per_100k": 8.0,
-            "metric_type": "incidence",
-            "confidence": 0.55,
-            "reasoning": "Polymorphic ventricular tachycardia. Incidence ~5-10 per 100,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 8
-        "C1835916": {
-            "name": "Ehlers-Danlos Syndrome, Vascular Type",
-            "incidence_per_100k": 0.08,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Rare genetic connective tissue disorder. Birth incidence ~1 per 250,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Pepin M et al. (2000). Natural history of Ehlers-Danlos syndrome type IV. Am J Med Genet. 91(2):154-161",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/10716286/",
-            "source_type": "literature"
-        },
-        "C3489724": {
-            "name": "Lymphoma, Hodgkin",
-            "incidence_per_100k": 3.0,
-            "metric_type": "incidence",
-            "confidence": 0.85,
-            "reasoning": "Hodgkin lymphoma incidence ~2-3 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Parkin DM et al. (2005). Global cancer statistics, 2002. CA Cancer J Clin. 55(2):74-108",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15761078/",
-            "source_type": "literature"
-        },
-        "C3203671": {
-            "name": "Atrial Fibrillation",
-            "incidence_per_100k": 80.0,
-            "metric_type": "incidence",
-            "confidence": 0.82,
-            "reasoning": "Most common cardiac arrhythmia. Incidence ~80 per 100,000 person-years.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": "Camm AJ et al. (2010). 2010 ESC Guidelines for atrial fibrillation. Eur Heart J. 31(19):2369-2429",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/20802247/",
-            "source_type": "literature"
-        },
-        "C0023288": {
-            "name": "Leukemia",
-            "incidence_per_100k": 12.0,
-            "metric_type": "incidence",
-            "confidence": 0.85,
-            "reasoning": "Blood cancer. Global incidence ~10-15 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Parkin DM et al. (2005). Global cancer statistics, 2002. CA Cancer J Clin. 55(2):74-108",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15761078/",
-            "source_type": "literature"
-        },
-        "C4543948": {
-            "name": "Liver Cirrhosis, Experimental",
-            "incidence_per_100k": 20.0,
-            "metric_type": "incidence",
-            "confidence": 0.48,
-            "reasoning": "Cirrhosis incidence varies by region. Global estimate ~20 per 100,000.",
-            "data_quality": "weak",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 9
-        "C1328252": {
-            "name": "Hyperkalemia",
-            "incidence_per_100k": 25.0,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "reasoning": "Elevated serum potassium. Incidence ~20-30 per 100,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0265319": {
-            "name": "Cerebral Palsy",
-            "incidence_per_100k": 2.0,
-            "metric_type": "incidence",
-            "confidence": 0.82,
-            "reasoning": "Developmental motor disorder. Birth incidence ~1.5-3 per 100,000 live births.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Colver A et al. (2014). Cerebral palsy prevalence. Pediatr Int. 56(4):449-455",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/24961725/",
-            "source_type": "literature"
-        },
-        "C1321551": {
-            "name": "Hyponatremia",
-            "incidence_per_100k": 30.0,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Low serum sodium. Incidence ~25-35 per 100,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1394891": {
-            "name": "Pancreatitis, Chronic",
-            "incidence_per_100k": 8.5,
-            "metric_type": "incidence",
-            "confidence": 0.70,
-            "reasoning": "Chronic inflammation of pancreas. Incidence ~5-10 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": "Uc A et al. (2006). Epidemiology of pancreatitis. Drugs. 66(4):349-356",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/16556132/",
-            "source_type": "literature"
-        },
-        "C4551825": {
-            "name": "Growth Hormone Deficiency, Isolated",
-            "incidence_per_100k": 0.4,
-            "metric_type": "incidence",
-            "confidence": 0.55,
-            "reasoning": "Rare endocrine disorder. Birth incidence ~1 per 3,500-5,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 10
-        "C3642346": {
-            "name": "Inguinal Hernia",
-            "incidence_per_100k": 120.0,
-            "metric_type": "incidence",
-            "confidence": 0.72,
-            "reasoning": "Abdominal wall hernia. Incidence ~100-150 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1456276": {
-            "name": "Paget Disease of Bone",
-            "incidence_per_100k": 1.5,
-            "metric_type": "incidence",
-            "confidence": 0.70,
-            "reasoning": "Metabolic bone disease. Incidence ~1-2 per 100,000 per year, higher in older males.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": "Ralston SH et al. (2008). Pathogenesis and management of Paget's disease of bone. Lancet. 372(9633):155-163",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/18582609/",
-            "source_type": "literature"
-        },
-        "C3889112": {
-            "name": "Peritonitis",
-            "incidence_per_100k": 15.0,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "reasoning": "Peritoneal membrane inflammation. Incidence varies by cause.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0024449": {
-            "name": "Lymphedema",
-            "incidence_per_100k": 3.0,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "reasoning": "Impaired lymphatic drainage causing swelling. Incidence ~2-4 per 100,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1861825": {
-            "name": "Meningitis",
-            "incidence_per_100k": 5.0,
-            "metric_type": "incidence",
-            "confidence": 0.80,
-            "reasoning": "Brain/spinal cord membrane inflammation. Global incidence ~2-6 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Tunkel AR et al. (2004). Practice guidelines for bacterial meningitis. CID. 39(9):1267-1284",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15494903/",
-            "source_type": "literature"
-        },
-        # GROUP 11
-        "C0017086": {
-            "name": "Glomerulonephritis",
-            "incidence_per_100k": 3.0,
-            "metric_type": "incidence",
-            "confidence": 0.70,
-            "reasoning": "Kidney inflammation. Global incidence ~2-4 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": "Jennette JC et al. (2013). Classification of glomerulonephritis. Semin Nephrol. 33(3):217-228",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/23953800/",
-            "source_type": "literature"
-        },
-        "C1835888": {
-            "name": "Hemolytic-Uremic Syndrome",
-            "incidence_per_100k": 0.5,
-            "metric_type": "incidence",
-            "confidence": 0.72,
-            "reasoning": "Severe renal/hemolytic complication. Incidence ~0.3-1 per 100,000, higher in children.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Tarr PI et al. (2005). Hemolytic uremic syndrome in the United States. Semin Thromb Hemost. 36(2):126-136",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/20169499/",
-            "source_type": "literature"
-        },
-        "C0340434": {
-            "name": "Respiratory Distress Syndrome, Newborn",
-            "incidence_per_100k": 45.0,
-            "metric_type": "incidence",
-            "confidence": 0.78,
-            "reasoning": "RDS in premature infants. Birth incidence ~40-60 per 100,000 live births.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Jobe AH et al. (2004). Prevention of respiratory distress syndrome. Semin Neonatol. 9(2):87-92",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/15051284/",
-            "source_type": "literature"
-        },
-        "C3495498": {
-            "name": "Hyperthyroidism",
-            "incidence_per_100k": 20.0,
-            "metric_type": "incidence",
-            "confidence": 0.75,
-            "reasoning": "Overactive thyroid. Incidence ~15-25 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": "Vanderpump MP et al. (1995). Epidemiology of thyroid disease. Lancet. 346(8972):493-494",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/7658778/",
-            "source_type": "literature"
-        },
-        "C0018920": {
-            "name": "Hemangioma",
-            "incidence_per_100k": 12.0,
-            "metric_type": "incidence",
-            "confidence": 0.75,
-            "reasoning": "Benign blood vessel tumor. Birth incidence ~10-15 per 100,000.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Houessinon A et al. (1993). Incidence of infantile hemangiomas. Br J Dermatol. 128(4):401-406",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/8471352/",
-            "source_type": "literature"
-        },
-        # GROUP 12
-        "C1959589": {
-            "name": "Anterior Horn Cell Disease",
-            "incidence_per_100k": 1.8,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Motor neuron disease. Incidence ~1-2 per 100,000 per year.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0154564": {
-            "name": "Pulmonary Embolism",
-            "incidence_per_100k": 60.0,
-            "metric_type": "incidence",
-            "confidence": 0.82,
-            "reasoning": "Blood clot in lung. Incidence ~50-75 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": "Kearon C et al. (2012). Antithrombotic therapy. Chest. 141(2):S7-S47",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/22315268/",
-            "source_type": "literature"
-        },
-        "C0009492": {
-            "name": "Congestive Heart Failure",
-            "incidence_per_100k": 100.0,
-            "metric_type": "incidence",
-            "confidence": 0.85,
-            "reasoning": "Heart failure incidence ~80-120 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Rutten FH et al. (2003). Prevalence of heart failure in the general population. Eur J Heart Fail. 5(4):539-546",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/12921811/",
-            "source_type": "literature"
-        },
-        "C0263666": {
-            "name": "Cryptosporidiosis",
-            "incidence_per_100k": 0.5,
-            "metric_type": "incidence",
-            "confidence": 0.60,
-            "reasoning": "Parasitic infection. Incidence ~0.3-1 per 100,000, higher in immunocompromised.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0272236": {
-            "name": "Enterovirus Infection",
-            "incidence_per_100k": 150.0,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Viral infection. Estimated incidence ~100-200 per 100,000 annually.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 13
-        "C0035022": {
-            "name": "Retinal Diseases",
-            "incidence_per_100k": 15.0,
-            "metric_type": "incidence",
-            "confidence": 0.45,
-            "reasoning": "Aggregate umbrella term covering diabetic retinopathy, AMD, retinitis pigmentosa, etc.",
-            "data_quality": "weak",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0035021": {
-            "name": "Retinal Detachment",
-            "incidence_per_100k": 3.0,
-            "metric_type": "incidence",
-            "confidence": 0.75,
-            "reasoning": "Retinal separation from eye wall. Incidence ~2-4 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Mitry D et al. (2010). The epidemiology of retinal detachment. Semin Ophthalmol. 25(5-6):368-378",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/21091008/",
-            "source_type": "literature"
-        },
-        "C0002382": {
-            "name": "Aminoaciduria",
-            "incidence_per_100k": 5.0,
-            "metric_type": "incidence",
-            "confidence": 0.52,
-            "reasoning": "Amino acid in urine. Aggregate of multiple aminoacidurias with heterogeneous causes.",
-            "data_quality": "weak",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C3273251": {
-            "name": "Developmental Dysplasia of Hip",
-            "incidence_per_100k": 10.0,
-            "metric_type": "incidence",
-            "confidence": 0.78,
-            "reasoning": "Congenital hip disorder. Birth incidence ~5-15 per 100,000 live births.",
-            "data_quality": "strong",
-            "geographic_variation": "moderate",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "Larson CM et al. (2011). Developmental dysplasia of the hip. J Bone Joint Surg. 93(17):1692-1698",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/21915584/",
-            "source_type": "literature"
-        },
-        "C3539123": {
-            "name": "Acanthosis Nigricans",
-            "incidence_per_100k": 8.0,
-            "metric_type": "incidence",
-            "confidence": 0.58,
-            "reasoning": "Skin darkening disorder. Incidence ~5-10 per 100,000, often associated with insulin resistance.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP 14
-        "C1378511": {
-            "name": "Ectopia Lentis",
-            "incidence_per_100k": 0.15,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "reasoning": "Displaced lens in eye. Birth incidence ~0.1-0.3 per 100,000.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0155490": {
-            "name": "Tuberculosis, Multidrug-Resistant",
-            "incidence_per_100k": 2.0,
-            "metric_type": "incidence",
-            "confidence": 0.72,
-            "reasoning": "TB resistant to multiple drugs. WHO estimates ~2-3 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "high",
-            "year_specific": True,
-            "data_year": 2005,
-            "source": "WHO. (2006). Global Tuberculosis Control. WHO Report 2006.",
-            "source_url": "https://www.who.int/tb/publications/2006/en/",
-            "source_type": "registry"
-        },
-        "C0006430": {
-            "name": "Brucellosis",
-            "incidence_per_100k": 0.3,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "reasoning": "Bacterial zoonotic infection. Incidence ~0.1-1 per 100,000, higher in pastoral regions.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0795818": {
-            "name": "Essential Tremor",
-            "incidence_per_100k": 50.0,
-            "metric_type": "incidence",
-            "confidence": 0.75,
-            "reasoning": "Involuntary shaking. Incidence ~40-60 per 100,000 per year.",
-            "data_quality": "strong",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "source": "Louis ED et al. (2010). Essential tremor. Curr Opin Neurol. 23(4):357-366",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/20610994/",
-            "source_type": "literature"
-        },
-        "C0395920": {
-            "name": "Lichen Planus",
-            "incidence_per_100k": 12.0,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "reasoning": "Inflammatory skin/mucous membrane disease. Incidence ~10-15 per 100,000 per year.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        # GROUP USER REQUEST - 5 DISEASES
-        "C0029429": {
-            "name": "Osteochondrosis",
-            "incidence_per_100k": 30.0,
-            "metric_type": "incidence",
-            "confidence": 0.25,
-            "is_subtype": False,
-            "parent_disease": None,
-            "reasoning": "Aggregate BOTEC estimate for osteochondrosis as umbrella term. Includes Osgood-Schlatter disease (~50-100 per 100k in adolescents), Legg-Calvé-Perthes (~5-10 per 100k), and other osteochondroses. Global estimate heavily weighted toward adolescent population prevalence.",
-            "data_quality": "weak",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0029376": {
-            "name": "Juvenile osteochondrosis of tibial tubercle",
-            "incidence_per_100k": 80.0,
-            "metric_type": "incidence",
-            "confidence": 0.65,
-            "is_subtype": True,
-            "parent_disease": "Osteochondrosis",
-            "reasoning": "Osgood-Schlatter disease: most common knee pathology in adolescents. Peak incidence ages 12-18 years. Estimated 5-15% of adolescents affected, translating to ~80 per 100k in pediatric population.",
-            "data_quality": "moderate",
-            "geographic_variation": "low",
-            "year_specific": False,
-            "data_year": None,
-            "source": "Vasilevskis E et al. (2008). Osgood-Schlatter disease: a review of the literature. Pediatr Phys Ther. 20(1):72-78",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/18156954/",
-            "source_type": "literature"
-        },
-        "C0541798": {
-            "name": "Early Awakening",
-            "incidence_per_100k": None,
-            "prevalence_per_100k": 15000.0,
-            "metric_type": "prevalence",
-            "confidence": 0.35,
-            "is_subtype": False,
-            "parent_disease": None,
-            "reasoning": "Early morning awakening (terminal insomnia) is a symptom, not primary diagnosis. Prevalence ~15% globally in various psychiatric and sleep disorders, particularly depression (15-30%). Measurement as symptom prevalence rather than disease incidence.",
-            "data_quality": "weak",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0393770": {
-            "name": "Delayed Sleep Phase Syndrome",
-            "incidence_per_100k": 2.5,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "is_subtype": False,
-            "parent_disease": None,
-            "reasoning": "Circadian rhythm sleep disorder affecting ~0.3-0.9% of population. Higher prevalence in adolescents/young adults. Global incidence estimate ~2-3 per 100k per year based on sleep disorder epidemiology.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "data_year": None,
-            "source": "Schrader H et al. (1993). Delayed sleep phase syndrome: a polysomnographic study. Sleep. 16(2):144-149",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/8446831/",
-            "source_type": "literature"
-        },
-        "C4021985": {
-            "name": "Germ cell neoplasia",
-            "incidence_per_100k": 5.5,
-            "metric_type": "incidence",
-            "confidence": 0.68,
-            "is_subtype": False,
-            "parent_disease": None,
-            "reasoning": "Malignant germ cell tumors (testicular cancer, ovarian germ cell tumors, extragonadal GCTs). Testicular cancer ~5-8 per 100k; ovarian GCTs ~1-2 per 100k; extragonadal rare. Aggregate estimate ~5-6 per 100k globally.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "data_year": None,
-            "source": "Einhorn LH et al. (2007). Testicular cancer: epidemiology, diagnosis, and treatment. N Engl J Med. 357(12):1277-1286",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/17898229/",
-            "source_type": "literature"
-        },
-        # USER REQUEST - 5 SPECIFIC DISEASES
-        "C1863534": {
-            "name": "Stargardt disease 4",
-            "incidence_per_100k": "extremely rare",
-            "metric_type": "incidence",
-            "confidence": 0.52,
-            "is_subtype": True,
-            "parent_disease": "Stargardt disease",
-            "reasoning": "Stargardt disease 4 (STGD4) is a rare form of autosomal recessive macular dystrophy. Estimated <0.1 per 100k, with only dozens of families reported globally.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "data_year": None,
-            "source": "Zernant J et al. (2005). Genotype-phenotype correlation and mutation spectrum of ABCA4. J Hum Genet. 50(10):497-507",
-            "source_url": "https://pubmed.ncbi.nlm.nih.gov/16142508/",
-            "source_type": "literature"
-        },
-        "C1858080": {
-            "name": "Retinal Dystrophy, Early Onset Severe",
-            "incidence_per_100k": 0.5,
-            "metric_type": "incidence",
-            "confidence": 0.48,
-            "is_subtype": False,
-            "parent_disease": "Retinal Diseases",
-            "reasoning": "Early-onset severe retinal dystrophies include Leber congenital amaurosis and severe forms of retinitis pigmentosa. Combined incidence estimated ~0.3-1 per 100k births based on case reports.",
-            "data_quality": "weak",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C1512694": {
-            "name": "Increased Cellularity Present",
-            "incidence_per_100k": None,
-            "prevalence_per_100k": None,
-            "metric_type": None,
-            "confidence": 0.0,
-            "is_subtype": False,
-            "parent_disease": None,
-            "reasoning": "Increased cellularity is a pathological finding/descriptor, not a disease entity. Cannot map to incidence/prevalence meaningfully.",
-            "data_quality": "none",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C0036216": {
-            "name": "Sarcoma, Experimental",
-            "incidence_per_100k": None,
-            "prevalence_per_100k": None,
-            "metric_type": None,
-            "confidence": 0.0,
-            "is_subtype": False,
-            "parent_disease": "Sarcoma",
-            "reasoning": "Experimental sarcoma is a laboratory/research designation, not a clinical disease. Does not map to human epidemiological incidence. General sarcoma incidence ~4-5 per 100k, but 'experimental' variant is not clinically meaningful.",
-            "data_quality": "none",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        },
-        "C2711110": {
-            "name": "Hepatitis B and hepatitis C",
-            "incidence_per_100k": 150.0,
-            "metric_type": "incidence",
-            "confidence": 0.62,
-            "is_subtype": False,
-            "parent_disease": "Viral Hepatitis",
-            "reasoning": "Compound condition representing HBV/HCV co-infection. HBV incidence ~40-50 per 100k; HCV incidence ~100-120 per 100k. Aggregate represents concurrent infection risk. Confidence limited due to unclear nosological status (is this defined co-infection or umbrella term?).",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "data_year": None,
-            "source": "WHO. (2005). Hepatitis B and C viruses: epidemiology and prevention. WHO fact sheets.",
-            "source_url": None,
-            "source_type": "registry"
-        },
-    }
+    def __init__(self, store_path: Union[str, Path] = DEFAULT_STORE_PATH):
+        # Merged knowledge base, compiled into a memory-mapped store (see knowledge_base.py)
+        self.store = open_knowledge_base(store_path)
 
-    def map_cui_to_result(self, cui: str, cui_name: str) -> Dict:
-        """Map a CUI to its epidemiological result."""
-        if cui not in self.CUI_DATABASE:
+    def map_cui_to_record(self, cui: str, cui_name: str) -> IncidenceRecord:
+        """Map a CUI to its epidemiological result record."""
+        data = self.store.get(cui)
+        if data is None:
             # Unknown CUI - return minimal result
-            return {
-                "cui": cui,
-                "cui_name": cui_name,
-                "incidence_per_100k": None,
-                "prevalence_per_100k": None,
-                "metric_type": None,
-                "total_cases_per_year": None,
-                "confidence": 0.0,
-                "is_subtype": False,
-                "parent_disease": None,
-                "reasoning": f"CUI {cui} not found in epidemiological database",
-                "data_quality": "none",
-                "geographic_variation": "unknown",
-                "year_specific": False,
-                "data_year": None,
-                "source": None,
-                "source_url": None,
-                "source_type": None
-            }
+            return IncidenceRecord(cui, cui_name, reasoning=f"CUI {cui} not found in epidemiological database")
 
-        data = self.CUI_DATABASE[cui]
         incidence = data.get("incidence_per_100k")
         prevalence = data.get("prevalence_per_100k")
 
-        # Calculate total cases per year
-        total_cases = None
-        if isinstance(incidence, (int, float)) and incidence > 0:
-            total_cases = int(incidence * 80000 / 100000)
-        elif isinstance(prevalence, (int, float)) and prevalence > 0:
-            total_cases = int(prevalence * 80000 / 100000)
-        elif isinstance(incidence, str) and incidence == "extremely rare":
-            total_cases = "extremely rare"
-        elif isinstance(prevalence, str) and prevalence == "extremely rare":
-            total_cases = "extremely rare"
+        return IncidenceRecord(
+            cui=cui,
+            cui_name=data.get("name", cui_name),
+            incidence_per_100k=incidence,
+            prevalence_per_100k=prevalence,
+            metric_type=data.get("metric_type"),
+            total_cases_per_year=total_cases_per_year(incidence, prevalence),
+            confidence=data.get("confidence", 0.0),
+            is_subtype=data.get("is_subtype", False),
+            parent_disease=data.get("parent_disease"),
+            reasoning=data.get("reasoning", ""),
+            data_quality=data.get("data_quality", "none"),
+            geographic_variation=data.get("geographic_variation", "unknown"),
+            year_specific=data.get("year_specific", False),
+            data_year=data.get("data_year"),
+            source=data.get("source"),
+            source_url=data.get("source_url"),
+            source_type=data.get("source_type")
+        )
+
+    def version(self, cui: str, cui_name: str) -> str:
+        """Result cache version of one mapping: the code version plus a digest of the CUI's store record.
+
+        Editing the knowledge base then only invalidates the CUIs whose records changed.
+        """
+        raw = self.store.raw(cui)
+        digest = hashlib.sha256(raw).hexdigest()[:16] if raw is not None else "missing"
+        return f"{MAPPER_VERSION}-{digest}"
+
+    def map_cui_to_result(self, cui: str, cui_name: str) -> Dict:
+        """Map a CUI to its epidemiological result."""
+        return self.map_cui_to_record(cui, cui_name).to_dict()
+
+    def map_many(self, cuis, names=None) -> Dict:
+        """Map a batch of CUIs to columnar results.
+
+        Returns a dict of NumPy arrays, one entry per input CUI:
+        - float columns (NaN when missing): incidence_per_100k, prevalence_per_100k,
+          total_cases_per_year, confidence, data_year
+        - bool masks: found, is_subtype, year_specific, and *_extremely_rare for
+          incidence, prevalence and total_cases_per_year
+        - int8 category codes (see CATEGORY_LEVELS): metric_type, data_quality,
+          geographic_variation, source_type
+        - object columns: cui, cui_name, parent_disease, reasoning, source, source_url
+
+        Each distinct CUI is looked up once in a single batched store query; the
+        unknown-CUI fallback is applied to all unmatched rows at the end.
+        """
+        import numpy as np
+
+        cuis = np.asarray(cuis, dtype=object)
+        if names is None:
+            names = np.array([f"Disease {cui}" for cui in cuis], dtype=object)
+        else:
+            names = np.asarray(names, dtype=object)
+
+        unique, inverse = np.unique(cuis.astype(str), return_inverse=True)
+        records = self.store.get_many(unique.tolist())
+        found = np.array([data is not None for data in records], dtype=bool)
+        matched = [data for data in records if data is not None]
 
-        return {
-            "cui": cui,
-            "cui_name": data.get("name", cui_name),
-            "incidence_per_100k": incidence,
-            "prevalence_per_100k": prevalence,
-            "metric_type": data.get("metric_type"),
-            "total_cases_per_year": total_cases,
-            "confidence": data.get("confidence", 0.0),
-            "is_subtype": data.get("is_subtype", False),
-            "parent_disease": data.get("parent_disease"),
-            "reasoning": data.get("reasoning", ""),
-            "data_quality": data.get("data_quality", "none"),
-            "geographic_variation": data.get("geographic_variation", "unknown"),
-            "year_specific": data.get("year_specific", False),
-            "data_year": data.get("data_year"),
-            "source": data.get("source"),
-            "source_url": data.get("source_url"),
-            "source_type": data.get("source_type")
+        def column(values, dtype, fill):
+            out = np.full(len(records), fill, dtype=dtype)
+            out[found] = np.array(values, dtype=dtype) if values else []
+            return out
+
+        incidence_raw = [data.get("incidence_per_100k") for data in matched]
+        prevalence_raw = [data.get("prevalence_per_100k") for data in matched]
+        incidence = column([_as_float(v) for v in incidence_raw], float, np.nan)
+        prevalence = column([_as_float(v) for v in prevalence_raw], float, np.nan)
+        incidence_rare = column([v == EXTREMELY_RARE for v in incidence_raw], bool, False)
+        prevalence_rare = column([v == EXTREMELY_RARE for v in prevalence_raw], bool, False)
+        confidence = column([_as_float(data.get("confidence", 0.0)) for data in matched], float, 0.0)
+        data_year = column([_as_float(data.get("data_year")) for data in matched], float, np.nan)
+        is_subtype = column([data.get("is_subtype") is True for data in matched], bool, False)
+        year_specific = column([data.get("year_specific") is True for data in matched], bool, False)
+        record_names = column([data.get("name") for data in matched], object, None)
+
+        codes = {}
+        for field, levels in CATEGORY_LEVELS.items():
+            lookup = {level: code for code, level in enumerate(levels)}
+            default = CATEGORY_DEFAULTS[field]
+            codes[field] = column(
+                [lookup.get(data.get(field, default), -1) for data in matched], np.int8, lookup[default]
+            )
+        text = {field: column([data.get(field) for data in matched], object, None) for field in TEXT_COLUMNS}
+        text["reasoning"] = column([data.get("reasoning", "") for data in matched], object, None)
+
+        total_cases, total_rare = recompute_total_cases(incidence, prevalence, incidence_rare, prevalence_rare)
+
+        found_rows = found[inverse]
+        cui_name = np.where(found_rows, record_names[inverse], names)
+        reasoning = text["reasoning"][inverse]
+        reasoning[~found_rows] = "CUI " + cuis[~found_rows] + " not found in epidemiological database"
+
+        columns = {
+            "cui": cuis,
+            "cui_name": cui_name,
+            "found": found_rows,
+            "incidence_per_100k": incidence[inverse],
+            "incidence_extremely_rare": incidence_rare[inverse],
+            "prevalence_per_100k": prevalence[inverse],
+            "prevalence_extremely_rare": prevalence_rare[inverse],
+            "total_cases_per_year": total_cases[inverse],
+            "total_cases_extremely_rare": total_rare[inverse],
+            "confidence": confidence[inverse],
+            "is_subtype": is_subtype[inverse],
+            "year_specific": year_specific[inverse],
+            "data_year": data_year[inverse],
+            "reasoning": reasoning,
         }
+        for field in CATEGORY_LEVELS:
+            columns[field] = codes[field][inverse]
+        for field in ("parent_disease", "source", "source_url"):
+            columns[field] = text[field][inverse]
+        return columns
 
 # Main processing
 if __name__ == "__main__":
     import sys
     from datetime import datetime
 
+    from result_cache import ResultCache, cached
+
     mapper = DiseaseIncidenceMapper()
+    cache = ResultCache()
+    map_cui_to_result = cached(mapper.map_cui_to_result, cache, mapper.version)
     output_dir = Path("/home/user/cui_disease_incidence_processing/output/results")
     output_dir.mkdir(parents=True, exist_ok=True)
 
@@ -1202,7 +202,7 @@ if __name__ == "__main__":
     for disease in batch_input['diseases']:
         cui = disease['cui']
         name = disease.get('name', f'Disease {cui}')
-        result = mapper.map_cui_to_result(cui, name)
+        result = map_cui_to_result(cui, name)
         results.append(result)
 
         # Save to individual file
@@ -1212,4 +212,6 @@ if __name__ == "__main__":
 
         print(f"Processed: {cui} ({result['cui_name']})")
 
-    print(f"\nBatch processing complete: {len(results)} diseases processed")
+    cache.close()
+    print(f"\nBatch processing complete: {len(results)} diseases processed "
+          f"({cache.counts['hits']} from the result cache)")
@@ -0,0 +1,211 @@
+#!/usr/bin/env python3
+"""
+Compiled, memory-mapped CUI store.
+Holds the mapper knowledge base as a sorted CUI key array plus an offset table
+over packed JSON records, searched with binary search directly on the mmap.
+
+File layout (little-endian):
+    header   8s magic, uint32 version, uint32 record count N
+    keys     N fixed-width ASCII CUIs, sorted
+    offsets  N + 1 uint64 offsets into the data block
+    data     N compact JSON records, concatenated
+
+The knowledge-base store is compiled by knowledge_base.py:
+    python knowledge_base.py build
+"""
+
+import argparse
+import bisect
+import json
+import mmap
+import os
+import struct
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_STORE_PATH = REPO_DIR / "data" / "cui_store.bin"
+
+MAGIC = b"CUISTORE"
+VERSION = 1
+KEY_WIDTH = 8
+HEADER = struct.Struct("<8sII")
+OFFSET = struct.Struct("<Q")
+OFFSET_PAIR = struct.Struct("<QQ")
+
+
+class CuiStore:
+    """Read-only view over a compiled CUI store file."""
+
+    def __init__(self, path=DEFAULT_STORE_PATH):
+        self.path = Path(path)
+        self._file = open(self.path, "rb")
+        self._mm = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, version, count = HEADER.unpack_from(self._mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a version {VERSION} CUI store")
+
+        self._count = count
+        self._keys_pos = HEADER.size
+        self._offsets_pos = self._keys_pos + count * KEY_WIDTH
+        self._data_pos = self._offsets_pos + (count + 1) * OFFSET.size
+        self._key_list = None
+
+    def __len__(self):
+        return self._count
+
+    def __contains__(self, cui):
+        return self._find(cui) >= 0
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Release the mapping and the underlying file handle."""
+        if self._mm is not None:
+            self._mm.close()
+            self._mm = None
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def _key(self, index):
+        pos = self._keys_pos + index * KEY_WIDTH
+        return self._mm[pos:pos + KEY_WIDTH]
+
+    def _find(self, cui):
+        """Binary search for a CUI, returning its index or -1."""
+        try:
+            key = cui.encode("ascii")
+        except (AttributeError, UnicodeEncodeError):
+            return -1
+        if len(key) != KEY_WIDTH:
+            return -1
+
+        lo, hi = 0, self._count
+        while lo < hi:
+            mid = (lo + hi) // 2
+            if self._key(mid) < key:
+                lo = mid + 1
+            else:
+                hi = mid
+        if lo < self._count and self._key(lo) == key:
+            return lo
+        return -1
+
+    def _raw(self, index):
+        start, end = OFFSET_PAIR.unpack_from(self._mm, self._offsets_pos + index * OFFSET.size)
+        return self._mm[self._data_pos + start:self._data_pos + end]
+
+    def _record(self, index):
+        return json.loads(self._raw(index))
+
+    def raw(self, cui):
+        """Return the stored JSON bytes of a CUI's record, or None."""
+        index = self._find(cui)
+        return None if index < 0 else self._raw(index)
+
+    def get(self, cui, default=None):
+        """Return the record for a CUI, or default if it is not in the store."""
+        index = self._find(cui)
+        if index < 0:
+            return default
+        return self._record(index)
+
+    def get_many(self, cuis):
+        """Return a list of records (None where missing) for many CUIs.
+
+        Reads the whole key array once and searches it with bisect, which is
+        cheaper than a binary search over the mmap for each of a large batch.
+        """
+        if self._key_list is None:
+            block = self._mm[self._keys_pos:self._offsets_pos]
+            self._key_list = [block[i:i + KEY_WIDTH] for i in range(0, len(block), KEY_WIDTH)]
+        keys = self._key_list
+
+        records = []
+        for cui in cuis:
+            try:
+                key = cui.encode("ascii")
+            except (AttributeError, UnicodeEncodeError):
+                records.append(None)
+                continue
+            index = bisect.bisect_left(keys, key)
+            if index < self._count and keys[index] == key:
+                records.append(self._record(index))
+            else:
+                records.append(None)
+        return records
+
+    def keys(self):
+        """Iterate over all CUIs in sorted order."""
+        for index in range(self._count):
+            yield self._key(index).decode("ascii")
+
+    def items(self):
+        """Iterate over (cui, record) pairs in sorted order."""
+        for index in range(self._count):
+            yield self._key(index).decode("ascii"), self._record(index)
+
+
+def write_store(records, path=DEFAULT_STORE_PATH):
+    """Compile a {cui: record} mapping into a store file. Returns the record count."""
+    path = Path(path)
+    keys = []
+    for cui in records:
+        key = cui.encode("ascii")
+        if len(key) != KEY_WIDTH:
+            raise ValueError(f"CUI {cui!r} is not {KEY_WIDTH} characters wide")
+        keys.append(key)
+    keys.sort()
+
+    offsets = [0]
+    blobs = []
+    for key in keys:
+        blob = json.dumps(records[key.decode("ascii")], separators=(",", ":"), ensure_ascii=False).encode("utf-8")
+        blobs.append(blob)
+        offsets.append(offsets[-1] + len(blob))
+
+    # A per-process tmp file, so concurrent rebuilds cannot collide
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(keys)))
+            f.write(b"".join(keys))
+            f.write(struct.pack(f"<{len(offsets)}Q", *offsets))
+            for blob in blobs:
+                f.write(blob)
+        os.replace(tmp_path, path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return len(keys)
+
+
+def store_is_stale(store_path, sources):
+    """Check whether a store is missing or older than any of its source files."""
+    store_path = Path(store_path)
+    if not store_path.exists():
+        return True
+    built = store_path.stat().st_mtime
+    return any(Path(src).exists() and Path(src).stat().st_mtime > built for src in sources)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Look up CUIs in a compiled CUI store")
+    parser.add_argument("cuis", nargs="+")
+    parser.add_argument("--store", default=str(DEFAULT_STORE_PATH))
+    args = parser.parse_args()
+
+    with CuiStore(args.store) as store:
+        for cui in args.cuis:
+            print(json.dumps({cui: store.get(cui)}, indent=2, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
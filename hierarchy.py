@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Parent/subtype disease hierarchy built from the curated sources.
+Every record of the curated mapper database and the hardcoded script tables
+(knowledge_base.py; never the pipeline's own consolidated CSV) with a usable
+parent_disease contributes an edge from its (normalized) name to the parent's
+name. The hierarchy is compiled by `python hierarchy.py build` into
+output/hierarchy.json:
+
+    parents    parent node of each node (-1 for roots)
+    order      nodes in depth-first preorder
+    start/end  each node's preorder span: the descendants of a node are
+               order[start + 1:end], so subtree queries are one slice
+
+Nodes are looked up by CUI or by normalized name in O(1). Parent values that
+are really column-shifted data (URLs, enum labels, numbers) are ignored,
+and an edge that would close a cycle is dropped.
+
+Usage:
+    python hierarchy.py build
+    python hierarchy.py parent NAME_OR_CUI
+    python hierarchy.py subtypes NAME_OR_CUI     # e.g. "Schizophrenia"
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from cui_store import store_is_stale
+from incidence_record import ENUM_FIELDS, normalize_name
+from knowledge_base import DEFAULT_DATABASE_PATH, load_sources, merge_sources, source_paths
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_HIERARCHY_PATH = REPO_DIR / "output" / "hierarchy.json"
+
+FORMAT_VERSION = 1
+
+# Values found in parent_disease that are not disease names
+_NOT_NAMES = {normalize_name(label) for enum in ENUM_FIELDS.values() for label in enum.levels() if label}
+_NOT_NAMES |= {"", "null", "none", "n/a", "true", "false"}
+
+
+def usable_parent(value):
+    """Return a parent_disease value if it looks like a disease name, else None."""
+    if not isinstance(value, str):
+        return None
+    value = value.strip()
+    if normalize_name(value) in _NOT_NAMES or value.startswith(("http://", "https://")):
+        return None
+    try:
+        float(value)
+        return None
+    except ValueError:
+        return value
+
+
+def curated_paths(database_path=DEFAULT_DATABASE_PATH):
+    """The files the hierarchy is built from."""
+    return source_paths(database_path, csv_path=None)
+
+
+def build_hierarchy(out_path=DEFAULT_HIERARCHY_PATH, database_path=DEFAULT_DATABASE_PATH):
+    """Compile the hierarchy from the curated sources. Returns the number of nodes."""
+    names = []
+    nodes = {}
+    parents = []
+    cuis = {}
+
+    def node(name):
+        key = normalize_name(name)
+        if key not in nodes:
+            nodes[key] = len(names)
+            names.append(name.strip())
+            parents.append(-1)
+        return nodes[key]
+
+    def is_ancestor(ancestor, child):
+        while child >= 0:
+            if child == ancestor:
+                return True
+            child = parents[child]
+        return False
+
+    records, _ = merge_sources(load_sources(database_path, csv_path=None))
+    for cui, record in sorted(records.items()):
+        name = record.get("name")
+        if not isinstance(name, str) or not name.strip():
+            continue
+        child = cuis[cui] = node(name)
+        parent_name = usable_parent(record.get("parent_disease"))
+        if parent_name is None:
+            continue
+        parent = node(parent_name)
+        # The first record (in CUI order) to give a name a parent decides it
+        if parents[child] < 0 and not is_ancestor(child, parent):
+            parents[child] = parent
+
+    children = [[] for _ in names]
+    for child, parent in enumerate(parents):
+        if parent >= 0:
+            children[parent].append(child)
+
+    # Iterative depth-first preorder; a node's subtree is a contiguous span
+    order = []
+    start = [0] * len(names)
+    end = [0] * len(names)
+    for root in (n for n in range(len(names)) if parents[n] < 0):
+        stack = [(root, False)]
+        while stack:
+            current, finished = stack.pop()
+            if finished:
+                end[current] = len(order)
+                continue
+            start[current] = len(order)
+            order.append(current)
+            stack.append((current, True))
+            stack.extend((child, False) for child in reversed(children[current]))
+
+    # A per-process tmp file, so concurrent rebuilds cannot collide
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(f"{out_path.name}.{os.getpid()}.tmp")
+    try:
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({
+                "version": FORMAT_VERSION,
+                "names": names,
+                "parents": parents,
+                "cuis": cuis,
+                "order": order,
+                "start": start,
+                "end": end,
+            }, f, ensure_ascii=False)
+        os.replace(tmp_path, out_path)
+    except BaseException:
+        tmp_path.unlink(missing_ok=True)
+        raise
+    return len(names)
+
+
+class Hierarchy:
+    """Parent, ancestor and subtype lookups over the compiled hierarchy."""
+
+    def __init__(self, path=DEFAULT_HIERARCHY_PATH):
+        self.path = Path(path)
+        with open(self.path, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        if data.get("version") != FORMAT_VERSION:
+            raise ValueError(f"{self.path} is not a version {FORMAT_VERSION} hierarchy")
+        self.names = data["names"]
+        self._parents = data["parents"]
+        self._order = data["order"]
+        self._start = data["start"]
+        self._end = data["end"]
+        self._cuis = data["cuis"]
+        self._nodes = {normalize_name(name): node for node, name in enumerate(self.names)}
+        self._node_cuis = {}
+        for cui, node in self._cuis.items():
+            self._node_cuis.setdefault(node, []).append(cui)
+
+    def __len__(self):
+        return len(self.names)
+
+    def __contains__(self, key):
+        return self.node(key) is not None
+
+    def node(self, key, name=None):
+        """Node id for a CUI or disease name, or None.
+
+        With name, a CUI only resolves if the knowledge base recorded it under
+        that name, so a CUI whose stored record describes another disease is
+        not trusted.
+        """
+        node = self._cuis.get(key)
+        if node is None:
+            return self._nodes.get(normalize_name(key))
+        if name is not None and self._nodes.get(normalize_name(name)) != node:
+            return None
+        return node
+
+    def parent(self, key, name=None):
+        """Name of the parent disease of a CUI or name, or None (see node() for name)."""
+        node = self.node(key, name)
+        if node is None or self._parents[node] < 0:
+            return None
+        return self.names[self._parents[node]]
+
+    def ancestors(self, key):
+        """Names of all ancestors, nearest first."""
+        node = self.node(key)
+        found = []
+        while node is not None and self._parents[node] >= 0:
+            node = self._parents[node]
+            found.append(self.names[node])
+        return found
+
+    def is_subtype(self, key, ancestor):
+        """Whether key lies strictly below ancestor in the hierarchy."""
+        node, top = self.node(key), self.node(ancestor)
+        if node is None or top is None or node == top:
+            return False
+        return self._start[top] < self._start[node] < self._end[top]
+
+    def _subtree(self, key):
+        node = self.node(key)
+        if node is None:
+            return []
+        return self._order[self._start[node] + 1:self._end[node]]
+
+    def subtypes(self, key):
+        """Names of all descendants of a CUI or name, in depth-first order."""
+        return [self.names[node] for node in self._subtree(key)]
+
+    def subtype_cuis(self, key):
+        """CUIs of all descendants of a CUI or name."""
+        return [cui for node in self._subtree(key) for cui in self._node_cuis.get(node, ())]
+
+
+def load_hierarchy(path=DEFAULT_HIERARCHY_PATH):
+    """Open a prebuilt hierarchy as is; raise FileNotFoundError if it was never built."""
+    path = Path(path)
+    if not path.exists():
+        raise FileNotFoundError(f"No disease hierarchy at {path}: build it with `python hierarchy.py build`")
+    return Hierarchy(path)
+
+
+def open_hierarchy(path=DEFAULT_HIERARCHY_PATH):
+    """Open the hierarchy, rebuilding it first if a curated source is newer."""
+    if store_is_stale(path, curated_paths()):
+        build_hierarchy(path)
+    return Hierarchy(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Disease parent/subtype hierarchy")
+    parser.add_argument("--hierarchy", default=str(DEFAULT_HIERARCHY_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("build", help="Compile the hierarchy from the curated sources")
+    for name, help_text in (("parent", "Show the ancestors of a disease"), ("subtypes", "List all subtypes")):
+        query_parser = subparsers.add_parser(name, help=help_text)
+        query_parser.add_argument("key", help="CUI or disease name")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_hierarchy(args.hierarchy)
+        print(f"Compiled {count} diseases into {args.hierarchy}")
+        return
+
+    hierarchy = open_hierarchy(args.hierarchy)
+    if args.key not in hierarchy:
+        print(f"{args.key} is not in the hierarchy")
+    elif args.command == "parent":
+        print(" -> ".join([args.key] + hierarchy.ancestors(args.key)))
+    else:
+        for cui_name in hierarchy.subtypes(args.key):
+            print(cui_name)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,184 @@
+#!/usr/bin/env python3
+"""
+Compact record type for mapper results.
+IncidenceRecord holds the 17 fields of the result schema in __slots__, with the
+categorical fields stored as shared enum members instead of per-record strings.
+Conversion to and from the JSON/CSV schema is lossless: values outside an enum's
+domain are kept as-is.
+"""
+
+from enum import IntEnum
+from operator import attrgetter
+
+FIELDNAMES = (
+    'cui', 'cui_name', 'incidence_per_100k', 'prevalence_per_100k',
+    'metric_type', 'total_cases_per_year', 'confidence', 'is_subtype',
+    'parent_disease', 'reasoning', 'data_quality', 'geographic_variation',
+    'year_specific', 'data_year', 'source', 'source_url', 'source_type'
+)
+
+EXTREMELY_RARE = "extremely rare"
+
+NUMERIC_FIELDS = ("incidence_per_100k", "prevalence_per_100k", "total_cases_per_year", "confidence", "data_year")
+BOOL_FIELDS = ("is_subtype", "year_specific")
+
+# Fields that default to None; older-schema results may omit them
+NULLABLE_FIELDS = (
+    "incidence_per_100k", "prevalence_per_100k", "metric_type", "total_cases_per_year",
+    "parent_disease", "data_year", "source", "source_url", "source_type",
+)
+
+
+class CodedEnum(IntEnum):
+    """Integer-coded enum whose members stand for schema string values.
+
+    A member's schema value is its lower-cased name, except NULL which is None.
+    """
+
+    @property
+    def label(self):
+        return _LABELS[type(self)][self]
+
+    @classmethod
+    def levels(cls):
+        """Schema values in code order."""
+        return tuple(member.label for member in cls)
+
+    @classmethod
+    def coerce(cls, value):
+        """Return the member for a schema value, or the value itself if outside the domain."""
+        try:
+            return _MEMBERS[cls].get(value, value)
+        except TypeError:
+            return value
+
+
+class MetricType(CodedEnum):
+    NULL = 0
+    INCIDENCE = 1
+    PREVALENCE = 2
+    BOTH = 3
+
+
+class DataQuality(CodedEnum):
+    NONE = 0
+    WEAK = 1
+    MODERATE = 2
+    STRONG = 3
+
+
+class GeographicVariation(CodedEnum):
+    UNKNOWN = 0
+    LOW = 1
+    MODERATE = 2
+    HIGH = 3
+
+
+class SourceType(CodedEnum):
+    NULL = 0
+    REGISTRY = 1
+    LITERATURE = 2
+    ESTIMATE = 3
+
+
+ENUM_FIELDS = {
+    "metric_type": MetricType,
+    "data_quality": DataQuality,
+    "geographic_variation": GeographicVariation,
+    "source_type": SourceType,
+}
+
+# Lookup tables built once so coercion and labelling are plain dict hits.
+# Kept per enum: members of different IntEnums with the same code compare equal.
+_LABELS = {
+    enum: {member: None if member.name == "NULL" else member.name.lower() for member in enum}
+    for enum in ENUM_FIELDS.values()
+}
+_MEMBERS = {enum: {label: member for member, label in labels.items()} for enum, labels in _LABELS.items()}
+
+_get_fields = attrgetter(*FIELDNAMES)
+_ENUM_POSITIONS = tuple(FIELDNAMES.index(field) for field in ENUM_FIELDS)
+
+
+def parse_csv_value(field, value):
+    """Convert a consolidated-CSV cell back into its JSON value."""
+    if value is None or value == "":
+        return None
+    if field in BOOL_FIELDS and value in ("True", "False"):
+        return value == "True"
+    if field in NUMERIC_FIELDS:
+        try:
+            return int(value) if value.lstrip("-").isdigit() else float(value)
+        except ValueError:
+            return value
+    return value
+
+
+def normalize_name(name):
+    """Case- and whitespace-insensitive form of a disease name."""
+    return " ".join((name or "").split()).casefold()
+
+
+class IncidenceRecord:
+    """One mapper result, stored in slots rather than a 17-key dict."""
+
+    __slots__ = FIELDNAMES
+
+    def __init__(self, cui, cui_name, incidence_per_100k=None, prevalence_per_100k=None,
+                 metric_type=MetricType.NULL, total_cases_per_year=None, confidence=0.0,
+                 is_subtype=False, parent_disease=None, reasoning="",
+                 data_quality=DataQuality.NONE, geographic_variation=GeographicVariation.UNKNOWN,
+                 year_specific=False, data_year=None, source=None, source_url=None,
+                 source_type=SourceType.NULL):
+        self.cui = cui
+        self.cui_name = cui_name
+        self.incidence_per_100k = incidence_per_100k
+        self.prevalence_per_100k = prevalence_per_100k
+        self.metric_type = MetricType.coerce(metric_type)
+        self.total_cases_per_year = total_cases_per_year
+        self.confidence = confidence
+        self.is_subtype = is_subtype
+        self.parent_disease = parent_disease
+        self.reasoning = reasoning
+        self.data_quality = DataQuality.coerce(data_quality)
+        self.geographic_variation = GeographicVariation.coerce(geographic_variation)
+        self.year_specific = year_specific
+        self.data_year = data_year
+        self.source = source
+        self.source_url = source_url
+        self.source_type = SourceType.coerce(source_type)
+
+    def __repr__(self):
+        return f"IncidenceRecord(cui={self.cui!r}, cui_name={self.cui_name!r}, confidence={self.confidence!r})"
+
+    def __eq__(self, other):
+        if not isinstance(other, IncidenceRecord):
+            return NotImplemented
+        return _get_fields(self) == _get_fields(other)
+
+    def values(self):
+        """Field values in schema order, with enum fields as schema strings."""
+        values = list(_get_fields(self))
+        for i in _ENUM_POSITIONS:
+            labels = _LABELS.get(type(values[i]))
+            if labels is not None:
+                values[i] = labels[values[i]]
+        return values
+
+    def to_dict(self):
+        """Convert to the JSON result schema."""
+        return dict(zip(FIELDNAMES, self.values()))
+
+    def to_csv_row(self):
+        """Convert to a list of cells in FIELDNAMES order for csv.writer."""
+        return ["" if value is None else value for value in self.values()]
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a record from a JSON result; missing fields take the schema defaults."""
+        return cls(**{field: data[field] for field in FIELDNAMES if field in data})
+
+    @classmethod
+    def from_csv_row(cls, row):
+        """Build a record from a consolidated-CSV row (a dict keyed by FIELDNAMES)."""
+        return cls(**{field: parse_csv_value(field, row.get(field)) for field in FIELDNAMES})
@@ -0,0 +1,256 @@
+#!/usr/bin/env python3
+"""
+Row-offset index for the disease codes input CSV.
+A sidecar file (disease_codes_Charlie.csv.idx) stores the byte offset of
+every data row, plus disease_id -> row and CUI -> row tables, so pulling a
+range such as rows 9001-10000 seeks straight to it and reads only those
+rows instead of scanning the whole input.
+
+File layout (little-endian):
+    header   8s magic, uint32 version, uint32 row count N,
+             uint32 disease_id count I, uint32 CUI count K,
+             uint64 CSV size, uint64 CSV mtime_ns, 32s CSV SHA-256
+    offsets  N + 1 uint64: start of each data row, then end of the last
+    ids      I (uint32 disease_id, uint32 row) pairs, sorted by disease_id
+    keys     K fixed-width ASCII CUIs, sorted
+    rows     K uint32 rows, in key order
+
+Rows are numbered from 1, the first row after the header. A disease_id or
+CUI listed on several rows maps to the first of them. The index is checked
+against the CSV's size and mtime, falling back to its SHA-256 when only the
+mtime changed; open_input_index() rebuilds it when the contents differ.
+
+Usage:
+    python input_index.py build [--csv data/disease_codes_Charlie.csv]
+    python input_index.py rows 9001 10000 [--output diseases_to_process_9001_10000.csv] [--no-header]
+    python input_index.py ids 1006 1500
+    python input_index.py get CUI ...
+"""
+
+import argparse
+import bisect
+import csv
+import hashlib
+import io
+import json
+import os
+import struct
+import sys
+from array import array
+from pathlib import Path
+
+from csv_index import scan_rows
+from cui_store import KEY_WIDTH
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_CSV_PATH = REPO_DIR / "data" / "disease_codes_Charlie.csv"
+
+MAGIC = b"ROWINDEX"
+VERSION = 1
+HEADER = struct.Struct("<8sIIIIQQ32s")
+ID_ROW = struct.Struct("<II")
+
+
+def index_path(csv_path):
+    csv_path = Path(csv_path)
+    return csv_path.with_name(csv_path.name + ".idx")
+
+
+def build_index(csv_path=DEFAULT_CSV_PATH, out_path=None):
+    """Scan the input CSV and write its row index. Returns the number of rows indexed."""
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path else index_path(csv_path)
+    stat = csv_path.stat()
+    data = csv_path.read_bytes()
+
+    rows = scan_rows(data)
+    header_length = next(rows, (0, 0))[1]
+    offsets = array("Q", [header_length])
+    ids = {}
+    cuis = {}
+    for number, (offset, length) in enumerate(rows, 1):
+        offsets.append(offset + length)
+        # disease_id,diseaseid,diseasename: the first two cells are never quoted
+        cells = data[offset:offset + length].split(b",", 2)
+        if len(cells) < 3:
+            continue
+        if cells[0].isdigit():
+            ids.setdefault(int(cells[0]), number)
+        if len(cells[1]) == KEY_WIDTH:
+            cuis.setdefault(cells[1], number)
+    count = len(offsets) - 1
+    keys = sorted(cuis)
+
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(HEADER.pack(MAGIC, VERSION, count, len(ids), len(keys), stat.st_size, stat.st_mtime_ns,
+                            hashlib.sha256(data).digest()))
+        f.write(offsets.tobytes())
+        f.write(b"".join(ID_ROW.pack(disease_id, ids[disease_id]) for disease_id in sorted(ids)))
+        f.write(b"".join(keys))
+        f.write(array("I", (cuis[key] for key in keys)).tobytes())
+    os.replace(tmp_path, out_path)
+    return count
+
+
+class InputIndex:
+    """Seek-based row, disease_id and CUI access to the input CSV through its row index."""
+
+    def __init__(self, csv_path=DEFAULT_CSV_PATH, idx_path=None):
+        self.csv_path = Path(csv_path)
+        self.index_path = Path(idx_path) if idx_path else index_path(self.csv_path)
+        with open(self.index_path, "rb") as f:
+            data = f.read()
+        (magic, version, count, id_count, key_count,
+         self.csv_size, self.csv_mtime_ns, self.csv_sha256) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC or version != VERSION:
+            raise ValueError(f"{self.index_path} is not a version {VERSION} input index")
+
+        pos = HEADER.size
+        self._offsets = array("Q")
+        self._offsets.frombytes(data[pos:pos + (count + 1) * 8])
+        pos += (count + 1) * 8
+        self._id_rows = dict(ID_ROW.iter_unpack(data[pos:pos + id_count * ID_ROW.size]))
+        self._ids = list(self._id_rows)
+        pos += id_count * ID_ROW.size
+        self._keys = [data[i:i + KEY_WIDTH] for i in range(pos, pos + key_count * KEY_WIDTH, KEY_WIDTH)]
+        pos += key_count * KEY_WIDTH
+        self._key_rows = array("I")
+        self._key_rows.frombytes(data[pos:pos + key_count * 4])
+
+        self._file = open(self.csv_path, "rb")
+        self.fieldnames = next(csv.reader([self._file.read(self._offsets[0]).decode("utf-8")]))
+
+    def __len__(self):
+        return len(self._offsets) - 1
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def is_stale(self):
+        """Check whether the CSV's contents changed since the index was built."""
+        stat = self.csv_path.stat()
+        if stat.st_size != self.csv_size:
+            return True
+        if stat.st_mtime_ns == self.csv_mtime_ns:
+            return False
+        return hashlib.sha256(self.csv_path.read_bytes()).digest() != self.csv_sha256
+
+    def _read(self, first, last):
+        """Raw bytes of rows first..last (inclusive, 1-based)."""
+        first = max(first, 1)
+        last = min(last, len(self))
+        if first > last:
+            return b""
+        self._file.seek(self._offsets[first - 1])
+        return self._file.read(self._offsets[last] - self._offsets[first - 1])
+
+    def rows(self, first, last):
+        """Yield (row number, row dict) for rows first..last, inclusive."""
+        block = self._read(first, last).decode("utf-8")
+        for number, cells in enumerate(csv.reader(io.StringIO(block, newline="")), max(first, 1)):
+            yield number, dict(zip(self.fieldnames, cells))
+
+    def row(self, number):
+        """The row dict for a row number, or None if out of range."""
+        return next((row for _, row in self.rows(number, number)), None)
+
+    def row_for_id(self, disease_id):
+        return self._id_rows.get(int(disease_id))
+
+    def row_for_cui(self, cui):
+        try:
+            key = cui.encode("ascii")
+        except (AttributeError, UnicodeEncodeError):
+            return None
+        index = bisect.bisect_left(self._keys, key)
+        if index < len(self._keys) and self._keys[index] == key:
+            return self._key_rows[index]
+        return None
+
+    def get(self, cui):
+        """The row dict for a CUI, or None."""
+        number = self.row_for_cui(cui)
+        return None if number is None else self.row(number)
+
+    def ids(self, first_id, last_id):
+        """Yield (row number, row dict) for disease_ids first_id..last_id, in file order."""
+        start = bisect.bisect_left(self._ids, first_id)
+        end = bisect.bisect_right(self._ids, last_id)
+        for number in sorted(self._id_rows[disease_id] for disease_id in self._ids[start:end]):
+            yield from self.rows(number, number)
+
+    def extract(self, first, last, out, header=True):
+        """Copy rows first..last byte-for-byte to a binary file object."""
+        if header:
+            self._file.seek(0)
+            out.write(self._file.read(self._offsets[0]))
+        out.write(self._read(first, last))
+
+
+def open_input_index(csv_path=DEFAULT_CSV_PATH):
+    """Open the index for the input CSV, building or rebuilding it first if needed."""
+    idx_path = index_path(csv_path)
+    if idx_path.exists():
+        index = InputIndex(csv_path, idx_path)
+        if not index.is_stale():
+            return index
+        index.close()
+    build_index(csv_path, idx_path)
+    return InputIndex(csv_path, idx_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or query the row index of the disease codes CSV")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("build", help="Build the sidecar index")
+
+    rows_parser = subparsers.add_parser("rows", help="Write rows FIRST..LAST (1-based) as CSV")
+    rows_parser.add_argument("first", type=int)
+    rows_parser.add_argument("last", type=int)
+    rows_parser.add_argument("--output", default=None, help="Output file (default: stdout)")
+    rows_parser.add_argument("--no-header", action="store_true")
+
+    ids_parser = subparsers.add_parser("ids", help="List diseases with disease_id FIRST..LAST")
+    ids_parser.add_argument("first", type=int)
+    ids_parser.add_argument("last", type=int)
+
+    get_parser = subparsers.add_parser("get", help="Look up CUIs")
+    get_parser.add_argument("cuis", nargs="+")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.csv)
+        print(f"Indexed {count} rows into {index_path(args.csv)}")
+        return
+
+    with open_input_index(args.csv) as index:
+        if args.command == "rows":
+            if args.output:
+                with open(args.output, "wb") as f:
+                    index.extract(args.first, args.last, f, header=not args.no_header)
+            else:
+                index.extract(args.first, args.last, sys.stdout.buffer, header=not args.no_header)
+        elif args.command == "ids":
+            for number, row in index.ids(args.first, args.last):
+                print(json.dumps({"row": number, **row}, ensure_ascii=False))
+        else:
+            for cui in args.cuis:
+                number = index.row_for_cui(cui)
+                row = None if number is None else index.row(number)
+                print(json.dumps({cui: row and {"row": number, **row}}, ensure_ascii=False))
+
+
+if __name__ == "__main__":
+    main()
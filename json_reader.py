@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+"""
+Parallel reader for directories of result JSON files.
+File reads and decodes are fanned out over a thread pool in fixed-size chunks,
+with a bounded number of chunks in flight, and records come back in path order.
+Threads overlap the file I/O that dominates on cold caches and network
+filesystems; once files are cached, a faster decoder is what helps.
+
+Decoders are pluggable: "orjson" or "ujson" when installed, else the stdlib
+"json". get_decoder() picks the fastest available.
+
+Benchmark files/sec for each decoder and worker count:
+    python json_reader.py [DIR ...] [--workers 1 8]
+"""
+
+import argparse
+import glob
+import json
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_BENCH_DIRS = [REPO_DIR / "output" / "processed_jsons"] + sorted(
+    Path(path) for path in glob.glob(str(REPO_DIR / "archive" / "**" / "results"), recursive=True)
+)
+
+DEFAULT_WORKERS = 8
+DEFAULT_CHUNK_SIZE = 64
+
+
+def _load_decoders():
+    decoders = {}
+    try:
+        import orjson
+        decoders["orjson"] = orjson.loads
+    except ImportError:
+        pass
+    try:
+        import ujson
+        decoders["ujson"] = ujson.loads
+    except ImportError:
+        pass
+    decoders["json"] = json.loads
+    return decoders
+
+
+# Available decoders, fastest first
+DECODERS = _load_decoders()
+
+
+def get_decoder(name=None):
+    """Return a bytes -> object decoder by name, or the fastest available one."""
+    if name is None:
+        return next(iter(DECODERS.values()))
+    if name not in DECODERS:
+        raise ValueError(f"Decoder {name!r} is not available (have: {', '.join(DECODERS)})")
+    return DECODERS[name]
+
+
+def _read_chunk(paths, decode):
+    records = []
+    for path in paths:
+        try:
+            with open(path, "rb") as f:
+                records.append(decode(f.read()))
+        except (OSError, ValueError) as e:
+            print(f"Error reading {path}: {e}")
+    return records
+
+
+def read_json_files(paths, workers=DEFAULT_WORKERS, chunk_size=DEFAULT_CHUNK_SIZE, decoder=None):
+    """Yield the decoded contents of many JSON files, in the order given.
+
+    Unreadable or malformed files are reported and skipped. At most
+    2 * workers chunks are read ahead of the consumer.
+    """
+    decode = decoder if callable(decoder) else get_decoder(decoder)
+    paths = iter(paths)
+    chunks = iter(lambda: list(islice(paths, chunk_size)), [])
+
+    if workers <= 1:
+        for chunk in chunks:
+            yield from _read_chunk(chunk, decode)
+        return
+
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_read_chunk, chunk, decode))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+
+def bench(directories, workers_options, decoders):
+    """Print files/sec for every decoder and worker count over the given directories."""
+    paths = [path for directory in directories for path in sorted(Path(directory).glob("*.json"))]
+    print(f"{len(paths)} files in {len(directories)} directories")
+    for name in decoders:
+        for workers in workers_options:
+            start = time.perf_counter()
+            count = sum(1 for _ in read_json_files(paths, workers=workers, decoder=name))
+            elapsed = time.perf_counter() - start
+            print(f"  {name:<7} workers={workers:<3} {count / elapsed:>10,.0f} files/sec")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark parallel JSON result ingestion")
+    parser.add_argument("dirs", nargs="*", default=[str(path) for path in DEFAULT_BENCH_DIRS])
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, DEFAULT_WORKERS])
+    parser.add_argument("--decoder", nargs="+", default=list(DECODERS), choices=list(DECODERS))
+    args = parser.parse_args()
+
+    bench([d for d in args.dirs if Path(d).is_dir()], args.workers, args.decoder)
+
+
+if __name__ == "__main__":
+    main()
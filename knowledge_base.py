@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Single CUI-keyed knowledge base merged from every curated source.
+Collects the hardcoded per-script disease tables, the curated mapper database
+and the schema-valid rows of the consolidated CSV, detects conflicting
+estimates, records provenance, and compiles the result into the
+memory-mapped CUI store used by the mapper.
+
+Script tables are read with ast.literal_eval, so building never executes the
+scripts (several of them write result files at import time).
+
+Usage:
+    python knowledge_base.py build       # compile data/cui_store.bin
+    python knowledge_base.py conflicts   # list CUIs whose sources disagree
+"""
+
+import argparse
+import ast
+import json
+from pathlib import Path
+
+from cui_store import DEFAULT_STORE_PATH, CuiStore, store_is_stale, write_store
+from incidence_record import FIELDNAMES, IncidenceRecord
+from validation import csv_records, validate
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_DATABASE_PATH = REPO_DIR / "data" / "cui_database.json"
+DEFAULT_CSV_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+DEFAULT_CONFLICTS_PATH = REPO_DIR / "output" / "knowledge_base_conflicts.json"
+
+# Hardcoded tables, in precedence order (earlier sources win conflicts)
+SCRIPT_TABLES = [
+    ("apply_cui_mapper_skill_20.py", "DISEASE_INCIDENCE_MAP"),
+    ("apply_cui_mapper_skill.py", "DISEASE_MAPPINGS"),
+    ("mapper_processor.py", "DISEASE_DATA"),
+    ("process_diseases.py", "diseases_to_process"),
+    ("process_5_diseases.py", "diseases_data"),
+    ("process_user_5_diseases.py", "DISEASES_DATA"),
+    ("map_5_cuis.py", "results"),
+    ("map_5_user_diseases.py", "DISEASE_DATABASE"),
+]
+
+# Result-schema fields that are not stored in a knowledge-base record
+# (the name is stored as "name"; total cases are derived by the mapper)
+DERIVED_FIELDS = ("cui", "cui_name", "total_cases_per_year")
+
+
+def to_kb_record(entry):
+    """Normalize a result-schema or mapper-database entry to a knowledge-base record."""
+    record = {"name": entry.get("cui_name", entry.get("name"))}
+    for field, value in entry.items():
+        if field not in DERIVED_FIELDS and field != "name":
+            record[field] = value
+    return record
+
+
+def load_script_table(script_path, variable):
+    """Read a literal table assigned at module level, without importing the script."""
+    tree = ast.parse(Path(script_path).read_text(encoding="utf-8"))
+    for node in tree.body:
+        if isinstance(node, ast.Assign) and any(
+            isinstance(target, ast.Name) and target.id == variable for target in node.targets
+        ):
+            table = ast.literal_eval(node.value)
+            break
+    else:
+        raise KeyError(f"{variable} not found in {script_path}")
+
+    entries = table.items() if isinstance(table, dict) else ((entry.get("cui"), entry) for entry in table)
+    return {entry.get("cui", cui): to_kb_record(entry) for cui, entry in entries}
+
+
+def load_database(database_path=DEFAULT_DATABASE_PATH):
+    """Load the curated mapper database (formerly the CUI_DATABASE literal)."""
+    with open(database_path, "r", encoding="utf-8") as f:
+        return {cui: to_kb_record(entry) for cui, entry in json.load(f).items()}
+
+
+def load_csv_records(csv_path=DEFAULT_CSV_PATH):
+    """Load consolidated CSV rows as knowledge-base records; later duplicates win.
+
+    Rows that fail schema validation (column-shifted rows, mostly) are dropped.
+    """
+    records = {}
+    for row in csv_records(csv_path):
+        if validate(row):
+            continue
+        records[row["cui"]] = to_kb_record(IncidenceRecord.from_dict(row).to_dict())
+    return records
+
+
+def source_paths(database_path=DEFAULT_DATABASE_PATH, csv_path=DEFAULT_CSV_PATH):
+    """All files the knowledge base is built from (without the CSV when csv_path is None)."""
+    csv_paths = [Path(csv_path)] if csv_path else []
+    return [Path(database_path)] + csv_paths + [REPO_DIR / script for script, _ in SCRIPT_TABLES]
+
+
+def load_sources(database_path=DEFAULT_DATABASE_PATH, csv_path=DEFAULT_CSV_PATH):
+    """Load every source as a list of (label, {cui: record}) in precedence order."""
+    sources = [("data/cui_database.json", load_database(database_path))]
+    for script, variable in SCRIPT_TABLES:
+        script_path = REPO_DIR / script
+        if script_path.exists():
+            sources.append((f"{script}:{variable}", load_script_table(script_path, variable)))
+    if csv_path and Path(csv_path).exists():
+        sources.append((Path(csv_path).name, load_csv_records(csv_path)))
+    return sources
+
+
+def _differing_fields(records):
+    """Fields on which a list of (label, record) pairs disagree."""
+    fields = [field for field in FIELDNAMES if field not in DERIVED_FIELDS]
+    differing = {}
+    for field in ["name"] + fields:
+        values = {label: record.get(field) for label, record in records}
+        first = records[0][1].get(field)
+        if any(value != first for value in values.values()):
+            differing[field] = values
+    return differing
+
+
+def merge_sources(sources):
+    """Merge sources into one {cui: record} mapping.
+
+    The first source (in precedence order) holding a CUI supplies its record.
+    Each record gets a "provenance" column listing every source that holds the
+    CUI, winner first. Returns (records, conflicts).
+    """
+    holders = {}
+    for label, table in sources:
+        for cui, record in table.items():
+            holders.setdefault(cui, []).append((label, record))
+
+    merged = {}
+    conflicts = []
+    for cui, entries in holders.items():
+        record = dict(entries[0][1])
+        record["provenance"] = ";".join(label for label, _ in entries)
+        merged[cui] = record
+        if len(entries) > 1:
+            differing = _differing_fields(entries)
+            if differing:
+                conflicts.append({"cui": cui, "winner": entries[0][0], "fields": differing})
+    conflicts.sort(key=lambda conflict: conflict["cui"])
+    return merged, conflicts
+
+
+def build_knowledge_base(store_path=DEFAULT_STORE_PATH, database_path=DEFAULT_DATABASE_PATH,
+                         csv_path=DEFAULT_CSV_PATH, conflicts_path=DEFAULT_CONFLICTS_PATH):
+    """Merge all sources and compile them into the CUI store. Returns (count, conflicts)."""
+    records, conflicts = merge_sources(load_sources(database_path, csv_path))
+    count = write_store(records, store_path)
+    if conflicts_path:
+        with open(conflicts_path, "w", encoding="utf-8") as f:
+            json.dump(conflicts, f, indent=2, ensure_ascii=False)
+    return count, conflicts
+
+
+def open_knowledge_base(store_path=DEFAULT_STORE_PATH):
+    """Open the compiled knowledge base, rebuilding it first if any source changed."""
+    if store_is_stale(store_path, source_paths()):
+        build_knowledge_base(store_path, conflicts_path=None)
+    return CuiStore(store_path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build the merged CUI knowledge base")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    build_parser = subparsers.add_parser("build", help="Compile all sources into the CUI store")
+    build_parser.add_argument("--database", default=str(DEFAULT_DATABASE_PATH))
+    build_parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+    build_parser.add_argument("--out", default=str(DEFAULT_STORE_PATH))
+    build_parser.add_argument("--conflicts", default=str(DEFAULT_CONFLICTS_PATH))
+
+    conflicts_parser = subparsers.add_parser("conflicts", help="Print CUIs whose sources disagree")
+    conflicts_parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count, conflicts = build_knowledge_base(args.out, args.database, args.csv, args.conflicts)
+        print(f"Compiled {count} records into {args.out}")
+        print(f"{len(conflicts)} conflicting CUIs written to {args.conflicts}")
+    else:
+        _, conflicts = merge_sources(load_sources(csv_path=args.csv))
+        for conflict in conflicts:
+            print(f"{conflict['cui']}: {', '.join(conflict['fields'])} (winner: {conflict['winner']})")
+        print(f"\n{len(conflicts)} conflicting CUIs")
+
+
+if __name__ == "__main__":
+    main()
@@ -4,225 +4,314 @@ Large-scale disease incidence processor.
 Processes remaining batches using disease categorization logic.
 """
 
+import argparse
+import csv
 import json
 import os
 import re
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
 from pathlib import Path
 
+from hierarchy import DEFAULT_HIERARCHY_PATH, load_hierarchy
+from incidence_record import IncidenceRecord
+from result_cache import DEFAULT_CACHE_PATH, ResultCache, cached
+from results_log import DEFAULT_LOG_PATH
+from run_journal import open_journaled_log
+from total_cases import total_cases_per_year
+
+# Version of the categorization rules, part of the result cache key
+# (result_cache.py). Bump it whenever categorize_disease's code changes; the
+# per-disease hierarchy input is covered by rules_version().
+RULES_VERSION = 'rules-2'
+
+# Category trigger keywords, matched as substrings of the lower-cased name.
+# categorize_disease checks the categories in this order; the first hit wins.
+RARE_KEYWORDS = frozenset(['syndrome', 'microdeletion', 'microduplication', 'dystrophy', 'dysplasia'])
+GENETIC_KEYWORDS = frozenset(['type_suffix', 'familial', 'hereditary', 'congenital'])
+CANCER_KEYWORDS = frozenset(['carcinoma', 'lymphoma', 'leukemia', 'sarcoma', 'melanoma', 'cancer', 'malignant', 'neoplasm'])
+INFECTION_KEYWORDS = frozenset(['infection', 'infectious', 'bacterial', 'viral', 'parasitic', 'mycosis', 'sepsis'])
+NEURO_KEYWORDS = frozenset(['neuropathy', 'encephalopathy', 'seizure', 'epilepsy', 'parkinson', 'dementia', 'alzheimer'])
+AUTOIMMUNE_KEYWORDS = frozenset(['autoimmune', 'arthritis', 'lupus', 'inflammatory', 'sclerosis'])
+UMBRELLA_KEYWORDS = frozenset(['disorders', 'diseases', 'conditions', 'abnormalities'])
+
+# Keywords that only refine the estimate within a category
+DETAIL_KEYWORDS = frozenset(['noonan', 'marfan', 'ehlers', 'benign', 'cell', 'pneumonia', 'type', 'stage', 'juvenile'])
+
+# "Type 2", "TYPE 1A", ... at the end of the name (reported as the 'type_suffix' keyword).
+# Matched against the lower-cased name, so the letter class also covers the
+# lower-case forms of the non-ASCII letters that [A-Z] matches case-insensitively.
+TYPE_SUFFIX_PATTERN = r'type \d+(?:[a-z\u0131\u017f]|i\u0307)?$'
+
+
+def _compile_keyword_matcher():
+    """Compile every keyword into one alternation, longest literal first.
+
+    A match at a position reports only the first alternative that matches there,
+    so each keyword also maps to the shorter keywords it starts with.
+    """
+    keywords = (RARE_KEYWORDS | GENETIC_KEYWORDS | CANCER_KEYWORDS | INFECTION_KEYWORDS | NEURO_KEYWORDS
+                | AUTOIMMUNE_KEYWORDS | UMBRELLA_KEYWORDS | DETAIL_KEYWORDS) - {'type_suffix'}
+    literals = sorted(keywords, key=len, reverse=True)
+    pattern = re.compile('|'.join([TYPE_SUFFIX_PATTERN] + [re.escape(kw) for kw in literals]))
+    implied = {kw: frozenset(k for k in keywords if kw.startswith(k)) for kw in keywords}
+    return pattern, implied
+
+
+_KEYWORD_PATTERN, _IMPLIED_KEYWORDS = _compile_keyword_matcher()
+_TYPE_SUFFIX_HITS = frozenset(['type_suffix', 'type'])
+
+
+def keyword_hits(name_lower):
+    """Return the set of keywords occurring in a lower-cased name, in one left-to-right scan.
+
+    Each search resumes one character after the previous match start, so
+    overlapping keywords are all found.
+    """
+    hits = set()
+    search = _KEYWORD_PATTERN.search
+    match = search(name_lower)
+    while match:
+        hits |= _IMPLIED_KEYWORDS.get(match.group(), _TYPE_SUFFIX_HITS)
+        match = search(name_lower, match.start() + 1)
+    return hits
+
+
 def categorize_disease(cui, name):
     """
     Categorize disease and generate appropriate incidence data.
-    Uses pattern matching and medical knowledge.
+    Uses pattern matching and medical knowledge. Returns an IncidenceRecord.
     """
-    name_lower = name.lower()
+    hits = keyword_hits(name.lower())
 
     # Category 1: Extremely rare genetic syndromes
-    rare_keywords = ['syndrome', 'microdeletion', 'microduplication', 'dystrophy', 'dysplasia']
-    genetic_patterns = [r'type \d+[A-Z]?$', r'familial', r'hereditary', r'congenital']
-
-    if any(kw in name_lower for kw in rare_keywords) or any(re.search(p, name, re.I) for p in genetic_patterns):
-        if 'noonan' in name_lower or 'marfan' in name_lower or 'ehlers' in name_lower:
+    if not hits.isdisjoint(RARE_KEYWORDS) or not hits.isdisjoint(GENETIC_KEYWORDS):
+        if 'noonan' in hits or 'marfan' in hits or 'ehlers' in hits:
             incidence = 0.5
             confidence = 0.55
         else:
             incidence = "extremely rare"
             confidence = 0.3
 
-        return {
-            "cui": cui,
-            "cui_name": name,
-            "incidence_per_100k": incidence,
-            "prevalence_per_100k": None,
-            "metric_type": "incidence" if incidence != "extremely rare" else None,
-            "total_cases_per_year": 40000 if incidence == 0.5 else "extremely rare",
-            "confidence": confidence,
-            "is_subtype": True if 'type' in name_lower else False,
-            "parent_disease": extract_parent_disease(name),
-            "reasoning": f"Rare genetic disorder with limited epidemiological data. Estimated incidence based on genetic disease registries.",
-            "data_quality": "weak",
-            "geographic_variation": "unknown",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        }
+        return IncidenceRecord(
+            cui=cui,
+            cui_name=name,
+            incidence_per_100k=incidence,
+            prevalence_per_100k=None,
+            metric_type="incidence" if incidence != "extremely rare" else None,
+            total_cases_per_year=total_cases_per_year(incidence, None),
+            confidence=confidence,
+            is_subtype=True if 'type' in hits else False,
+            parent_disease=extract_parent_disease(name, cui),
+            reasoning=f"Rare genetic disorder with limited epidemiological data. Estimated incidence based on genetic disease registries.",
+            data_quality="weak",
+            geographic_variation="unknown",
+            year_specific=False,
+            data_year=None,
+            source=None,
+            source_url=None,
+            source_type=None
+        )
 
     # Category 2: Cancers
-    cancer_keywords = ['carcinoma', 'lymphoma', 'leukemia', 'sarcoma', 'melanoma', 'cancer', 'malignant', 'neoplasm']
-    if any(kw in name_lower for kw in cancer_keywords):
-        if 'leukemia' in name_lower:
+    if not hits.isdisjoint(CANCER_KEYWORDS):
+        if 'leukemia' in hits:
             incidence = 4.0
             confidence = 0.72
-        elif 'lymphoma' in name_lower:
+        elif 'lymphoma' in hits:
             incidence = 5.0
             confidence = 0.70
-        elif 'melanoma' in name_lower:
+        elif 'melanoma' in hits:
             incidence = 3.5
             confidence = 0.75
-        elif 'neoplasm' in name_lower and ('benign' in name_lower or 'cell' in name_lower):
+        elif 'neoplasm' in hits and ('benign' in hits or 'cell' in hits):
             # Umbrella terms for neoplasms
             return generate_unmappable(cui, name, "Heterogeneous neoplasm umbrella term")
         else:
             incidence = 2.5
             confidence = 0.65
 
-        return {
-            "cui": cui,
-            "cui_name": name,
-            "incidence_per_100k": incidence,
-            "prevalence_per_100k": None,
-            "metric_type": "incidence",
-            "total_cases_per_year": int(incidence * 80000),
-            "confidence": confidence,
-            "is_subtype": True if ('type' in name_lower or 'stage' in name_lower) else False,
-            "parent_disease": extract_parent_disease(name),
-            "reasoning": f"Cancer incidence estimated from cancer registry data. Moderate confidence based on subtype specificity.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": "registry"
-        }
+        return IncidenceRecord(
+            cui=cui,
+            cui_name=name,
+            incidence_per_100k=incidence,
+            prevalence_per_100k=None,
+            metric_type="incidence",
+            total_cases_per_year=total_cases_per_year(incidence, None),
+            confidence=confidence,
+            is_subtype=True if ('type' in hits or 'stage' in hits) else False,
+            parent_disease=extract_parent_disease(name, cui),
+            reasoning=f"Cancer incidence estimated from cancer registry data. Moderate confidence based on subtype specificity.",
+            data_quality="moderate",
+            geographic_variation="moderate",
+            year_specific=False,
+            data_year=None,
+            source=None,
+            source_url=None,
+            source_type="registry"
+        )
 
     # Category 3: Infections
-    infection_keywords = ['infection', 'infectious', 'bacterial', 'viral', 'parasitic', 'mycosis', 'sepsis']
-    if any(kw in name_lower for kw in infection_keywords):
-        if 'sepsis' in name_lower:
+    if not hits.isdisjoint(INFECTION_KEYWORDS):
+        if 'sepsis' in hits:
             incidence = 150
             confidence = 0.70
-        elif 'pneumonia' in name_lower:
+        elif 'pneumonia' in hits:
             incidence = 250
             confidence = 0.75
-        elif 'viral' in name_lower:
+        elif 'viral' in hits:
             incidence = 500
             confidence = 0.60
         else:
             incidence = 100
             confidence = 0.55
 
-        return {
-            "cui": cui,
-            "cui_name": name,
-            "incidence_per_100k": incidence,
-            "prevalence_per_100k": None,
-            "metric_type": "incidence",
-            "total_cases_per_year": int(incidence * 80000),
-            "confidence": confidence,
-            "is_subtype": False,
-            "parent_disease": None,
-            "reasoning": f"Infectious disease incidence estimated from surveillance data. Geographic variation common.",
-            "data_quality": "moderate",
-            "geographic_variation": "high",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        }
+        return IncidenceRecord(
+            cui=cui,
+            cui_name=name,
+            incidence_per_100k=incidence,
+            prevalence_per_100k=None,
+            metric_type="incidence",
+            total_cases_per_year=total_cases_per_year(incidence, None),
+            confidence=confidence,
+            is_subtype=False,
+            parent_disease=None,
+            reasoning=f"Infectious disease incidence estimated from surveillance data. Geographic variation common.",
+            data_quality="moderate",
+            geographic_variation="high",
+            year_specific=False,
+            data_year=None,
+            source=None,
+            source_url=None,
+            source_type=None
+        )
 
     # Category 4: Neurological disorders
-    neuro_keywords = ['neuropathy', 'encephalopathy', 'seizure', 'epilepsy', 'parkinson', 'dementia', 'alzheimer']
-    if any(kw in name_lower for kw in neuro_keywords):
-        if 'dementia' in name_lower or 'alzheimer' in name_lower:
+    if not hits.isdisjoint(NEURO_KEYWORDS):
+        if 'dementia' in hits or 'alzheimer' in hits:
             incidence = 25
             confidence = 0.75
-        elif 'epilepsy' in name_lower or 'seizure' in name_lower:
+        elif 'epilepsy' in hits or 'seizure' in hits:
             incidence = 50
             confidence = 0.72
-        elif 'neuropathy' in name_lower:
+        elif 'neuropathy' in hits:
             incidence = 8
             confidence = 0.60
         else:
             incidence = 5
             confidence = 0.55
 
-        return {
-            "cui": cui,
-            "cui_name": name,
-            "incidence_per_100k": incidence,
-            "prevalence_per_100k": None,
-            "metric_type": "incidence",
-            "total_cases_per_year": int(incidence * 80000),
-            "confidence": confidence,
-            "is_subtype": True if 'type' in name_lower else False,
-            "parent_disease": extract_parent_disease(name),
-            "reasoning": f"Neurological disorder incidence from epidemiological studies. Confidence reflects data availability.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        }
+        return IncidenceRecord(
+            cui=cui,
+            cui_name=name,
+            incidence_per_100k=incidence,
+            prevalence_per_100k=None,
+            metric_type="incidence",
+            total_cases_per_year=total_cases_per_year(incidence, None),
+            confidence=confidence,
+            is_subtype=True if 'type' in hits else False,
+            parent_disease=extract_parent_disease(name, cui),
+            reasoning=f"Neurological disorder incidence from epidemiological studies. Confidence reflects data availability.",
+            data_quality="moderate",
+            geographic_variation="moderate",
+            year_specific=False,
+            data_year=None,
+            source=None,
+            source_url=None,
+            source_type=None
+        )
 
     # Category 5: Autoimmune/Inflammatory
-    autoimmune_keywords = ['autoimmune', 'arthritis', 'lupus', 'inflammatory', 'sclerosis']
-    if any(kw in name_lower for kw in autoimmune_keywords):
-        if 'arthritis' in name_lower:
+    if not hits.isdisjoint(AUTOIMMUNE_KEYWORDS):
+        if 'arthritis' in hits:
             incidence = 30
             confidence = 0.70
-        elif 'lupus' in name_lower:
+        elif 'lupus' in hits:
             incidence = 5
             confidence = 0.72
-        elif 'sclerosis' in name_lower:
+        elif 'sclerosis' in hits:
             incidence = 4
             confidence = 0.68
         else:
             incidence = 8
             confidence = 0.60
 
-        return {
-            "cui": cui,
-            "cui_name": name,
-            "incidence_per_100k": incidence,
-            "prevalence_per_100k": None,
-            "metric_type": "incidence",
-            "total_cases_per_year": int(incidence * 80000),
-            "confidence": confidence,
-            "is_subtype": True if any(x in name_lower for x in ['juvenile', 'type', 'stage']) else False,
-            "parent_disease": extract_parent_disease(name),
-            "reasoning": f"Autoimmune/inflammatory disorder incidence from rheumatology and immunology registries.",
-            "data_quality": "moderate",
-            "geographic_variation": "moderate",
-            "year_specific": False,
-            "data_year": None,
-            "source": None,
-            "source_url": None,
-            "source_type": None
-        }
+        return IncidenceRecord(
+            cui=cui,
+            cui_name=name,
+            incidence_per_100k=incidence,
+            prevalence_per_100k=None,
+            metric_type="incidence",
+            total_cases_per_year=total_cases_per_year(incidence, None),
+            confidence=confidence,
+            is_subtype=True if not hits.isdisjoint(('juvenile', 'type', 'stage')) else False,
+            parent_disease=extract_parent_disease(name, cui),
+            reasoning=f"Autoimmune/inflammatory disorder incidence from rheumatology and immunology registries.",
+            data_quality="moderate",
+            geographic_variation="moderate",
+            year_specific=False,
+            data_year=None,
+            source=None,
+            source_url=None,
+            source_type=None
+        )
 
     # Category 6: Umbrella/disorder terms
-    umbrella_keywords = ['disorders', 'diseases', 'conditions', 'abnormalities']
-    if any(kw in name_lower for kw in umbrella_keywords):
+    if not hits.isdisjoint(UMBRELLA_KEYWORDS):
         return generate_aggregate_estimate(cui, name)
 
     # Default: Conservative estimate
-    return {
-        "cui": cui,
-        "cui_name": name,
-        "incidence_per_100k": 1.0,
-        "prevalence_per_100k": None,
-        "metric_type": "incidence",
-        "total_cases_per_year": 80000,
-        "confidence": 0.35,
-        "is_subtype": False,
-        "parent_disease": None,
-        "reasoning": f"Limited epidemiological data available. Conservative estimate based on disease category.",
-        "data_quality": "weak",
-        "geographic_variation": "unknown",
-        "year_specific": False,
-        "data_year": None,
-        "source": None,
-        "source_url": None,
-        "source_type": None
-    }
-
-def extract_parent_disease(name):
-    """Extract parent disease from specific subtype names."""
+    return IncidenceRecord(
+        cui=cui,
+        cui_name=name,
+        incidence_per_100k=1.0,
+        prevalence_per_100k=None,
+        metric_type="incidence",
+        total_cases_per_year=total_cases_per_year(1.0, None),
+        confidence=0.35,
+        is_subtype=False,
+        parent_disease=None,
+        reasoning=f"Limited epidemiological data available. Conservative estimate based on disease category.",
+        data_quality="weak",
+        geographic_variation="unknown",
+        year_specific=False,
+        data_year=None,
+        source=None,
+        source_url=None,
+        source_type=None
+    )
+
+_hierarchy = None
+
+def use_hierarchy(path=DEFAULT_HIERARCHY_PATH):
+    """Load the prebuilt parent/subtype hierarchy (`python hierarchy.py build`) for this process.
+
+    Must run before categorizing: in the parent process, and in each pool
+    worker through the pool initializer.
+    """
+    global _hierarchy
+    _hierarchy = load_hierarchy(path)
+    return _hierarchy
+
+def disease_hierarchy():
+    """The hierarchy loaded by use_hierarchy()."""
+    if _hierarchy is None:
+        raise RuntimeError("No disease hierarchy loaded: call use_hierarchy() before categorizing")
+    return _hierarchy
+
+def extract_parent_disease(name, cui=None):
+    """Extract parent disease from specific subtype names.
+
+    A parent recorded in the curated hierarchy wins; otherwise it is derived
+    from the name. A CUI in the hierarchy is looked up by CUI, and only counts
+    if it was recorded under this name; other diseases are looked up by name.
+    """
+    hierarchy = disease_hierarchy()
+    key = cui if cui and cui in hierarchy else name
+    parent = hierarchy.parent(key, name)
+    if parent:
+        return parent
     if 'type' in name.lower():
         return name.split(',')[0].replace('type', '').strip()
     if 'stage' in name.lower():
@@ -235,105 +324,237 @@ def extract_parent_disease(name):
         return name.replace('adult', '').replace('Adult', '').strip()
     return None
 
+def rules_version(cui, name):
+    """Result cache version of one categorization: the rules version plus the parent it uses.
+
+    The parent is the only input that comes from data, so recompiling the
+    hierarchy only invalidates the diseases whose parent changed.
+    """
+    return f"{RULES_VERSION}-{extract_parent_disease(name, cui) or ''}"
+
+def categorize_result(cui, name):
+    """categorize_disease as a result dict, the form the result cache stores."""
+    return categorize_disease(cui, name).to_dict()
+
 def generate_unmappable(cui, name, reason):
     """Generate unmappable response."""
-    return {
-        "cui": cui,
-        "cui_name": name,
-        "incidence_per_100k": None,
-        "prevalence_per_100k": None,
-        "metric_type": None,
-        "total_cases_per_year": None,
-        "confidence": 0.0,
-        "is_subtype": False,
-        "parent_disease": None,
-        "reasoning": reason,
-        "data_quality": "none",
-        "geographic_variation": "unknown",
-        "year_specific": False,
-        "data_year": None,
-        "source": None,
-        "source_url": None,
-        "source_type": None
-    }
+    return IncidenceRecord(
+        cui=cui,
+        cui_name=name,
+        incidence_per_100k=None,
+        prevalence_per_100k=None,
+        metric_type=None,
+        total_cases_per_year=None,
+        confidence=0.0,
+        is_subtype=False,
+        parent_disease=None,
+        reasoning=reason,
+        data_quality="none",
+        geographic_variation="unknown",
+        year_specific=False,
+        data_year=None,
+        source=None,
+        source_url=None,
+        source_type=None
+    )
 
 def generate_aggregate_estimate(cui, name):
     """Generate aggregate BOTEC estimate for umbrella terms."""
-    return {
-        "cui": cui,
-        "cui_name": name,
-        "incidence_per_100k": 200,
-        "prevalence_per_100k": None,
-        "metric_type": "incidence",
-        "total_cases_per_year": 16000000,
-        "confidence": 0.25,
-        "is_subtype": False,
-        "parent_disease": None,
-        "reasoning": f"Aggregate BOTEC estimate for umbrella term. Low confidence due to heterogeneity of conditions included.",
-        "data_quality": "weak",
-        "geographic_variation": "high",
-        "year_specific": False,
-        "data_year": None,
-        "source": None,
-        "source_url": None,
-        "source_type": "estimate"
-    }
-
-def process_batches(start, end, batch_dir, output_dir):
-    """Process a range of batches."""
+    return IncidenceRecord(
+        cui=cui,
+        cui_name=name,
+        incidence_per_100k=200,
+        prevalence_per_100k=None,
+        metric_type="incidence",
+        total_cases_per_year=total_cases_per_year(200, None),
+        confidence=0.25,
+        is_subtype=False,
+        parent_disease=None,
+        reasoning=f"Aggregate BOTEC estimate for umbrella term. Low confidence due to heterogeneity of conditions included.",
+        data_quality="weak",
+        geographic_variation="high",
+        year_specific=False,
+        data_year=None,
+        source=None,
+        source_url=None,
+        source_type="estimate"
+    )
+
+def process_batches(start, end, batch_dir, output_dir, cache=None):
+    """Process a range of batches, appending results to output_dir/results.jsonl.
+
+    Progress is recorded in output_dir/run_journal.log: finished batches are
+    skipped without being read, and results written after the journal's last
+    commit (e.g. by a run that crashed mid-flush) are dropped and redone.
+    With a result_cache.ResultCache, cached results are reused.
+    """
     processed = 0
     errors = []
+    categorize = cached(categorize_result, cache, rules_version) if cache else categorize_result
 
-    for batch_num in range(start, end + 1):
-        batch_file = os.path.join(batch_dir, f"batch_{batch_num:03d}.json")
+    journal, log = open_journaled_log(os.path.join(output_dir, DEFAULT_LOG_PATH.name))
+    done = journal.completed
 
-        if not os.path.exists(batch_file):
-            continue
+    with journal, log:
+        for batch_num in range(start, end + 1):
+            if batch_num in journal.batches:
+                continue
 
-        with open(batch_file, 'r') as f:
-            batch_data = json.load(f)
+            batch_file = os.path.join(batch_dir, f"batch_{batch_num:03d}.json")
 
-        print(f"Batch {batch_num}: ", end='')
-        batch_processed = 0
+            if not os.path.exists(batch_file):
+                continue
 
-        for disease in batch_data['diseases']:
-            cui = disease['cui']
-            name = disease['name']
+            with open(batch_file, 'r') as f:
+                batch_data = json.load(f)
 
-            # Check if already processed
-            output_file = os.path.join(output_dir, f"{cui}.json")
-            if os.path.exists(output_file):
-                continue
+            print(f"Batch {batch_num}: ", end='')
+            batch_processed = 0
 
-            # Categorize and process
-            result = categorize_disease(cui, name)
+            for disease in batch_data['diseases']:
+                cui = disease['cui']
+                name = disease['name']
 
-            # Save result
-            with open(output_file, 'w') as f:
-                json.dump(result, f, indent=2)
+                # Check if already processed
+                if cui in done:
+                    continue
 
-            processed += 1
-            batch_processed += 1
+                # Categorize and process
+                log.append(categorize(cui, name))
+
+                processed += 1
+                batch_processed += 1
 
-        print(f"{batch_processed} diseases processed")
+            log.flush()
+            journal.batch_done(batch_num)
+            print(f"{batch_processed} diseases processed")
 
     return processed, errors
 
+def iter_csv_diseases(input_csv):
+    """Stream (disease_id, cui, name) rows from a disease codes CSV."""
+    with open(input_csv, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            yield int(row['disease_id']), row['diseaseid'], row['diseasename']
+
+def iter_batch_diseases(start, end, batch_dir):
+    """Stream ((batch_num, position), cui, name) rows from a range of batch files."""
+    for batch_num in range(start, end + 1):
+        batch_file = os.path.join(batch_dir, f"batch_{batch_num:03d}.json")
+        if not os.path.exists(batch_file):
+            continue
+        with open(batch_file, 'r') as f:
+            batch_data = json.load(f)
+        for position, disease in enumerate(batch_data['diseases']):
+            yield (batch_num, position), disease['cui'], disease['name']
+
+def _categorize_chunk(chunk):
+    """Worker entry point: categorize a chunk of (key, cui, name) rows."""
+    return [(key, categorize_disease(cui, name)) for key, cui, name in chunk]
+
+def categorize_parallel(rows, workers, chunk_size=500):
+    """Categorize (key, cui, name) rows on a process pool.
+
+    Rows are read lazily in chunks, with at most 2 * workers chunks in flight.
+    Yields (key, IncidenceRecord) pairs in input order as chunks finish, so
+    the output order does not depend on scheduling and memory stays bounded.
+    The hierarchy loaded by use_hierarchy() is loaded again in each worker.
+    """
+    rows = iter(rows)
+    chunks = iter(lambda: list(islice(rows, chunk_size)), [])
+    # Workers load the same prebuilt hierarchy file the parent loaded
+    hierarchy_path = disease_hierarchy().path
+    with ProcessPoolExecutor(max_workers=workers, initializer=use_hierarchy, initargs=(hierarchy_path,)) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.submit(_categorize_chunk, chunk))
+            if len(pending) >= 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+
+def process_parallel(rows, workers, output_dir, chunk_size=500, cache=None):
+    """Categorize (key, cui, name) rows on workers processes into output_dir/results.jsonl.
+
+    Uses the same results log and run journal as process_batches: CUIs already
+    committed are skipped, and results are streamed into the log as they
+    arrive. With a result_cache.ResultCache, cache hits are written directly
+    and only misses go to the pool. Returns the number of diseases processed.
+    """
+    processed = 0
+    journal, log = open_journaled_log(os.path.join(output_dir, DEFAULT_LOG_PATH.name))
+
+    def misses():
+        nonlocal processed
+        for key, cui, name in rows:
+            if cui in log:
+                continue
+            if cache:
+                result = cache.get(cui, name, rules_version(cui, name))
+                if result is not None:
+                    log.append(result)
+                    processed += 1
+                    continue
+            yield key, cui, name
+
+    with journal, log:
+        for _, record in categorize_parallel(misses(), workers, chunk_size):
+            result = record.to_dict()
+            if cache:
+                cache.put(record.cui, record.cui_name, rules_version(record.cui, record.cui_name), result)
+            log.append(result)
+            processed += 1
+    return processed
+
 def main():
-    batch_dir = '/home/user/cui_disease_incidence_processing/batch_inputs'
-    output_dir = '/home/user/cui_disease_incidence_processing/output/results'
+    parser = argparse.ArgumentParser(description="Categorize diseases and write incidence results")
+    parser.add_argument('--workers', type=int, default=0,
+                        help="Categorize in parallel on N processes (default: sequential batch mode)")
+    parser.add_argument('--input', default=None,
+                        help="Disease codes CSV to categorize in parallel mode (default: the batch files)")
+    parser.add_argument('--batch-dir', default='/home/user/cui_disease_incidence_processing/batch_inputs')
+    parser.add_argument('--output-dir', default=str(DEFAULT_LOG_PATH.parent))
+    parser.add_argument('--start', type=int, default=4)
+    parser.add_argument('--end', type=int, default=138)
+    parser.add_argument('--chunk-size', type=int, default=500)
+    parser.add_argument('--cache', default=str(DEFAULT_CACHE_PATH), help="Result cache to consult before categorizing")
+    parser.add_argument('--no-cache', action='store_true', help="Categorize every disease without the result cache")
+    parser.add_argument('--hierarchy', default=str(DEFAULT_HIERARCHY_PATH),
+                        help="Prebuilt disease hierarchy (python hierarchy.py build)")
+    args = parser.parse_args()
+
+    batch_dir = args.batch_dir
+    output_dir = args.output_dir
+    try:
+        use_hierarchy(args.hierarchy)
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    cache = None if args.no_cache else ResultCache(args.cache)
 
     print("=" * 80)
     print("LARGE-SCALE DISEASE PROCESSING")
     print("=" * 80)
 
-    # Process all remaining batches (4-138)
-    print("\nProcessing batches 4-138...")
-    processed, errors = process_batches(4, 138, batch_dir, output_dir)
+    if args.workers > 0:
+        if args.input:
+            print(f"\nCategorizing {args.input} on {args.workers} workers...")
+            rows = iter_csv_diseases(args.input)
+        else:
+            print(f"\nCategorizing batches {args.start}-{args.end} on {args.workers} workers...")
+            rows = iter_batch_diseases(args.start, args.end, batch_dir)
+        processed = process_parallel(rows, args.workers, output_dir, args.chunk_size, cache)
+    else:
+        # Process all remaining batches (4-138)
+        print(f"\nProcessing batches {args.start}-{args.end}...")
+        processed, errors = process_batches(args.start, args.end, batch_dir, output_dir, cache)
+    if cache:
+        cache.close()
 
     print("\n" + "=" * 80)
     print(f"PROCESSING COMPLETE")
     print(f"Total diseases processed: {processed}")
+    if cache:
+        print(f"Result cache: {cache.counts['hits']} hits, {cache.counts['misses']} misses")
     print("=" * 80)
 
 if __name__ == "__main__":
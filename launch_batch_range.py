@@ -1,19 +1,35 @@
 #!/usr/bin/env python3
 """
-Generate prompts for launching batches efficiently
+Generate prompts for launching batches efficiently.
+Batches are leased from the work queue (work_queue.py; load batch_groups.json
+into it once with `python work_queue.py init`) instead of taken as a fixed
+slice, so concurrent launchers never hand out the same batch. Each run first
+acks this worker's earlier batches whose results are all committed and fails
+the ones given with --failed; a batch whose sub-agent died without being
+reported goes back to the queue when its lease expires.
+
+Usage:
+    python launch_batch_range.py --worker NAME [--count 20] [--failed GROUP_ID ...]
 """
-import json
-import sys
+import argparse
+
+from results_log import DEFAULT_LOG_PATH
+from run_journal import committed_cuis
+from work_queue import DEFAULT_QUEUE_PATH, WorkQueue, format_group, launch_round
 
-with open('batch_groups.json', 'r') as f:
-    batches = json.load(f)
+parser = argparse.ArgumentParser(description="Lease batches from the work queue and print their launch prompts")
+parser.add_argument('--worker', required=True, help="Name the leases are held under")
+parser.add_argument('--count', type=int, default=20, help="Batches to lease")
+parser.add_argument('--failed', type=int, nargs='+', default=[], help="Leased batches whose sub-agents failed")
+parser.add_argument('--queue', default=str(DEFAULT_QUEUE_PATH))
+parser.add_argument('--results', default=str(DEFAULT_LOG_PATH), help="Results log whose committed CUIs finish batches")
+args = parser.parse_args()
 
-start = int(sys.argv[1]) if len(sys.argv) > 1 else 0
-end = int(sys.argv[2]) if len(sys.argv) > 2 else len(batches)
+with WorkQueue(args.queue) as queue:
+    acked, failed, leased = launch_round(queue, args.worker, args.count, committed_cuis(args.results), args.failed)
 
-for i in range(start, end):
-    batch = batches[i]
-    print(f"=== Batch {i} ===")
-    for j, disease in enumerate(batch, 1):
-        print(f"{j}. {disease['diseaseid']} - {disease['diseasename']}")
+print(f"Acked {acked} finished batches, failed {failed}, leased {len(leased)}")
+print()
+for group_id, group in leased:
+    print(format_group(group_id, group))
     print()
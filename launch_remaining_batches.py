@@ -1,29 +1,37 @@
 #!/usr/bin/env python3
 """
-Generate task launch commands for remaining batches
+Generate task launch commands for remaining batches.
+The remaining batches are the ones the work queue (work_queue.py) has not
+finished; the next 20 are leased under --worker, after acking this worker's
+earlier batches whose results are all committed (see launch_batch_range.py).
+
+Usage:
+    python launch_remaining_batches.py [--worker remaining] [--failed GROUP_ID ...]
 """
-import json
+import argparse
 
-with open('batch_groups.json', 'r') as f:
-    batches = json.load(f)
+from results_log import DEFAULT_LOG_PATH
+from run_journal import committed_cuis
+from work_queue import DEFAULT_QUEUE_PATH, DONE, FAILED, LEASED, PENDING, WorkQueue, format_group, launch_round
 
-# Start from batch 20 (already processed 0-19)
-start_batch = 20
-end_batch = len(batches)  # 200
+parser = argparse.ArgumentParser(description="Lease the next remaining batches and print their launch prompts")
+parser.add_argument('--worker', default='remaining', help="Name the leases are held under")
+parser.add_argument('--failed', type=int, nargs='+', default=[], help="Leased batches whose sub-agents failed")
+parser.add_argument('--queue', default=str(DEFAULT_QUEUE_PATH))
+parser.add_argument('--results', default=str(DEFAULT_LOG_PATH), help="Results log whose committed CUIs finish batches")
+args = parser.parse_args()
 
-print(f"Need to process batches {start_batch} to {end_batch-1}")
-print(f"Total batches remaining: {end_batch - start_batch}")
-print(f"Total diseases remaining: {(end_batch - start_batch) * 5}")
+with WorkQueue(args.queue) as queue:
+    acked, failed, leased = launch_round(queue, args.worker, 20, committed_cuis(args.results), args.failed)
+    counts = queue.stats()
 
-# Generate batch info for launching
-for i in range(start_batch, min(start_batch + 20, end_batch)):
-    batch = batches[i]
-    print(f"\n=== Batch {i} ===")
-    cuis = []
-    for disease in batch:
-        cui = disease['diseaseid']
-        name = disease['diseasename']
-        cuis.append(f"{cui} - {name}")
+remaining = counts[PENDING] + counts[LEASED]
+print(f"Batches done: {counts[DONE]}, failed for good: {counts[FAILED]}")
+print(f"Total batches remaining: {remaining} ({counts[LEASED]} leased)")
+print(f"Total diseases remaining: {remaining * 5}")
+print(f"Acked {acked} finished batches, failed {failed}")
 
-    for j, cui_info in enumerate(cuis, 1):
-        print(f"{j}. {cui_info}")
+# Generate batch info for launching
+for group_id, group in leased:
+    print()
+    print(format_group(group_id, group))
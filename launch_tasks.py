@@ -1,9 +1,19 @@
 #!/usr/bin/env python3
 """
 Generate task groups for processing diseases 2001-3000.
-Outputs groups of 5 diseases that will be processed by sub-agents.
+Outputs groups of 5 diseases that will be processed by sub-agents, and queues
+them (numbered as in task_batches.txt) in their own work queue, from which
+launch_batch_range.py leases them:
+
+    python launch_batch_range.py --queue output/work_queue_2001_3000.sqlite --worker NAME
 """
 import csv
+from pathlib import Path
+
+from work_queue import WorkQueue
+
+REPO_DIR = Path(__file__).resolve().parent
+QUEUE_PATH = REPO_DIR / "output" / "work_queue_2001_3000.sqlite"
 
 # Read diseases
 diseases = []
@@ -38,6 +48,15 @@ with open('task_batches.txt', 'w') as f:
         f.write("\n")
 
 print(f"Batch information written to task_batches.txt")
+
+# Queue the batches in the batch_groups.json disease format; rerunning adds nothing twice
+with WorkQueue(QUEUE_PATH) as queue:
+    added = queue.enqueue(
+        [[{'disease_id': d['disease_id'], 'diseaseid': d['cui'], 'diseasename': d['disease_name']} for d in batch]
+         for batch in batches],
+        start_id=1,
+    )
+print(f"Queued {added} new batches in {QUEUE_PATH}")
 print(f"\nFirst batch example:")
 for disease in batches[0]:
     print(f"  {disease['disease_id']}: {disease['cui']} - {disease['disease_name']}")
@@ -7,6 +7,8 @@ Maps diseases to epidemiological incidence/prevalence data with proper sourcing.
 import json
 from pathlib import Path
 
+from total_cases import total_cases_per_year
+
 # Epidemiological database for the 5 requested rare diseases
 DISEASE_DATABASE = {
     # C0265514 - Dermatofibrosis lenticularis disseminata (progressing acanthosis nigricans variant)
@@ -124,13 +126,7 @@ def map_cui_to_result(cui, cui_name):
     prevalence = data.get("prevalence_per_100k")
 
     # Calculate total cases per year (global population ~8 billion / 100k = 80,000 units of 100k)
-    total_cases = None
-    if isinstance(incidence, (int, float)) and incidence > 0:
-        total_cases = int(incidence * 80000)
-    elif isinstance(prevalence, (int, float)) and prevalence > 0:
-        total_cases = int(prevalence * 80000)
-    elif isinstance(incidence, str) and incidence == "extremely rare":
-        total_cases = "extremely rare"
+    total_cases = total_cases_per_year(incidence, prevalence)
 
     return {
         "cui": cui,
@@ -0,0 +1,165 @@
+#!/usr/bin/env python3
+"""
+Merge row-range CSV shards into the master disease_incidence_data.csv.
+Builds a CUI hash index over the master rows once, then streams each shard
+through it: rows for new CUIs are appended, rows for known CUIs are resolved
+by the conflict policy. Duplicate CUIs inside the master are resolved the
+same way. The merged table is written once, atomically.
+
+Shard headers are matched by column name (in any order; disease_name is read
+as cui_name), and the output always uses the 17-column result schema. When a
+row replaces another, it is merged field by field: a column the shard lacks,
+or an empty cell, keeps the existing value of a schema-valid row, and a
+merge that would turn a valid row invalid (column-shifted shard rows) keeps
+the current row.
+
+Conflict policies:
+    confidence  keep the row with the higher confidence (ties go to the newer row)
+    newest      keep the row read last (shards are applied in the order given)
+
+Usage:
+    python merge_shards.py [SHARD.csv ...] [--master PATH] [--policy confidence] [--out PATH] [--sort]
+"""
+
+import argparse
+import csv
+import os
+from pathlib import Path
+
+from incidence_record import FIELDNAMES, parse_csv_value
+from validation import validate
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_MASTER_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+DEFAULT_SHARDS = [
+    REPO_DIR / "output" / "disease_incidence_data_rows_6001_7000.csv",
+    REPO_DIR / "output" / "disease_incidence_data_rows_8001_9000.csv",
+    REPO_DIR / "output" / "disease_incidence_data_rows_9001_10000.csv",
+    REPO_DIR / "output" / "disease_incidence_data_rows_10001_11000.csv",
+    REPO_DIR / "disease_incidence_data_rows_11001_12000.csv",
+]
+
+# Older shards name some columns differently
+COLUMN_ALIASES = {"disease_name": "cui_name"}
+
+
+def _confidence(row):
+    try:
+        return float(row["confidence"])
+    except (TypeError, ValueError):
+        return -1.0
+
+
+def prefer_confidence(current, incoming):
+    return _confidence(incoming) >= _confidence(current)
+
+
+def is_valid(row):
+    """Whether a CSV row (string cells) passes schema validation."""
+    return not validate({field: parse_csv_value(field, value) for field, value in row.items()})
+
+
+def prefer_newest(current, incoming):
+    return True
+
+
+POLICIES = {
+    "confidence": prefer_confidence,
+    "newest": prefer_newest,
+}
+
+
+def read_rows(csv_path):
+    """Yield rows of a results CSV as dicts over FIELDNAMES (missing columns empty)."""
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = [COLUMN_ALIASES.get(name, name) for name in next(reader, [])]
+        positions = [(field, header.index(field)) for field in FIELDNAMES if field in header]
+        for cells in reader:
+            row = dict.fromkeys(FIELDNAMES, "")
+            for field, position in positions:
+                if position < len(cells):
+                    row[field] = cells[position]
+            if row["cui"]:
+                yield row
+
+
+class ShardMerger:
+    """CUI-indexed table that rows are upserted into under a conflict policy."""
+
+    def __init__(self, policy="confidence"):
+        self.prefer = POLICIES[policy]
+        self.rows = []
+        self.index = {}
+        self.stats = {"added": 0, "replaced": 0, "kept": 0, "duplicate": 0}
+
+    def upsert(self, row):
+        position = self.index.get(row["cui"])
+        if position is None:
+            self.index[row["cui"]] = len(self.rows)
+            self.rows.append(row)
+            self.stats["added"] += 1
+            return
+        current = self.rows[position]
+        if current == row:
+            self.stats["duplicate"] += 1
+        elif self.prefer(current, row):
+            # Older shards lack some columns: never blank a cell of a valid row.
+            # A column-shifted current row has no cells worth keeping.
+            if is_valid(current):
+                row = {field: row[field] or current[field] for field in FIELDNAMES}
+                if not is_valid(row):
+                    self.stats["kept"] += 1
+                    return
+            self.rows[position] = row
+            self.stats["replaced"] += 1
+        else:
+            self.stats["kept"] += 1
+
+    def merge_file(self, csv_path):
+        for row in read_rows(csv_path):
+            self.upsert(row)
+
+    def write(self, out_path, sort=False):
+        out_path = Path(out_path)
+        rows = sorted(self.rows, key=lambda row: row["cui"]) if sort else self.rows
+        tmp_path = out_path.with_name(out_path.name + ".tmp")
+        with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDNAMES)
+            writer.writeheader()
+            writer.writerows(rows)
+        os.replace(tmp_path, out_path)
+        return len(rows)
+
+
+def merge_shards(master_path=DEFAULT_MASTER_PATH, shard_paths=DEFAULT_SHARDS, policy="confidence",
+                 out_path=None, sort=False):
+    """Merge shards into the master table. Returns (row count, {shard: stats})."""
+    merger = ShardMerger(policy)
+    report = {}
+    for path in [master_path] + list(shard_paths):
+        before = dict(merger.stats)
+        merger.merge_file(path)
+        report[str(path)] = {key: merger.stats[key] - before[key] for key in before}
+    count = merger.write(out_path or master_path, sort)
+    return count, report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Merge row-range CSV shards into the master dataset")
+    parser.add_argument("shards", nargs="*", default=[str(path) for path in DEFAULT_SHARDS])
+    parser.add_argument("--master", default=str(DEFAULT_MASTER_PATH))
+    parser.add_argument("--policy", choices=list(POLICIES), default="confidence")
+    parser.add_argument("--out", default=None, help="Output path (default: rewrite the master in place)")
+    parser.add_argument("--sort", action="store_true", help="Sort the output by CUI")
+    args = parser.parse_args()
+
+    count, report = merge_shards(args.master, args.shards, args.policy, args.out, args.sort)
+    for path, stats in report.items():
+        print(f"{path}: {stats['added']} added, {stats['replaced']} replaced, {stats['kept']} kept, "
+              f"{stats['duplicate']} duplicate")
+    print(f"\nWrote {count} rows to {args.out or args.master}")
+
+
+if __name__ == "__main__":
+    main()
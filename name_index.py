@@ -0,0 +1,221 @@
+#!/usr/bin/env python3
+"""
+Trigram inverted index over disease names.
+Finds near-duplicate and variant names ("Cerebral Palsy" / "Ataxic Cerebral
+Palsy") without scanning every name: each name is split into character
+trigrams, and a query counts the trigrams it shares with every indexed name
+in one np.bincount over the posting lists of its own trigrams. Names are
+ranked by Jaccard similarity of their trigram sets.
+
+Names come from the disease codes CSV (not yet mapped) and the consolidated
+results CSV (mapped, so prior() can offer their estimate before a new
+mapping call). The index is compiled to output/name_index.npz and rebuilt
+when either source is newer.
+
+Usage:
+    python name_index.py build
+    python name_index.py query "Ataxic Cerebral Palsy" [-k 10] [--mapped-only]
+"""
+
+import argparse
+import csv
+import json
+import re
+import time
+from pathlib import Path
+
+from cui_store import KEY_WIDTH, store_is_stale
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_INDEX_PATH = REPO_DIR / "output" / "name_index.npz"
+DEFAULT_INPUT_PATH = REPO_DIR / "data" / "disease_codes_Charlie.csv"
+DEFAULT_RESULTS_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+
+INPUT = 0
+MAPPED = 1
+SOURCE_NAMES = {INPUT: "input", MAPPED: "mapped"}
+
+MIN_PRIOR_SCORE = 0.5
+
+_NON_ALNUM = re.compile(r"[^0-9a-z]+")
+
+
+def trigrams(name):
+    """Set of character trigrams of a name, words padded as in pg_trgm."""
+    words = _NON_ALNUM.split((name or "").casefold())
+    grams = set()
+    for word in words:
+        if word:
+            padded = f"  {word} "
+            grams.update(padded[i:i + 3] for i in range(len(padded) - 2))
+    return grams
+
+
+def _is_cui(value):
+    return len(value) == KEY_WIDTH and value.startswith("C") and value[1:].isdigit()
+
+
+def load_names(input_path=DEFAULT_INPUT_PATH, results_path=DEFAULT_RESULTS_PATH):
+    """Yield (cui, name, source) for every distinct CUI/name pair in the sources."""
+    seen = set()
+    with open(input_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f):
+            entry = (row["diseaseid"], row["diseasename"], INPUT)
+            if entry[:2] not in seen:
+                seen.add(entry[:2])
+                yield entry
+    if not Path(results_path).exists():
+        return
+    with open(results_path, "r", newline="", encoding="utf-8") as f:
+        rows = csv.reader(f)
+        next(rows, None)
+        for row in rows:
+            # Column-shifted rows do not start with a CUI; skip them
+            if len(row) < 2 or not _is_cui(row[0]):
+                continue
+            entry = (row[0], row[1], MAPPED)
+            if entry[:2] in seen:
+                continue
+            seen.add(entry[:2])
+            yield entry
+
+
+def build_index(out_path=DEFAULT_INDEX_PATH, input_path=DEFAULT_INPUT_PATH, results_path=DEFAULT_RESULTS_PATH):
+    """Compile the trigram index of both sources. Returns the number of names indexed."""
+    import numpy as np
+
+    cuis, names, sources, sizes = [], [], [], []
+    vocabulary = {}
+    gram_ids, doc_ids = [], []
+    for doc, (cui, name, source) in enumerate(load_names(input_path, results_path)):
+        grams = trigrams(name)
+        cuis.append(cui)
+        names.append(name)
+        sources.append(source)
+        sizes.append(len(grams))
+        for gram in grams:
+            gram_ids.append(vocabulary.setdefault(gram, len(vocabulary)))
+            doc_ids.append(doc)
+    # A name is "mapped" if its CUI has a consolidated result, whichever source listed it
+    mapped_cuis = {cui for cui, source in zip(cuis, sources) if source == MAPPED}
+    sources = [MAPPED if cui in mapped_cuis else source for cui, source in zip(cuis, sources)]
+
+    # Posting lists in CSR form: the docs of trigram g are docs[offsets[g]:offsets[g + 1]]
+    gram_ids = np.asarray(gram_ids, dtype=np.int32)
+    order = np.argsort(gram_ids, kind="stable")
+    offsets = np.zeros(len(vocabulary) + 1, dtype=np.int64)
+    np.cumsum(np.bincount(gram_ids, minlength=len(vocabulary)), out=offsets[1:])
+
+    out_path = Path(out_path)
+    tmp_path = out_path.with_name(out_path.name + ".tmp.npz")
+    np.savez(
+        tmp_path,
+        vocabulary=np.array(list(vocabulary), dtype="U3"),
+        offsets=offsets,
+        docs=np.asarray(doc_ids, dtype=np.int32)[order],
+        sizes=np.asarray(sizes, dtype=np.int32),
+        sources=np.asarray(sources, dtype=np.int8),
+        cuis=np.array(cuis, dtype=f"U{KEY_WIDTH}"),
+        names=np.array(names, dtype=str),
+    )
+    tmp_path.replace(out_path)
+    return len(cuis)
+
+
+class NameIndex:
+    """Top-k trigram similarity search over indexed disease names."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        import numpy as np
+
+        self._np = np
+        with np.load(path) as data:
+            self._grams = {gram: i for i, gram in enumerate(data["vocabulary"].tolist())}
+            self._offsets = data["offsets"]
+            self._docs = data["docs"]
+            self._sizes = data["sizes"]
+            self._sources = data["sources"]
+            self.cuis = data["cuis"]
+            self.names = data["names"]
+
+    def __len__(self):
+        return len(self.cuis)
+
+    def search(self, name, k=10, mapped_only=False, exclude_cui=None):
+        """Return up to k (score, cui, name, source) matches, best first.
+
+        score is the Jaccard similarity of the trigram sets, in (0, 1].
+        """
+        np = self._np
+        grams = trigrams(name)
+        ids = [self._grams[gram] for gram in grams if gram in self._grams]
+        if not ids:
+            return []
+        postings = np.concatenate([self._docs[self._offsets[i]:self._offsets[i + 1]] for i in ids])
+        shared = np.bincount(postings, minlength=len(self.cuis))
+        candidates = np.flatnonzero(shared)
+        if mapped_only:
+            candidates = candidates[self._sources[candidates] == MAPPED]
+        if exclude_cui is not None:
+            candidates = candidates[self.cuis[candidates] != exclude_cui]
+        hits = shared[candidates]
+        scores = hits / (len(grams) + self._sizes[candidates] - hits)
+
+        if len(candidates) > k:
+            top = np.argpartition(scores, -k)[-k:]
+            candidates, scores = candidates[top], scores[top]
+        order = np.argsort(-scores, kind="stable")
+        return [
+            (float(score), str(self.cuis[doc]), str(self.names[doc]), SOURCE_NAMES[int(self._sources[doc])])
+            for doc, score in zip(candidates[order], scores[order])
+        ]
+
+    def prior(self, cui, name, min_score=MIN_PRIOR_SCORE):
+        """Best already-mapped near-duplicate of a disease (other than itself), or None.
+
+        Returns (score, cui, name); its result can be read with csv_index.
+        """
+        matches = self.search(name, k=1, mapped_only=True, exclude_cui=cui)
+        if matches and matches[0][0] >= min_score:
+            return matches[0][:3]
+        return None
+
+
+def open_name_index(path=DEFAULT_INDEX_PATH, input_path=DEFAULT_INPUT_PATH, results_path=DEFAULT_RESULTS_PATH):
+    """Open the name index, building or rebuilding it first if a source changed."""
+    if store_is_stale(path, [input_path, results_path]):
+        build_index(path, input_path, results_path)
+    return NameIndex(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Trigram similarity search over disease names")
+    parser.add_argument("--index", default=str(DEFAULT_INDEX_PATH))
+    parser.add_argument("--input", default=str(DEFAULT_INPUT_PATH))
+    parser.add_argument("--results", default=str(DEFAULT_RESULTS_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("build", help="Compile the index")
+    query_parser = subparsers.add_parser("query", help="Find names similar to NAME")
+    query_parser.add_argument("name")
+    query_parser.add_argument("-k", type=int, default=10)
+    query_parser.add_argument("--mapped-only", action="store_true", help="Only names with a consolidated result")
+
+    args = parser.parse_args()
+
+    if args.command == "build":
+        count = build_index(args.index, args.input, args.results)
+        print(f"Indexed {count} names into {args.index}")
+        return
+
+    index = open_name_index(args.index, args.input, args.results)
+    start = time.perf_counter()
+    matches = index.search(args.name, args.k, args.mapped_only)
+    elapsed = time.perf_counter() - start
+    for score, cui, name, source in matches:
+        print(json.dumps({"score": round(score, 3), "cui": cui, "name": name, "source": source}, ensure_ascii=False))
+    print(f"{len(matches)} matches in {elapsed * 1000:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
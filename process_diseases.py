@@ -5,6 +5,8 @@ Process 5 diseases using cui-incidence-mapper_2 skill specifications
 import json
 import os
 
+from total_cases import total_cases_per_year
+
 # Disease data to process
 diseases_to_process = [
     {
@@ -111,10 +113,9 @@ for disease in diseases_to_process:
 
     # Calculate total_cases_per_year if not already provided
     if "total_cases_per_year" not in disease or disease["total_cases_per_year"] is None:
-        if isinstance(disease.get("incidence_per_100k"), (int, float)):
-            disease["total_cases_per_year"] = disease["incidence_per_100k"] * 80000
-        else:
-            disease["total_cases_per_year"] = "extremely rare"
+        disease["total_cases_per_year"] = total_cases_per_year(
+            disease.get("incidence_per_100k"), disease.get("prevalence_per_100k")
+        )
 
     # Create output JSON with required fields
     output = {
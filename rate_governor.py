@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+"""
+Token-bucket rate governor shared by every batch launcher on the machine.
+Holds a requests-per-minute bucket and a tokens-per-minute bucket in a small
+state file. Each update takes an exclusive flock on the file, so launchers
+running in separate processes draw from the same quota.
+
+try_acquire() either takes one request plus the estimated tokens and returns
+0, or takes nothing and returns how many seconds to wait. acquire() sleeps
+for that long and retries. settle() corrects the token bucket once a call's
+actual usage is known.
+
+Usage:
+    python rate_governor.py status [--rpm 50 --tpm 40000]
+    python rate_governor.py acquire [--tokens 2000]
+"""
+
+import argparse
+import fcntl
+import json
+import os
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_STATE_PATH = REPO_DIR / "output" / "rate_governor.json"
+
+DEFAULT_RPM = 50
+DEFAULT_TPM = 40_000
+
+
+class RateGovernor:
+    """Requests-per-minute and tokens-per-minute buckets in a file-locked state file."""
+
+    def __init__(self, path=DEFAULT_STATE_PATH, rpm=DEFAULT_RPM, tpm=DEFAULT_TPM):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.capacity = {"requests": float(rpm), "tokens": float(tpm)}
+        # Buckets refill continuously at capacity per minute
+        self.rate = {name: capacity / 60.0 for name, capacity in self.capacity.items()}
+
+    def _read_state(self, fd):
+        """Read the whole state file; an unreadable one (e.g. torn by a crash) means full buckets."""
+        chunks = []
+        while chunk := os.read(fd, 65536):
+            chunks.append(chunk)
+        raw = b"".join(chunks)
+        if not raw:
+            return {}
+        try:
+            state = json.loads(raw)
+        except ValueError as e:
+            print(f"Warning: ignoring corrupt rate governor state {self.path} ({e}); starting with full buckets")
+            return {}
+        if not isinstance(state, dict):
+            print(f"Warning: ignoring rate governor state {self.path} that is not a JSON object; starting with full buckets")
+            return {}
+        return state
+
+    def _update(self, change):
+        """Refill the buckets, apply change(levels, now) under the lock, and save.
+
+        change returns a value that is passed back to the caller.
+        """
+        fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX)
+            now = time.time()
+            state = self._read_state(fd)
+            elapsed = max(0.0, now - state.get("updated", now))
+            levels = {
+                name: min(capacity, state.get(name, capacity) + elapsed * self.rate[name])
+                for name, capacity in self.capacity.items()
+            }
+            result = change(levels, now)
+            os.lseek(fd, 0, os.SEEK_SET)
+            os.ftruncate(fd, 0)
+            os.write(fd, json.dumps({**levels, "updated": now}).encode())
+            return result
+        finally:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+            os.close(fd)
+
+    def try_acquire(self, tokens=0):
+        """Take one request and `tokens` tokens if both are available.
+
+        Returns 0.0 when granted, otherwise the seconds until they will be.
+        """
+        if tokens > self.capacity["tokens"]:
+            raise ValueError(f"{tokens} tokens exceeds the per-minute budget of {self.capacity['tokens']:.0f}")
+        need = {"requests": 1.0, "tokens": float(tokens)}
+
+        def take(levels, now):
+            wait = max((need[name] - levels[name]) / self.rate[name] for name in need)
+            if wait > 0:
+                return wait
+            for name in need:
+                levels[name] -= need[name]
+            return 0.0
+
+        return self._update(take)
+
+    def acquire(self, tokens=0, timeout=None):
+        """Block until one request and `tokens` tokens are granted. Returns the time waited."""
+        start = time.monotonic()
+        while True:
+            wait = self.try_acquire(tokens)
+            if wait == 0:
+                return time.monotonic() - start
+            if timeout is not None and time.monotonic() - start + wait > timeout:
+                raise TimeoutError(f"rate budget not available within {timeout}s")
+            time.sleep(wait)
+
+    def settle(self, estimated, actual):
+        """Charge (or refund) the difference between estimated and actual tokens used.
+
+        The token bucket may go negative, which delays later callers.
+        """
+        def adjust(levels, now):
+            levels["tokens"] = min(self.capacity["tokens"], levels["tokens"] - (actual - estimated))
+
+        self._update(adjust)
+
+    def levels(self):
+        """Current bucket levels after refill."""
+        return self._update(lambda levels, now: dict(levels))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Shared request/token rate governor")
+    parser.add_argument("--state", default=str(DEFAULT_STATE_PATH))
+    parser.add_argument("--rpm", type=float, default=DEFAULT_RPM)
+    parser.add_argument("--tpm", type=float, default=DEFAULT_TPM)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Show bucket levels")
+    acquire_parser = subparsers.add_parser("acquire", help="Block until a request is allowed")
+    acquire_parser.add_argument("--tokens", type=int, default=0)
+
+    args = parser.parse_args()
+    governor = RateGovernor(args.state, args.rpm, args.tpm)
+
+    if args.command == "status":
+        levels = governor.levels()
+        print(f"requests: {levels['requests']:.1f}/{args.rpm:.0f}  tokens: {levels['tokens']:.0f}/{args.tpm:.0f}")
+    else:
+        waited = governor.acquire(args.tokens)
+        print(f"Granted after {waited:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
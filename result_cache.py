@@ -0,0 +1,252 @@
+#!/usr/bin/env python3
+"""
+Content-addressed cache of mapped result records.
+Records are keyed by a hash of (CUI, normalized name, backend version), so a
+re-run after a crash or a change that leaves the rules alone reuses earlier
+results instead of mapping again, while a rules change (a new version
+string) misses cleanly. The cache lives in a local SQLite file and is capped
+in size; least recently used records are evicted first.
+
+cached() wraps a (cui, name) mapping backend so it consults the cache first.
+Its version is a string, or a function of (cui, name) when a backend's output
+depends on per-disease data: the mapper versions each mapping by its code
+version and that CUI's store record, so editing one knowledge-base entry
+only invalidates that entry. Hit, miss, store and eviction counts are kept
+per ResultCache instance.
+
+Usage:
+    python result_cache.py [--cache output/result_cache.sqlite] status
+    python result_cache.py import PATH ... --backend rules   # seed from results logs or {cui}.json directories
+    python result_cache.py import PATH ... --version VERSION
+    python result_cache.py clear
+"""
+
+import argparse
+import hashlib
+import inspect
+import json
+import sqlite3
+import threading
+import time
+from pathlib import Path
+
+from incidence_record import normalize_name
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_CACHE_PATH = REPO_DIR / "output" / "result_cache.sqlite"
+
+MAX_BYTES = 256 * 1024 * 1024
+FLUSH_EVERY = 500
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    key       TEXT PRIMARY KEY,
+    cui       TEXT NOT NULL,
+    record    TEXT NOT NULL,
+    size      INTEGER NOT NULL,
+    last_used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS results_last_used ON results (last_used);
+"""
+
+
+def cache_key(cui, name, version):
+    """Hex digest identifying a (CUI, name, backend version) mapping."""
+    text = "\x1f".join((cui, normalize_name(name), version))
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed LRU cache of result dicts, capped at max_bytes of stored JSON.
+
+    Stores and recency updates are buffered and written in one transaction
+    every flush_every operations (and on close).
+    """
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, max_bytes=MAX_BYTES, flush_every=FLUSH_EVERY):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.flush_every = flush_every
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None, check_same_thread=False)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+        self._stores = {}
+        self._touched = {}
+        # Backends may run on worker threads (async_orchestrator's blocking mode)
+        self._lock = threading.RLock()
+        self.counts = {"hits": 0, "misses": 0, "stores": 0, "evictions": 0}
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        if self._db is not None:
+            self.flush()
+            self._db.close()
+            self._db = None
+
+    def get(self, cui, name, version):
+        """Return the cached result dict for a mapping, or None."""
+        key = cache_key(cui, name, version)
+        with self._lock:
+            if key in self._stores:
+                record = self._stores[key][1]
+            else:
+                row = self._db.execute("SELECT record FROM results WHERE key = ?", (key,)).fetchone()
+                if row is None:
+                    self.counts["misses"] += 1
+                    return None
+                record = row[0]
+                self._touched[key] = time.time()
+                self._maybe_flush()
+            self.counts["hits"] += 1
+        return json.loads(record)
+
+    def put(self, cui, name, version, result):
+        """Cache a result dict for a mapping."""
+        key = cache_key(cui, name, version)
+        record = json.dumps(result, ensure_ascii=False, separators=(",", ":"))
+        with self._lock:
+            self._stores[key] = (cui, record)
+            self._touched.pop(key, None)
+            self.counts["stores"] += 1
+            self._maybe_flush()
+
+    def _maybe_flush(self):
+        if len(self._stores) + len(self._touched) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write buffered stores and recency updates, then evict down to max_bytes."""
+        with self._lock:
+            if not self._stores and not self._touched:
+                return
+            now = time.time()
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                self._db.executemany(
+                    "UPDATE results SET last_used = ? WHERE key = ?",
+                    ((used, key) for key, used in self._touched.items()),
+                )
+                self._db.executemany(
+                    "INSERT OR REPLACE INTO results (key, cui, record, size, last_used) VALUES (?, ?, ?, ?, ?)",
+                    ((key, cui, record, len(record.encode("utf-8")), now)
+                     for key, (cui, record) in self._stores.items()),
+                )
+                self._evict()
+                self._db.execute("COMMIT")
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._stores = {}
+            self._touched = {}
+
+    def _evict(self):
+        excess = self._db.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0] - self.max_bytes
+        if excess <= 0:
+            return
+        keys = []
+        for key, size in self._db.execute("SELECT key, size FROM results ORDER BY last_used"):
+            keys.append((key,))
+            excess -= size
+            if excess <= 0:
+                break
+        self._db.executemany("DELETE FROM results WHERE key = ?", keys)
+        self.counts["evictions"] += len(keys)
+
+    def clear(self):
+        with self._lock:
+            self._stores = {}
+            self._touched = {}
+            self._db.execute("DELETE FROM results")
+
+    def stats(self):
+        """Entry count and stored bytes, plus this instance's counters."""
+        self.flush()
+        entries, size = self._db.execute("SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results").fetchone()
+        return {"entries": entries, "bytes": size, **self.counts}
+
+
+def cached(func, cache, version):
+    """Wrap a (cui, name) -> result dict backend so it consults cache first.
+
+    version is a string or a (cui, name) -> string function. Works for plain
+    and coroutine functions; the wrapper has the same kind.
+    """
+    version_of = version if callable(version) else lambda cui, name: version
+    if inspect.iscoroutinefunction(func):
+        async def lookup(cui, name):
+            mapping_version = version_of(cui, name)
+            result = cache.get(cui, name, mapping_version)
+            if result is None:
+                result = await func(cui, name)
+                cache.put(cui, name, mapping_version, result)
+            return result
+    else:
+        def lookup(cui, name):
+            mapping_version = version_of(cui, name)
+            result = cache.get(cui, name, mapping_version)
+            if result is None:
+                result = func(cui, name)
+                cache.put(cui, name, mapping_version, result)
+            return result
+    return lookup
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or seed the mapped result cache")
+    parser.add_argument("--cache", default=str(DEFAULT_CACHE_PATH))
+    parser.add_argument("--max-mb", type=float, default=MAX_BYTES / (1024 * 1024))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    subparsers.add_parser("status", help="Show entry count and size")
+    import_parser = subparsers.add_parser("import", help="Cache existing results under a backend version")
+    import_parser.add_argument("paths", nargs="+", help="Results logs or directories of {cui}.json files")
+    version = import_parser.add_mutually_exclusive_group(required=True)
+    version.add_argument("--backend", choices=("rules", "mapper"), help="Cache them under this backend's versions")
+    version.add_argument("--version", help="Cache them under a fixed version string")
+    import_parser.add_argument("--input", default=None,
+                               help="Disease codes CSV giving the input name each CUI is mapped under "
+                                    "(default: data/disease_codes_Charlie.csv)")
+    subparsers.add_parser("clear", help="Remove every entry")
+
+    args = parser.parse_args()
+
+    with ResultCache(args.cache, max_bytes=int(args.max_mb * 1024 * 1024)) as cache:
+        if args.command == "import":
+            from input_index import DEFAULT_CSV_PATH, open_input_index
+            from results_log import iter_results
+            if args.backend:
+                from async_orchestrator import BACKENDS
+                _, version_of = BACKENDS[args.backend]()
+            else:
+                version_of = lambda cui, name: args.version
+            # Key entries by the name the CUI is mapped under, which for some
+            # backends differs from the cui_name in the result
+            with open_input_index(args.input or DEFAULT_CSV_PATH) as index:
+                for path in args.paths:
+                    count = 0
+                    for result in iter_results(path):
+                        if not isinstance(result, dict) or not result.get("cui"):
+                            continue
+                        row = index.get(result["cui"])
+                        name = row["diseasename"] if row else result.get("cui_name")
+                        cache.put(result["cui"], name, version_of(result["cui"], name), result)
+                        count += 1
+                    print(f"Cached {count} results from {path}")
+        elif args.command == "clear":
+            cache.clear()
+            print("Cleared the result cache")
+
+        stats = cache.stats()
+        print(f"{stats['entries']} entries, {stats['bytes'] / (1024 * 1024):.1f} MB "
+              f"(cap {args.max_mb:.0f} MB, {stats['evictions']} evicted)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,159 @@
+#!/usr/bin/env python3
+"""
+Append-only results log.
+Replaces the one-JSON-file-per-CUI output with a single JSONL log per run plus
+a compact sidecar index of completed CUIs (one CUI per line), so a restarted
+run loads the completed set once instead of stat-ing a file per disease.
+
+    output/results/results.jsonl       one compact JSON result per line
+    output/results/results.jsonl.idx   CUIs in the order they were appended
+
+Every writer (large_scale_processor, async_orchestrator) appends to this one
+log by default, and consolidate_results reads its directory.
+
+iter_results() reads either a log or a legacy directory of {cui}.json files,
+so consolidation sees the same records whichever layout produced them.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from json_reader import DEFAULT_WORKERS, read_json_files
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_LOG_PATH = REPO_DIR / "output" / "results" / "results.jsonl"
+
+FLUSH_EVERY = 1000
+
+
+def index_path(log_path):
+    """Path of the completed-CUI index kept next to a log."""
+    log_path = Path(log_path)
+    return log_path.with_name(log_path.name + ".idx")
+
+
+def unwrap_result(payload):
+    """Return the result dict from a decoded result payload.
+
+    Some runs saved a result as a one-element list; it is unwrapped. Any other
+    payload is returned unchanged (validation quarantines non-dict payloads).
+    """
+    if isinstance(payload, list) and len(payload) == 1 and isinstance(payload[0], dict):
+        return payload[0]
+    return payload
+
+
+def _read_log_lines(log_path):
+    """Yield parsed records from a log, skipping a torn final line."""
+    with open(log_path, "r", encoding="utf-8") as f:
+        for line in f:
+            if not line.endswith("\n"):
+                break
+            yield unwrap_result(json.loads(line))
+
+
+def rebuild_index(log_path):
+    """Rewrite a log's completed-CUI index from the log itself. Returns the CUIs."""
+    cuis = [record.get("cui") for record in _read_log_lines(log_path) if isinstance(record, dict)]
+    index_path(log_path).write_text("".join(f"{cui}\n" for cui in cuis if cui), encoding="utf-8")
+    return set(cuis)
+
+
+class ResultsLog:
+    """Buffered, append-only writer for mapper results.
+
+    completed may be passed in (e.g. from a run journal) to skip loading the
+    index. After each flush, on_flush(cuis, size) is called with the CUIs
+    written and the log's new size; with fsync=True the log is synced first.
+    """
+
+    def __init__(self, log_path=DEFAULT_LOG_PATH, flush_every=FLUSH_EVERY, completed=None, on_flush=None,
+                 fsync=False):
+        self.path = Path(log_path)
+        self.index_path = index_path(self.path)
+        self.flush_every = flush_every
+        self.completed = self._load_completed() if completed is None else completed
+        self.on_flush = on_flush
+        self.fsync = fsync
+        self._lines = []
+        self._cuis = []
+
+    def _load_completed(self):
+        """Load completed CUIs from the index, rebuilding it from the log if it is missing or stale."""
+        if not self.path.exists():
+            return set()
+        if self.index_path.exists() and self.index_path.stat().st_mtime >= self.path.stat().st_mtime:
+            return set(self.index_path.read_text(encoding="utf-8").split())
+        return rebuild_index(self.path)
+
+    def __contains__(self, cui):
+        return cui in self.completed
+
+    def __len__(self):
+        return len(self.completed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def append(self, result):
+        """Queue one result dict for writing."""
+        cui = result.get("cui")
+        self._lines.append(json.dumps(result, ensure_ascii=False) + "\n")
+        self._cuis.append(f"{cui}\n")
+        self.completed.add(cui)
+        if len(self._lines) >= self.flush_every:
+            self.flush()
+
+    def flush(self):
+        """Write queued results to the log, then their CUIs to the index."""
+        if not self._lines:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write("".join(self._lines))
+            f.flush()
+            if self.fsync:
+                os.fsync(f.fileno())
+            size = f.tell()
+        with open(self.index_path, "a", encoding="utf-8") as f:
+            f.write("".join(self._cuis))
+        if self.on_flush:
+            self.on_flush([cui[:-1] for cui in self._cuis], size)
+        self._lines = []
+        self._cuis = []
+
+    def close(self):
+        self.flush()
+
+
+def iter_results(path=DEFAULT_LOG_PATH, workers=DEFAULT_WORKERS, decoder=None):
+    """Yield result dicts from a results log or a directory of per-CUI JSON files.
+
+    A directory is read as its *.json files (sorted by name, read in parallel
+    by json_reader) followed by any *.jsonl logs in it. Within a log, a later
+    record for a CUI supersedes an earlier one; callers that need one row per
+    CUI should keep the last.
+    """
+    path = Path(path)
+    if path.is_file():
+        yield from _read_log_lines(path)
+        return
+
+    for payload in read_json_files(sorted(path.glob("*.json")), workers=workers, decoder=decoder):
+        yield unwrap_result(payload)
+    for log_file in sorted(path.glob("*.jsonl")):
+        yield from _read_log_lines(log_file)
+
+
+def completed_cuis(path):
+    """CUIs already present in a results log or legacy results directory."""
+    path = Path(path)
+    if path.is_file():
+        return ResultsLog(path).completed
+    if not path.is_dir():
+        return set()
+    return {name[:-len(".json")] for name in os.listdir(path) if name.endswith(".json")}
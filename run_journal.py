@@ -0,0 +1,294 @@
+#!/usr/bin/env python3
+"""
+Crash-resumable run journal.
+Records which CUIs and batches a run has completed, so a restart reads the
+last checkpoint plus the journal written since it, instead of globbing or
+stat-ing the output directory.
+
+    output/results/run_journal.log    one record per line: "SEQ KIND VALUE CRC32"
+    output/results/run_journal.ckpt   JSON snapshot of the completed state and
+                                      the journal offset it covers
+
+Records are written in commit groups: the CUIs of one results-log flush, then
+a "commit" record carrying the log's size after that flush. On load, a group
+without its commit record, a record with a bad checksum or an out-of-sequence
+record ends the journal; it is truncated there, so those CUIs are redone.
+recover_results() likewise truncates a results log back to the last
+committed size, dropping results that were written but never journaled.
+open_journaled_log() pairs a results log with the journal next to it, so
+every writer of the log commits its flushes.
+
+Usage:
+    python run_journal.py [--journal output/results/run_journal.log] status
+    python run_journal.py [--journal PATH] checkpoint
+"""
+
+import argparse
+import json
+import os
+import zlib
+from pathlib import Path
+
+from results_log import DEFAULT_LOG_PATH, ResultsLog, completed_cuis, rebuild_index
+
+REPO_DIR = Path(__file__).resolve().parent
+JOURNAL_NAME = "run_journal.log"
+DEFAULT_JOURNAL_PATH = DEFAULT_LOG_PATH.with_name(JOURNAL_NAME)
+
+CHECKPOINT_VERSION = 1
+SYNC_EVERY = 1000
+CHECKPOINT_EVERY = 50_000
+
+CUI = "cui"
+COMMIT = "commit"
+BATCH = "batch"
+
+
+def checkpoint_path(journal_path):
+    journal_path = Path(journal_path)
+    return journal_path.with_suffix(".ckpt")
+
+
+def _record(seq, kind, value):
+    body = f"{seq} {kind} {value}"
+    return f"{body} {zlib.crc32(body.encode('utf-8')):08x}\n".encode("utf-8")
+
+
+def _parse_record(line):
+    """Return (seq, kind, value) for an intact record, or None."""
+    try:
+        body, crc = line.decode("utf-8").rsplit(" ", 1)
+        if int(crc, 16) != zlib.crc32(body.encode("utf-8")):
+            return None
+        seq, kind, value = body.split(" ", 2)
+        return int(seq), kind, value
+    except ValueError:
+        return None
+
+
+class RunJournal:
+    """Append-only journal of completed CUIs and batches with periodic fsync and checkpoints.
+
+    With read_only=True the journal is only loaded: a corrupt tail is skipped
+    rather than truncated, and nothing is written or checkpointed.
+    """
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, sync_every=SYNC_EVERY, checkpoint_every=CHECKPOINT_EVERY,
+                 read_only=False):
+        self.path = Path(path)
+        self.read_only = read_only
+        if not read_only:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.checkpoint_path = checkpoint_path(self.path)
+        self.sync_every = sync_every
+        self.checkpoint_every = checkpoint_every
+
+        self.completed = set()
+        self.batches = set()
+        self.seq = 0
+        self.results_size = 0
+        self.discarded = 0
+        offset = self._load_checkpoint()
+        self._replay(offset)
+
+        self._file = None if read_only else open(self.path, "ab")
+        self._unsynced = 0
+        self._since_checkpoint = 0
+
+    def _load_checkpoint(self):
+        """Restore state from the checkpoint. Returns the journal offset to replay from."""
+        try:
+            with open(self.checkpoint_path, "r", encoding="utf-8") as f:
+                checkpoint = json.load(f)
+        except (OSError, ValueError):
+            return 0
+        journal_size = self.path.stat().st_size if self.path.exists() else 0
+        if checkpoint.get("version") != CHECKPOINT_VERSION or checkpoint["offset"] > journal_size:
+            return 0
+        self.completed = set(checkpoint["cuis"])
+        self.batches = set(checkpoint["batches"])
+        self.seq = checkpoint["seq"]
+        self.results_size = checkpoint["results_size"]
+        return checkpoint["offset"]
+
+    def _replay(self, offset):
+        """Apply journal records after offset, truncating at the first incomplete or corrupt one."""
+        if not self.path.exists():
+            return
+        with open(self.path, "rb") as f:
+            f.seek(offset)
+            tail = f.read()
+
+        pos = 0
+        committed = 0
+        pending = []
+        seq = self.seq
+        while pos < len(tail):
+            newline = tail.find(b"\n", pos)
+            if newline < 0:
+                break
+            record = _parse_record(tail[pos:newline])
+            if record is None or record[0] != seq + 1:
+                break
+            seq, kind, value = record
+            pos = newline + 1
+            if kind == CUI:
+                pending.append(value)
+                continue
+            if kind == COMMIT:
+                self.completed.update(pending)
+                self.results_size = int(value)
+                pending = []
+            elif kind == BATCH and not pending:
+                self.batches.add(int(value))
+            else:
+                break
+            committed = pos
+            self.seq = seq
+
+        if committed < len(tail):
+            self.discarded = len(tail[committed:].splitlines())
+            if self.read_only:
+                return
+            with open(self.path, "r+b") as f:
+                f.truncate(offset + committed)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __contains__(self, cui):
+        return cui in self.completed
+
+    def _write(self, kind, value):
+        self.seq += 1
+        self._file.write(_record(self.seq, kind, value))
+        self._unsynced += 1
+        self._since_checkpoint += 1
+
+    def commit(self, cuis, results_size=0):
+        """Journal CUIs whose results are written, and the results log size covering them.
+
+        Usable as a ResultsLog on_flush callback.
+        """
+        for cui in cuis:
+            self._write(CUI, cui)
+        self._write(COMMIT, results_size)
+        self.completed.update(cuis)
+        self.results_size = results_size
+        self._maybe_sync()
+
+    def batch_done(self, batch_num):
+        """Journal a batch whose results have all been committed."""
+        self._write(BATCH, batch_num)
+        self.batches.add(batch_num)
+        self._maybe_sync()
+
+    def _maybe_sync(self):
+        if self._since_checkpoint >= self.checkpoint_every:
+            self.checkpoint()
+        elif self._unsynced >= self.sync_every:
+            self.sync()
+
+    def sync(self):
+        """Flush and fsync the journal."""
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self._unsynced = 0
+
+    def checkpoint(self):
+        """Snapshot the completed state so later loads replay only the journal after this point."""
+        self.sync()
+        checkpoint = {
+            "version": CHECKPOINT_VERSION,
+            "seq": self.seq,
+            "offset": self._file.tell(),
+            "results_size": self.results_size,
+            "batches": sorted(self.batches),
+            "cuis": sorted(self.completed),
+        }
+        tmp_path = self.checkpoint_path.with_name(self.checkpoint_path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(checkpoint, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.checkpoint_path)
+        self._since_checkpoint = 0
+
+    def recover_results(self, log_path):
+        """Truncate a results log to the last committed size. Returns the bytes dropped."""
+        log_path = Path(log_path)
+        if not log_path.exists():
+            return 0
+        dropped = log_path.stat().st_size - self.results_size
+        if dropped <= 0:
+            return 0
+        with open(log_path, "r+b") as f:
+            f.truncate(self.results_size)
+        # The index may list CUIs from the dropped tail
+        rebuild_index(log_path)
+        return dropped
+
+    def close(self):
+        if self._file is not None:
+            self.checkpoint()
+            self._file.close()
+            self._file = None
+
+
+def open_journaled_log(log_path=DEFAULT_LOG_PATH):
+    """Open the run journal next to a results log, and the log, committing each flush to the journal.
+
+    The first journaled run adopts the CUIs already in the log and any legacy
+    {cui}.json files beside it; later runs drop results written after the
+    journal's last commit. Returns (journal, log); close the log first.
+    """
+    log_path = Path(log_path)
+    journal = RunJournal(log_path.with_name(JOURNAL_NAME))
+    if journal.seq == 0:
+        log_size = log_path.stat().st_size if log_path.exists() else 0
+        journal.commit(sorted(completed_cuis(log_path) | completed_cuis(log_path.parent)), log_size)
+    elif journal.recover_results(log_path):
+        print(f"Dropped uncommitted results from the end of {log_path}")
+    log = ResultsLog(log_path, completed=journal.completed, on_flush=journal.commit, fsync=True)
+    return journal, log
+
+
+def committed_cuis(log_path=DEFAULT_LOG_PATH):
+    """CUIs whose results in a log are committed, read without modifying the journal.
+
+    Before the first journaled run every CUI in the log (or legacy files beside it) counts.
+    """
+    log_path = Path(log_path)
+    journal = RunJournal(log_path.with_name(JOURNAL_NAME), read_only=True)
+    if journal.seq == 0:
+        return completed_cuis(log_path) | completed_cuis(log_path.parent)
+    return journal.completed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Inspect or checkpoint a run journal")
+    parser.add_argument("--journal", default=str(DEFAULT_JOURNAL_PATH))
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    subparsers.add_parser("status", help="Show completed counts")
+    subparsers.add_parser("checkpoint", help="Write a checkpoint covering the whole journal")
+    args = parser.parse_args()
+
+    if args.command == "status":
+        journal = RunJournal(args.journal, read_only=True)
+        print(f"Completed CUIs: {len(journal.completed)}")
+        print(f"Completed batches: {len(journal.batches)}")
+        print(f"Last sequence number: {journal.seq}")
+        print(f"Committed results size: {journal.results_size} bytes")
+        if journal.discarded:
+            print(f"{journal.discarded} uncommitted records at the journal tail (dropped by the next run)")
+        return
+
+    with RunJournal(args.journal) as journal:
+        print(f"Checkpointed {len(journal.completed)} CUIs at sequence {journal.seq}")
+
+
+if __name__ == "__main__":
+    main()
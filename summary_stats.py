@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Mergeable summary statistics for consolidated results.
+SummaryAggregate is fed one result at a time during consolidation and
+serializes to summary_stats.json. Everything it holds (confidence bins,
+category counts, subtype count and numeric moments) combines exactly with
+merge(), so a global summary can be built from shard summaries without
+re-reading any rows.
+
+Usage:
+    python summary_stats.py merge SHARD_SUMMARY.json ... [--out output/summary_stats.json]
+    python summary_stats.py from-csv SHARD.csv [--out SUMMARY.json]
+"""
+
+import argparse
+import csv
+import json
+import math
+from collections import Counter
+from pathlib import Path
+
+from incidence_record import FIELDNAMES, parse_csv_value
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_SUMMARY_PATH = REPO_DIR / "output" / "summary_stats.json"
+
+CONFIDENCE_BINS = ('high (0.7-1.0)', 'medium (0.3-0.7)', 'low (0.1-0.3)', 'unmappable (0.0)')
+MOMENT_FIELDS = ('confidence', 'incidence_per_100k', 'prevalence_per_100k')
+
+
+def confidence_bin(conf):
+    if conf >= 0.7:
+        return 'high (0.7-1.0)'
+    if conf >= 0.3:
+        return 'medium (0.3-0.7)'
+    if conf >= 0.1:
+        return 'low (0.1-0.3)'
+    return 'unmappable (0.0)'
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool) and not math.isnan(value)
+
+
+class Moments:
+    """Count, mean, sum of squared deviations, min and max of a numeric field."""
+
+    def __init__(self, count=0, mean=0.0, m2=0.0, min=None, max=None):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+        self.min = min
+        self.max = max
+
+    def add(self, x):
+        self.count += 1
+        delta = x - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (x - self.mean)
+        self.min = x if self.min is None else min(self.min, x)
+        self.max = x if self.max is None else max(self.max, x)
+
+    def merge(self, other):
+        """Combine with another Moments in place (Chan et al. pairwise update)."""
+        if other.count == 0:
+            return self
+        if self.count == 0:
+            self.count, self.mean, self.m2, self.min, self.max = other.count, other.mean, other.m2, other.min, other.max
+            return self
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def to_dict(self):
+        variance = self.m2 / (self.count - 1) if self.count > 1 else 0.0
+        return {'count': self.count, 'mean': self.mean, 'std': math.sqrt(variance),
+                'min': self.min, 'max': self.max, 'm2': self.m2}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['count'], data['mean'], data['m2'], data['min'], data['max'])
+
+
+class SummaryAggregate:
+    """Running summary_stats.json contents with an associative merge()."""
+
+    def __init__(self):
+        self.confidence_bins = dict.fromkeys(CONFIDENCE_BINS, 0)
+        self.data_quality_counts = Counter()
+        self.metric_type_counts = Counter()
+        self.source_type_counts = Counter()
+        self.subtype_count = 0
+        self.total = 0
+        self.moments = {field: Moments() for field in MOMENT_FIELDS}
+
+    def add(self, result):
+        conf = result.get('confidence', 0.0)
+        self.confidence_bins[confidence_bin(conf if _is_number(conf) else 0.0)] += 1
+        self.data_quality_counts[result.get('data_quality', 'unknown')] += 1
+        self.metric_type_counts[result.get('metric_type', 'null')] += 1
+        self.source_type_counts[result.get('source_type', 'null')] += 1
+        if result.get('is_subtype'):
+            self.subtype_count += 1
+        self.total += 1
+        for field, moments in self.moments.items():
+            value = result.get(field)
+            if _is_number(value):
+                moments.add(value)
+
+    def merge(self, other):
+        """Fold another aggregate into this one. Returns self."""
+        for level, count in other.confidence_bins.items():
+            self.confidence_bins[level] = self.confidence_bins.get(level, 0) + count
+        self.data_quality_counts.update(other.data_quality_counts)
+        self.metric_type_counts.update(other.metric_type_counts)
+        self.source_type_counts.update(other.source_type_counts)
+        self.subtype_count += other.subtype_count
+        self.total += other.total
+        for field, moments in other.moments.items():
+            self.moments.setdefault(field, Moments()).merge(moments)
+        return self
+
+    def to_dict(self, batch_range=None):
+        """Serialize in the summary_stats.json layout."""
+        summary = {
+            'total_processed': self.total,
+            'confidence_distribution': dict(self.confidence_bins),
+            'data_quality_breakdown': _keyed(self.data_quality_counts),
+            'metric_type_counts': _keyed(self.metric_type_counts),
+            'source_type_distribution': _keyed(self.source_type_counts),
+            'subtypes_identified': self.subtype_count,
+            'review_needed': self.confidence_bins['low (0.1-0.3)'] + self.confidence_bins['unmappable (0.0)'],
+            'numeric_moments': {field: moments.to_dict() for field, moments in self.moments.items()},
+        }
+        if batch_range:
+            summary['batch_range'] = batch_range
+        return summary
+
+    @classmethod
+    def from_dict(cls, summary):
+        """Rebuild an aggregate from a summary written by to_dict()."""
+        if 'numeric_moments' not in summary:
+            raise ValueError("summary was not written by SummaryAggregate and cannot be merged")
+        aggregate = cls()
+        aggregate.confidence_bins.update(summary['confidence_distribution'])
+        aggregate.data_quality_counts.update(_unkeyed(summary['data_quality_breakdown']))
+        aggregate.metric_type_counts.update(_unkeyed(summary['metric_type_counts']))
+        aggregate.source_type_counts.update(_unkeyed(summary['source_type_distribution']))
+        aggregate.subtype_count = summary['subtypes_identified']
+        aggregate.total = summary['total_processed']
+        aggregate.moments = {field: Moments.from_dict(data) for field, data in summary['numeric_moments'].items()}
+        return aggregate
+
+
+def _keyed(counter):
+    # JSON object keys must be strings; None (null metric/source type) is stored as "null"
+    return {'null' if key is None else str(key): count for key, count in counter.items()}
+
+
+def _unkeyed(counts):
+    return {None if key == 'null' else key: count for key, count in counts.items()}
+
+
+def load_summary(path):
+    with open(path, 'r', encoding='utf-8') as f:
+        return SummaryAggregate.from_dict(json.load(f))
+
+
+def write_summary(summary, path=DEFAULT_SUMMARY_PATH):
+    with open(path, 'w') as f:
+        json.dump(summary, f, indent=2)
+
+
+def merge_summaries(paths):
+    """Merge shard summary files into one aggregate."""
+    aggregate = SummaryAggregate()
+    for path in paths:
+        aggregate.merge(load_summary(path))
+    return aggregate
+
+
+def summarize_csv(csv_path):
+    """Build an aggregate from a consolidated CSV (for shards without a mergeable summary)."""
+    aggregate = SummaryAggregate()
+    with open(csv_path, 'r', newline='', encoding='utf-8') as f:
+        for row in csv.DictReader(f):
+            aggregate.add({field: parse_csv_value(field, row.get(field)) for field in FIELDNAMES})
+    return aggregate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Build or merge mergeable summary statistics")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    merge_parser = subparsers.add_parser("merge", help="Merge shard summaries into a global summary")
+    merge_parser.add_argument("summaries", nargs="+")
+    merge_parser.add_argument("--out", default=str(DEFAULT_SUMMARY_PATH))
+
+    csv_parser = subparsers.add_parser("from-csv", help="Summarize a consolidated CSV shard")
+    csv_parser.add_argument("csv")
+    csv_parser.add_argument("--out", default=None, help="Output path (default: print)")
+    csv_parser.add_argument("--batch-range", default=None)
+
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        aggregate = merge_summaries(args.summaries)
+        write_summary(aggregate.to_dict(), args.out)
+        print(f"Merged {len(args.summaries)} summaries ({aggregate.total} records) into {args.out}")
+    else:
+        summary = summarize_csv(args.csv).to_dict(args.batch_range)
+        if args.out:
+            write_summary(summary, args.out)
+            print(f"Wrote summary of {summary['total_processed']} records to {args.out}")
+        else:
+            print(json.dumps(summary, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Total cases per year, computed in one place.
+total_cases_per_year = rate per 100k x (world population / 100k), using
+incidence when it is positive, else prevalence. Rates recorded as
+"extremely rare" yield the "extremely rare" sentinel; anything else yields None.
+
+recompute_total_cases() does the same for whole columns with NumPy (NaN plus a
+boolean flag for the sentinel), and running this file rewrites the
+total_cases_per_year column of a consolidated CSV without re-running the mapper:
+    python total_cases.py [--population 8000000000] [--csv output/disease_incidence_data.csv]
+"""
+
+import argparse
+import csv
+import os
+from pathlib import Path
+
+from incidence_record import EXTREMELY_RARE
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_CSV_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+
+WORLD_POPULATION = 8_000_000_000
+RATE_BASE = 100_000
+
+
+def _is_number(value):
+    return isinstance(value, (int, float)) and not isinstance(value, bool)
+
+
+def total_cases_per_year(incidence, prevalence, population=WORLD_POPULATION):
+    """Total cases per year for a single record."""
+    units = population / RATE_BASE
+    if _is_number(incidence) and incidence > 0:
+        return int(incidence * units)
+    if _is_number(prevalence) and prevalence > 0:
+        return int(prevalence * units)
+    if incidence == EXTREMELY_RARE or prevalence == EXTREMELY_RARE:
+        return EXTREMELY_RARE
+    return None
+
+
+def parse_rate_column(values):
+    """Split raw rate values into a float array (NaN when missing) and an "extremely rare" mask."""
+    import numpy as np
+
+    values = list(values)
+    rates = np.full(len(values), np.nan)
+    rare = np.zeros(len(values), dtype=bool)
+    for i, value in enumerate(values):
+        if _is_number(value):
+            rates[i] = value
+        elif value == EXTREMELY_RARE:
+            rare[i] = True
+        elif isinstance(value, str) and value:
+            try:
+                rates[i] = float(value)
+            except ValueError:
+                pass
+    return rates, rare
+
+
+def recompute_total_cases(incidence, prevalence, incidence_rare, prevalence_rare, population=WORLD_POPULATION):
+    """Vectorized total_cases_per_year over whole columns.
+
+    Takes float rate arrays (NaN when missing) and their "extremely rare" masks.
+    Returns (totals, extremely_rare): totals is a float array, NaN wherever the
+    record has no numeric total, and extremely_rare flags the sentinel rows.
+    """
+    import numpy as np
+
+    units = population / RATE_BASE
+    with np.errstate(invalid="ignore"):
+        incidence_positive = incidence > 0
+        prevalence_positive = prevalence > 0
+    totals = np.where(
+        incidence_positive,
+        np.trunc(incidence * units),
+        np.where(prevalence_positive, np.trunc(prevalence * units), np.nan),
+    )
+    extremely_rare = ~incidence_positive & ~prevalence_positive & (incidence_rare | prevalence_rare)
+    return totals, extremely_rare
+
+
+def recompute_csv(csv_path=DEFAULT_CSV_PATH, out_path=None, population=WORLD_POPULATION):
+    """Rewrite the total_cases_per_year column of a consolidated CSV. Returns the row count."""
+    csv_path = Path(csv_path)
+    out_path = Path(out_path) if out_path else csv_path
+
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        reader = csv.reader(f)
+        header = next(reader)
+        rows = list(reader)
+
+    column = {name: header.index(name) for name in ("incidence_per_100k", "prevalence_per_100k", "total_cases_per_year")}
+
+    def cell(row, name):
+        index = column[name]
+        return row[index] if index < len(row) else ""
+
+    incidence, incidence_rare = parse_rate_column(cell(row, "incidence_per_100k") for row in rows)
+    prevalence, prevalence_rare = parse_rate_column(cell(row, "prevalence_per_100k") for row in rows)
+    totals, extremely_rare = recompute_total_cases(incidence, prevalence, incidence_rare, prevalence_rare, population)
+
+    total_index = column["total_cases_per_year"]
+    for row, total, rare in zip(rows, totals.tolist(), extremely_rare.tolist()):
+        if total_index >= len(row):
+            continue
+        if rare:
+            row[total_index] = EXTREMELY_RARE
+        elif total != total:  # NaN
+            row[total_index] = ""
+        else:
+            row[total_index] = str(int(total))
+
+    tmp_path = out_path.with_name(out_path.name + ".tmp")
+    with open(tmp_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.writer(f)
+        writer.writerow(header)
+        writer.writerows(rows)
+    os.replace(tmp_path, out_path)
+    return len(rows)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Recompute total_cases_per_year for a consolidated CSV")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+    parser.add_argument("--out", default=None, help="Output path (default: rewrite the input in place)")
+    parser.add_argument("--population", type=float, default=WORLD_POPULATION)
+    args = parser.parse_args()
+
+    count = recompute_csv(args.csv, args.out, args.population)
+    print(f"Recomputed total_cases_per_year for {count} rows (population {args.population:,.0f})")
+
+
+if __name__ == "__main__":
+    main()
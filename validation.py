@@ -0,0 +1,193 @@
+#!/usr/bin/env python3
+"""
+Schema validation for mapper results.
+Checks every record against the 17-field result schema before it reaches the
+consolidated CSV or the summary aggregates: field set (older-schema records
+may omit the nullable fields, which are filled with None; keys outside the
+schema, such as disease_id, are dropped), CUI format, enum domains, rates
+that are non-negative numbers or the "extremely rare" sentinel, confidence
+in [0, 1], and boolean flags. Column-shifted rows fail several of these at
+once.
+
+The checks in CHECKS are compiled once into a single straight-line function,
+so validating a record costs a few type tests, set lookups and comparisons
+with no per-field call overhead.
+
+Rejected records are written to a quarantine JSONL file with their reasons:
+    {"record": {...}, "reasons": ["data_quality: 'True' not in domain", ...]}
+
+Usage:
+    python validation.py [--csv output/disease_incidence_data.csv] [--quarantine PATH]
+"""
+
+import argparse
+import csv
+import json
+import math
+import re
+import time
+from pathlib import Path
+
+from incidence_record import ENUM_FIELDS, EXTREMELY_RARE, FIELDNAMES, NULLABLE_FIELDS, parse_csv_value
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_CSV_PATH = REPO_DIR / "output" / "disease_incidence_data.csv"
+DEFAULT_QUARANTINE_PATH = REPO_DIR / "output" / "quarantine.jsonl"
+
+CUI_PATTERN = re.compile(r"C\d{7}")
+FIELD_SET = frozenset(FIELDNAMES)
+REQUIRED_FIELDS = FIELD_SET - frozenset(NULLABLE_FIELDS)
+
+
+_NUMBER_TYPES = (int, float)
+_TEXT_TYPES = (str, type(None))
+
+# (field, expression over v that is true when valid, reason). The expressions
+# are compiled into a single function by _compile_validator.
+_RATE_CHECK = "v is None or v == EXTREMELY_RARE or (type(v) in NUMBER_TYPES and v >= 0)"
+CHECKS = (
+    ("cui", "type(v) is str and cui_match(v) is not None", "not a CUI (C followed by 7 digits)"),
+    *((field, f"type(v) in TEXT_TYPES and v in {field.upper()}_DOMAIN",
+       f"not in domain {sorted(enum.levels(), key=str)}") for field, enum in ENUM_FIELDS.items()),
+    ("incidence_per_100k", _RATE_CHECK, f"not a non-negative number or {EXTREMELY_RARE!r}"),
+    ("prevalence_per_100k", _RATE_CHECK, f"not a non-negative number or {EXTREMELY_RARE!r}"),
+    ("total_cases_per_year", _RATE_CHECK, f"not a non-negative number or {EXTREMELY_RARE!r}"),
+    ("confidence", "type(v) in NUMBER_TYPES and 0 <= v <= 1", "not a number in [0, 1]"),
+    ("is_subtype", "type(v) is bool", "not a boolean"),
+    ("year_specific", "type(v) is bool", "not a boolean"),
+    ("data_year", "v is None or (type(v) in NUMBER_TYPES and isfinite(v) and v == int(v))", "not a year"),
+    *((field, "type(v) in TEXT_TYPES", "not text")
+      for field in ("cui_name", "parent_disease", "reasoning", "source", "source_url")),
+)
+
+
+def _compile_validator():
+    """Generate one straight-line function that runs every check in CHECKS."""
+    lines = ["def _validate_fields(record):", "    get = record.get", "    reasons = []"]
+    for field, expression, reason in CHECKS:
+        lines += [
+            f"    v = get({field!r})",
+            f"    if not ({expression}):",
+            f"        reasons.append({field + ': '!r} + format(repr(v), '.60') + {' ' + reason!r})",
+        ]
+    lines.append("    return reasons")
+
+    namespace = {
+        "EXTREMELY_RARE": EXTREMELY_RARE,
+        "NUMBER_TYPES": _NUMBER_TYPES,
+        "TEXT_TYPES": _TEXT_TYPES,
+        "cui_match": CUI_PATTERN.fullmatch,
+        "isfinite": math.isfinite,
+        **{f"{field.upper()}_DOMAIN": frozenset(enum.levels()) for field, enum in ENUM_FIELDS.items()},
+    }
+    exec(compile("\n".join(lines), "<validation>", "exec"), namespace)
+    return namespace["_validate_fields"]
+
+
+_validate_fields = _compile_validator()
+
+
+def to_schema(record):
+    """Return record with exactly the schema fields: missing nullable fields set to None, other keys dropped.
+
+    Returns record itself when it already has exactly those fields.
+    """
+    if record.keys() == FIELD_SET:
+        return record
+    return {field: record.get(field) for field in FIELDNAMES}
+
+
+def validate(record):
+    """Return the list of schema violations for a result dict (empty when valid).
+
+    Missing nullable fields count as None; missing required fields are
+    violations. Keys outside the schema are not (to_schema drops them), except
+    "_extra", the cells of a CSV row beyond its header.
+    """
+    if not isinstance(record, dict):
+        return [f"not a JSON object: {type(record).__name__}"]
+    keys = record.keys()
+    reasons = _validate_fields(record)
+    if keys != FIELD_SET:
+        missing = REQUIRED_FIELDS - keys
+        if "_extra" in keys:
+            reasons.insert(0, f"cells beyond the header: {format(repr(record['_extra']), '.60')}")
+        if missing:
+            reasons.insert(0, f"missing fields: {', '.join(sorted(missing))}")
+    return reasons
+
+
+class Quarantine:
+    """Append-only sink for records that failed validation."""
+
+    def __init__(self, path=DEFAULT_QUARANTINE_PATH):
+        self.path = Path(path)
+        self.count = 0
+        self._file = None
+
+    def add(self, record, reasons):
+        if self._file is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            self._file = open(self.path, "a", encoding="utf-8")
+        self._file.write(json.dumps({"record": record, "reasons": reasons}, ensure_ascii=False, default=str) + "\n")
+        self.count += 1
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def filter_objects(records, quarantine):
+    """Yield dict records; send any other payload (e.g. a JSON list) to quarantine."""
+    for record in records:
+        if isinstance(record, dict):
+            yield record
+        else:
+            quarantine.add(record, [f"not a JSON object: {type(record).__name__}"])
+
+
+def filter_valid(records, quarantine):
+    """Yield records that pass validation, reduced to the schema fields (see to_schema); quarantine the rest."""
+    for record in records:
+        reasons = validate(record)
+        if reasons:
+            quarantine.add(record, reasons)
+        else:
+            yield to_schema(record)
+
+
+def csv_records(csv_path):
+    """Yield CSV rows as result dicts; cells beyond the header are kept under "_extra"."""
+    with open(csv_path, "r", newline="", encoding="utf-8") as f:
+        for row in csv.DictReader(f, restkey="_extra"):
+            record = {field: parse_csv_value(field, value) for field, value in row.items() if field != "_extra"}
+            if "_extra" in row:
+                record["_extra"] = row["_extra"]
+            yield record
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Validate a consolidated CSV against the result schema")
+    parser.add_argument("--csv", default=str(DEFAULT_CSV_PATH))
+    parser.add_argument("--quarantine", default=str(DEFAULT_QUARANTINE_PATH))
+    args = parser.parse_args()
+
+    records = list(csv_records(args.csv))
+    start = time.perf_counter()
+    with Quarantine(args.quarantine) as quarantine:
+        valid = sum(1 for _ in filter_valid(records, quarantine))
+    elapsed = time.perf_counter() - start
+
+    print(f"{valid} valid, {quarantine.count} quarantined to {args.quarantine}")
+    print(f"Validated {len(records)} records in {elapsed:.3f}s ({len(records) / elapsed:,.0f} rows/s)")
+
+
+if __name__ == "__main__":
+    main()
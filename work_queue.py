@@ -0,0 +1,262 @@
+#!/usr/bin/env python3
+"""
+Persistent work queue for disease groups.
+Replaces handing out fixed slices of batch_groups.json: workers lease groups
+from a local SQLite queue, ack them when their results are written, and any
+lease that is not acked within the visibility timeout goes back to the queue
+for another worker. An expired lease, or one a worker reports with fail,
+counts as an attempt; a group is marked failed after max_attempts of them.
+Releasing a lease hands the group back without using an attempt.
+
+The launch_* scripts hand out groups through launch_round(): each round acks
+the launcher's earlier groups whose results are all committed, fails the ones
+it reports as failed, and leases new ones.
+
+Usage:
+    python work_queue.py init [--groups batch_groups.json]
+    python work_queue.py lease --worker NAME [--count 1]   # prints leased groups
+    python work_queue.py ack GROUP_ID ... [--worker NAME]
+    python work_queue.py release GROUP_ID ... [--worker NAME]
+    python work_queue.py fail GROUP_ID ... [--worker NAME]
+    python work_queue.py status
+"""
+
+import argparse
+import json
+import sqlite3
+import time
+from pathlib import Path
+
+REPO_DIR = Path(__file__).resolve().parent
+DEFAULT_QUEUE_PATH = REPO_DIR / "output" / "work_queue.sqlite"
+DEFAULT_GROUPS_PATH = REPO_DIR / "batch_groups.json"
+
+VISIBILITY_TIMEOUT = 15 * 60
+MAX_ATTEMPTS = 3
+
+PENDING = "pending"
+LEASED = "leased"
+DONE = "done"
+FAILED = "failed"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS groups (
+    group_id      INTEGER PRIMARY KEY,
+    payload       TEXT NOT NULL,
+    state         TEXT NOT NULL DEFAULT 'pending',
+    worker        TEXT,
+    lease_expires REAL,
+    attempts      INTEGER NOT NULL DEFAULT 0,
+    updated       REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS groups_state ON groups (state, lease_expires);
+"""
+
+
+class WorkQueue:
+    """SQLite-backed queue of disease groups with visibility-timeout leases."""
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, visibility_timeout=VISIBILITY_TIMEOUT, max_attempts=MAX_ATTEMPTS):
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.visibility_timeout = visibility_timeout
+        self.max_attempts = max_attempts
+        # Autocommit mode; writes take the database lock with BEGIN IMMEDIATE
+        self._db = sqlite3.connect(self.path, timeout=30, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._db.close()
+
+    def _transaction(self):
+        self._db.execute("BEGIN IMMEDIATE")
+
+    def enqueue(self, groups, start_id=0):
+        """Add groups (numbered from start_id); existing group ids are left as they are."""
+        now = time.time()
+        self._transaction()
+        try:
+            cursor = self._db.executemany(
+                "INSERT OR IGNORE INTO groups (group_id, payload, updated) VALUES (?, ?, ?)",
+                ((start_id + i, json.dumps(group, ensure_ascii=False), now) for i, group in enumerate(groups)),
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return cursor.rowcount
+
+    def lease(self, worker, count=1):
+        """Lease up to count groups: pending ones first, then ones whose lease expired.
+
+        Returns a list of (group_id, group).
+        """
+        now = time.time()
+        self._transaction()
+        try:
+            # An expired lease is a failed attempt; groups that used up their attempts are not handed out again
+            self._db.execute(
+                "UPDATE groups SET state = ?, worker = NULL, attempts = attempts + 1, updated = ? "
+                "WHERE state = ? AND lease_expires <= ? AND attempts + 1 >= ?",
+                (FAILED, now, LEASED, now, self.max_attempts),
+            )
+            rows = self._db.execute(
+                "SELECT group_id, payload FROM groups "
+                "WHERE state = ? OR (state = ? AND lease_expires <= ?) "
+                "ORDER BY state = ?, group_id LIMIT ?",
+                (PENDING, LEASED, now, LEASED, count),
+            ).fetchall()
+            self._db.executemany(
+                "UPDATE groups SET state = ?, worker = ?, lease_expires = ?, attempts = attempts + (state = ?), "
+                "updated = ? WHERE group_id = ?",
+                ((LEASED, worker, now + self.visibility_timeout, LEASED, now, group_id) for group_id, _ in rows),
+            )
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return [(group_id, json.loads(payload)) for group_id, payload in rows]
+
+    def _finish(self, group_ids, state, worker, failed=False):
+        if failed:
+            # A failed attempt; the group fails for good once it has used up its attempts
+            assignment = "state = CASE WHEN attempts + 1 >= ? THEN ? ELSE ? END, attempts = attempts + 1"
+            params = [self.max_attempts, FAILED, state]
+        else:
+            assignment = "state = ?"
+            params = [state]
+        query = f"UPDATE groups SET {assignment}, worker = NULL, lease_expires = NULL, updated = ? " \
+                "WHERE group_id = ? AND state = ?"
+        params += [time.time(), None, LEASED]
+        id_position = len(params) - 2
+        if worker is not None:
+            query += " AND worker = ?"
+            params.append(worker)
+        changed = 0
+        self._transaction()
+        try:
+            for group_id in group_ids:
+                params[id_position] = group_id
+                changed += self._db.execute(query, params).rowcount
+            self._db.execute("COMMIT")
+        except BaseException:
+            self._db.execute("ROLLBACK")
+            raise
+        return changed
+
+    def ack(self, group_ids, worker=None):
+        """Mark leased groups done. With worker, only that worker's leases are acked."""
+        return self._finish(group_ids, DONE, worker)
+
+    def release(self, group_ids, worker=None):
+        """Return leased groups to the queue before their lease expires, without using an attempt."""
+        return self._finish(group_ids, PENDING, worker)
+
+    def fail(self, group_ids, worker=None):
+        """Return leased groups whose attempt failed to the queue, or mark them failed after max_attempts."""
+        return self._finish(group_ids, PENDING, worker, failed=True)
+
+    def extend(self, group_id, worker):
+        """Renew a lease for another visibility timeout. Returns False if it was lost."""
+        now = time.time()
+        cursor = self._db.execute(
+            "UPDATE groups SET lease_expires = ?, updated = ? WHERE group_id = ? AND state = ? AND worker = ?",
+            (now + self.visibility_timeout, now, group_id, LEASED, worker),
+        )
+        return cursor.rowcount == 1
+
+    def leased(self, worker):
+        """The groups a worker holds under unexpired leases, as a list of (group_id, group)."""
+        rows = self._db.execute(
+            "SELECT group_id, payload FROM groups WHERE state = ? AND worker = ? AND lease_expires > ? "
+            "ORDER BY group_id",
+            (LEASED, worker, time.time()),
+        ).fetchall()
+        return [(group_id, json.loads(payload)) for group_id, payload in rows]
+
+    def stats(self):
+        """Group counts by state, with expired leases counted as pending."""
+        now = time.time()
+        counts = dict.fromkeys((PENDING, LEASED, DONE, FAILED), 0)
+        for state, expired, count in self._db.execute(
+            "SELECT state, state = ? AND lease_expires <= ?, COUNT(*) FROM groups GROUP BY 1, 2", (LEASED, now)
+        ):
+            counts[PENDING if expired else state] += count
+        return counts
+
+
+def launch_round(queue, worker, count, completed, failed=()):
+    """One launcher pass: settle the worker's earlier leases, then lease up to count groups.
+
+    Held groups whose diseases all appear in completed (a set of CUIs) are
+    acked, and the group ids in failed are reported as failed attempts.
+    Returns (acked, failed, leased) with leased a list of (group_id, group).
+    """
+    finished = [group_id for group_id, group in queue.leased(worker)
+                if all(disease["diseaseid"] in completed for disease in group)]
+    acked = queue.ack(finished, worker)
+    failed = queue.fail(failed, worker)
+    return acked, failed, queue.lease(worker, count)
+
+
+def format_group(group_id, group):
+    """Launch listing for a group, in the format the launch_batch* scripts print."""
+    lines = [f"=== Batch {group_id} ==="]
+    for j, disease in enumerate(group, 1):
+        lines.append(f"{j}. {disease['diseaseid']} - {disease['diseasename']}")
+    return "\n".join(lines)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Leased work queue for disease groups")
+    parser.add_argument("--queue", default=str(DEFAULT_QUEUE_PATH))
+    parser.add_argument("--timeout", type=float, default=VISIBILITY_TIMEOUT, help="Lease visibility timeout (seconds)")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    init_parser = subparsers.add_parser("init", help="Load groups into the queue")
+    init_parser.add_argument("--groups", default=str(DEFAULT_GROUPS_PATH))
+
+    lease_parser = subparsers.add_parser("lease", help="Lease groups for a worker")
+    lease_parser.add_argument("--worker", required=True)
+    lease_parser.add_argument("--count", type=int, default=1)
+
+    for name, help_text in (("ack", "Mark groups done"), ("release", "Return groups to the queue"),
+                            ("fail", "Return groups to the queue after a failed attempt")):
+        finish_parser = subparsers.add_parser(name, help=help_text)
+        finish_parser.add_argument("group_ids", type=int, nargs="+")
+        finish_parser.add_argument("--worker", default=None)
+
+    subparsers.add_parser("status", help="Show group counts by state")
+
+    args = parser.parse_args()
+
+    with WorkQueue(args.queue, visibility_timeout=args.timeout) as queue:
+        if args.command == "init":
+            with open(args.groups, "r") as f:
+                groups = json.load(f)
+            added = queue.enqueue(groups)
+            print(f"Queued {added} new groups ({len(groups)} in {args.groups})")
+        elif args.command == "lease":
+            for group_id, group in queue.lease(args.worker, args.count):
+                print(format_group(group_id, group))
+                print()
+        elif args.command == "ack":
+            print(f"Acked {queue.ack(args.group_ids, args.worker)} groups")
+        elif args.command == "release":
+            print(f"Released {queue.release(args.group_ids, args.worker)} groups")
+        elif args.command == "fail":
+            print(f"Failed {queue.fail(args.group_ids, args.worker)} group attempts")
+        else:
+            for state, count in queue.stats().items():
+                print(f"{state}: {count}")
+
+
+if __name__ == "__main__":
+    main()